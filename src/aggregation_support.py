@@ -0,0 +1,192 @@
+import pandas as pd
+import numpy as np
+
+import hashlib
+import pickle
+import json
+import time
+import os
+
+import sys
+sys.path.append("..")
+from src.analysis_support import error_band
+
+# dimensions of the cube, measures summarized per cell and top-k tables (sort column, ascending, kept columns)
+CUBE_SPECS = {
+    "flights": {
+        "dimensions": ["destination_city", "week", "stops_departure", "company_departure"],
+        "measures": ["price", "duration_departure", "score"],
+        "top": {
+            "cheapest": ("price", True, ["price", "duration_departure", "stops_departure", "score"]),
+            "best_scored": ("score", False, ["price", "duration_departure", "stops_departure", "self_transfer", "score"]),
+        }
+    },
+    "accommodations": {
+        "dimensions": ["destination", "week"],
+        "measures": ["total_price_amount", "score", "distance_city_center_km"],
+        "top": {
+            "cheapest": ("total_price_amount", True, ["total_price_amount", "score", "distance_city_center_km"]),
+            "best_scored": ("score", False, ["total_price_amount", "score", "distance_city_center_km"]),
+        }
+    }
+}
+
+
+def build_cube(dataframe, spec, k=10):
+    """
+    Materialize the aggregate cube of `dataframe` over `spec["dimensions"]` in one grouped pass.
+
+    Each cell keeps additive statistics per measure (count, sum, sum of squares, min, max), so any
+    coarser grouping can be rolled up exactly, and each top-k table keeps the `k` best rows per cell,
+    which always contain the `k` best rows of any group of cells.
+
+    Returns:
+    - dict: "cells" with one row per cell and "top" with one DataFrame per top-k table.
+    """
+    dimensions = spec["dimensions"]
+    dataframe = dataframe.reset_index(drop=True)
+    measures = dataframe[spec["measures"]].apply(pd.to_numeric, errors="coerce")
+
+    grouped = measures.groupby([dataframe[dimension] for dimension in dimensions], dropna=False, observed=True)
+    cells = grouped.agg(["count", "sum", "min", "max"])
+    cells.columns = [f"{measure}_{statistic}" for measure, statistic in cells.columns]
+    squares = (measures ** 2).groupby([dataframe[dimension] for dimension in dimensions], dropna=False, observed=True).sum()
+    for measure in spec["measures"]:
+        cells[f"{measure}_sumsq"] = squares[measure]
+
+    top_tables = dict()
+    for name, (sort_column, ascending, columns) in spec["top"].items():
+        # the row order breaks ties like `nsmallest`/`nlargest` (keep="first") do
+        kept_columns = [column for column in dict.fromkeys(columns + [sort_column]) if column not in dimensions]
+        ranked = dataframe.loc[dataframe[sort_column].notna(), dimensions + kept_columns]
+        ranked = ranked.assign(row=ranked.index).sort_values([sort_column, "row"], ascending=[ascending, True], kind="stable")
+        top_tables[name] = ranked.groupby(dimensions, dropna=False, observed=True).head(k).reset_index(drop=True)
+
+    return {"cells": cells.reset_index(), "top": top_tables, "spec": spec, "k": k}
+
+
+def rollup(cube, by, confidence=0.95, k=None):
+    """
+    Aggregate the cube cells to the `by` dimensions.
+
+    Returns one row per group with, for every measure, the count, mean, standard deviation, min, max
+    and the `error_band` confidence interval of the mean, plus `<top table>_<column>` means over the
+    `k` best rows of the group (`k` at most the one the cube was built with).
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    k = k or cube["k"]
+    if k > cube["k"]:
+        raise ValueError(f"Cube keeps the top {cube['k']} rows per cell, can't roll up the top {k}")
+
+    grouped_cells = cube["cells"].groupby(by, dropna=False, observed=True)
+    sums = grouped_cells.sum(numeric_only=True)
+    minimums = grouped_cells.min(numeric_only=True)
+    maximums = grouped_cells.max(numeric_only=True)
+
+    summary = pd.DataFrame(index=sums.index)
+    for measure in cube["spec"]["measures"]:
+        count = sums[f"{measure}_count"]
+        mean = sums[f"{measure}_sum"] / count.replace(0, np.nan)
+        variance = (sums[f"{measure}_sumsq"] - count * mean ** 2) / (count - 1).where(count > 1)
+        std = np.sqrt(variance.clip(lower=0))
+        lower, upper, _ = error_band(mean, std, count, confidence)
+
+        summary[f"{measure}_count"] = count
+        summary[f"{measure}_mean"] = mean
+        summary[f"{measure}_std"] = std
+        summary[f"{measure}_min"] = minimums[f"{measure}_min"]
+        summary[f"{measure}_max"] = maximums[f"{measure}_max"]
+        summary[f"{measure}_ci_lower"] = lower
+        summary[f"{measure}_ci_upper"] = upper
+
+    for name, (sort_column, ascending, columns) in cube["spec"]["top"].items():
+        ranked = cube["top"][name].sort_values([sort_column, "row"], ascending=[ascending, True], kind="stable")
+        best = ranked.groupby(by, dropna=False, observed=True).head(k)
+        means = best.groupby(by, dropna=False, observed=True)[[column for column in columns if column not in by]].mean()
+        summary = summary.join(means.astype(float).add_prefix(f"{name}_"))
+
+    return summary
+
+
+def source_signature(source_paths):
+    # size and modification time of every source file; any change invalidates the stored cube
+    signature = [(os.path.abspath(path), os.path.getsize(path), os.stat(path).st_mtime_ns) for path in sorted(source_paths)]
+    return hashlib.sha256(json.dumps(signature).encode("utf-8")).hexdigest()
+
+
+def load_cube(source_paths, dataset, k=10, cache_dir="../data/cache/aggregates", read_function=None, verbose=False):
+    """
+    Return the cube of the concatenated `source_paths` CSVs, from `cache_dir` when none of them changed.
+
+    Parameters:
+    - source_paths (list): CSV files of one dataset (e.g. the cleaned flight itineraries).
+    - dataset (str): Key of `CUBE_SPECS`.
+    - k (int): Rows kept per cell in the top-k tables.
+    - cache_dir (str): Directory where built cubes are pickled.
+    - read_function (callable): Reader for each path, `pd.read_csv(path, index_col=0)` by default.
+    - verbose (bool): Print whether the cube was loaded or rebuilt.
+
+    Returns:
+    - dict: Cube as returned by `build_cube`.
+    """
+    source_paths = [source_paths] if isinstance(source_paths, str) else list(source_paths)
+    read_function = read_function or (lambda path: pd.read_csv(path, index_col=0))
+    spec = CUBE_SPECS[dataset]
+
+    key = hashlib.sha256(json.dumps([dataset, k, spec, source_signature(source_paths)], default=str).encode("utf-8")).hexdigest()
+    cube_path = os.path.join(cache_dir, f"{dataset}_{key[:16]}.pkl")
+
+    if os.path.exists(cube_path):
+        if verbose == True:
+            print(f"Loaded {dataset} cube from {cube_path}")
+        with open(cube_path, "rb") as file:
+            return pickle.load(file)
+
+    cube = build_cube(pd.concat([read_function(path) for path in source_paths], ignore_index=True), spec, k=k)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for stale_path in os.listdir(cache_dir):
+        if stale_path.startswith(f"{dataset}_") and stale_path.endswith(".pkl"):
+            os.remove(os.path.join(cache_dir, stale_path))
+    with open(cube_path, "wb") as file:
+        pickle.dump(cube, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if verbose == True:
+        print(f"Built {dataset} cube with {len(cube['cells'])} cells into {cube_path}")
+
+    return cube
+
+
+def benchmark_rollups(flights_df, k=10, repeat=3):
+    """
+    Seconds of the notebook's per-destination `groupby().apply(nsmallest/nlargest)` blocks against
+    building the flights cube once and rolling it up.
+    """
+    def notebook_blocks():
+        flights_df.groupby("destination_city").apply(lambda x: pd.DataFrame({
+            "mean_smallest_price_EUR": [x.nsmallest(k, "price")["price"].mean()],
+            "mean_smallest_duration_hours": [x.nsmallest(k, "price")["duration_departure"].mean() / 60]}))
+        flights_df.groupby("destination_city").apply(lambda x: pd.DataFrame({
+            "mean_price_EUR": [x.nlargest(k, "score")["price"].mean()],
+            "mean_duration_hours": [x.nlargest(k, "score")["duration_departure"].mean() / 60],
+            "mean_stops": [x.nlargest(k, "score")["stops_departure"].mean()],
+            "mean_self_transfer": [x.nlargest(k, "score")["self_transfer"].mean()]}))
+        flights_df.groupby(["week", "destination_city"]).apply(lambda x: x.nlargest(k, "score")["price"].mean())
+
+    timings = dict()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        notebook_blocks()
+    timings["groupby_apply_seconds"] = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    cube = build_cube(flights_df, CUBE_SPECS["flights"], k=k)
+    timings["cube_build_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rollup(cube, "destination_city")
+        rollup(cube, ["week", "destination_city"])
+    timings["rollup_seconds"] = (time.perf_counter() - start) / repeat
+
+    return timings
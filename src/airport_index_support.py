@@ -0,0 +1,210 @@
+import pandas as pd
+import numpy as np
+
+import unicodedata
+import difflib
+import pickle
+import weakref
+import time
+import re
+
+# local or alternative names mapped to the city names used by Sky-Scrapper
+CITY_ALIASES = {
+    "roma": "rome",
+    "nueva york": "new york",
+    "nyc": "new york",
+    "la habana": "havana",
+    "habana": "havana",
+    "funchal": "madeira",
+    "lisboa": "lisbon",
+    "milano": "milan",
+    "napoli": "naples",
+    "firenze": "florence",
+    "venezia": "venice",
+    "wien": "vienna",
+    "moskva": "moscow",
+    "moscu": "moscow",
+    "bucuresti": "bucharest",
+    "ciudad de mexico": "mexico city",
+    "sidney": "sydney",
+    "bangkok metropolis": "bangkok",
+    "cracovia": "krakow",
+    "londres": "london",
+    "munchen": "munich",
+    "muenchen": "munich",
+    "bruxelles": "brussels",
+    "praha": "prague",
+}
+
+
+def normalize_name(text):
+    """
+    Lowercase, strip accents and collapse separators so "Logroño", "logrono" and " LOGROÑO " match.
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    text = re.sub(r"[\s\-_/]+", " ", text.lower())
+    return text.strip()
+
+
+class AirportIndex:
+    """
+    In-memory index of airports with O(1) lookups by city, skyId, IATA and ICAO code.
+
+    Built once from `countries_airports.csv` (Sky-Scrapper entity ids) and optionally
+    `iata-icao.csv` (ICAO codes and coordinates), it replaces the per-query scans over
+    the airport codes DataFrame. City lookups are accent and case insensitive, resolve
+    common aliases (e.g. "roma" -> "rome") and fall back to fuzzy matching.
+    """
+
+    def __init__(self, airports, iata_icao_records=None, aliases=None):
+        self.aliases = {normalize_name(alias): normalize_name(city) for alias, city in {**CITY_ALIASES, **(aliases or {})}.items()}
+        self.by_city = dict()
+        self.by_sky_id = dict()
+        self.by_iata = dict()
+        self.by_icao = dict()
+        self.fuzzy_matches = dict()
+
+        for airport in airports:
+            self.by_city.setdefault(normalize_name(airport["city"]), []).append(airport)
+            if isinstance(airport.get("skyId"), str):
+                self.by_sky_id[airport["skyId"].upper()] = airport
+
+        for record in iata_icao_records or []:
+            if isinstance(record.get("iata"), str):
+                self.by_iata[record["iata"].upper()] = record
+            if isinstance(record.get("icao"), str):
+                self.by_icao[record["icao"].upper()] = record
+
+    @classmethod
+    def from_dataframe(cls, countries_airports_df, iata_icao_df=None, aliases=None):
+        airports = (countries_airports_df.loc[:, ~countries_airports_df.columns.str.startswith("Unnamed")]
+                    .dropna(subset=["city"])
+                    .to_dict("records"))
+        iata_icao_records = iata_icao_df.to_dict("records") if iata_icao_df is not None else None
+
+        return cls(airports, iata_icao_records, aliases=aliases)
+
+    @classmethod
+    def from_csv(cls, countries_airports_path, iata_icao_path=None, aliases=None):
+        countries_airports_df = pd.read_csv(countries_airports_path, index_col=0)
+        iata_icao_df = pd.read_csv(iata_icao_path, keep_default_na=False, na_values=[""]) if iata_icao_path else None
+
+        return cls.from_dataframe(countries_airports_df, iata_icao_df, aliases=aliases)
+
+    def resolve_city(self, city, cutoff=0.85):
+        """
+        Return the indexed (normalized) city name for `city`, or None if nothing close enough exists.
+        """
+        normalized_city = normalize_name(city)
+        normalized_city = self.aliases.get(normalized_city, normalized_city)
+
+        if normalized_city in self.by_city:
+            return normalized_city
+
+        if normalized_city not in self.fuzzy_matches:
+            close_matches = difflib.get_close_matches(normalized_city, self.by_city.keys(), n=1, cutoff=cutoff)
+            self.fuzzy_matches[normalized_city] = close_matches[0] if close_matches else None
+
+        return self.fuzzy_matches[normalized_city]
+
+    def airports_by_city(self, city):
+        resolved_city = self.resolve_city(city)
+        return self.by_city.get(resolved_city, []) if resolved_city else []
+
+    def city_entity_id(self, city):
+        airports = self.airports_by_city(city)
+        if not airports:
+            return None
+        return str(int(airports[0]["city_entityId"]))
+
+    def airport_by_code(self, code):
+        """
+        Look an airport up by skyId, IATA or ICAO code, merging the Sky-Scrapper and IATA/ICAO records.
+        """
+        code = str(code).upper()
+        sky_record = self.by_sky_id.get(code)
+        iata_record = self.by_iata.get(code) or self.by_icao.get(code)
+
+        if sky_record is None and iata_record is None:
+            return None
+
+        if sky_record is None and iata_record is not None:
+            sky_record = self.by_sky_id.get(iata_record.get("iata"))
+
+        return {**(iata_record or {}), **(sky_record or {})}
+
+    def airport_entity_id(self, code):
+        airport = self.airport_by_code(code)
+        if airport is None or pd.isna(airport.get("entityId", np.nan)):
+            return None
+        return str(int(airport["entityId"]))
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+
+# indexes built from airport code DataFrames, by DataFrame identity (DataFrames can't be dict or weak dict keys);
+# an entry goes away with its DataFrame
+_indexes_by_dataframe = dict()
+
+
+def get_airport_index(countries_airports):
+    """
+    `AirportIndex` of an airport codes DataFrame, built on the first call and reused for the same DataFrame
+    object afterwards, so request functions given the DataFrame don't re-index it per route.
+    An `AirportIndex` is returned as is. A DataFrame whose length changed is indexed again; after editing
+    one in place otherwise, build a new `AirportIndex.from_dataframe`.
+    """
+    if isinstance(countries_airports, AirportIndex):
+        return countries_airports
+
+    key = id(countries_airports)
+    cached = _indexes_by_dataframe.get(key)
+    if cached is not None:
+        dataframe_ref, n_rows, airport_index = cached
+        if dataframe_ref() is countries_airports and n_rows == len(countries_airports):
+            return airport_index
+
+    airport_index = AirportIndex.from_dataframe(countries_airports)
+    dataframe_ref = weakref.ref(countries_airports, lambda _, key=key: _indexes_by_dataframe.pop(key, None))
+    _indexes_by_dataframe[key] = (dataframe_ref, len(countries_airports), airport_index)
+    return airport_index
+
+
+def benchmark_city_lookups(countries_airports_df, cities, n_lookups=10000):
+    """
+    Time `n_lookups` city -> city_entityId resolutions with the DataFrame `.loc` scan used
+    by the request functions against an `AirportIndex` built once from the same table.
+
+    Returns:
+    - dict: Seconds spent by each approach, and the index build time.
+    """
+    lookups = [cities[i % len(cities)] for i in range(n_lookups)]
+
+    start = time.perf_counter()
+    for city in lookups:
+        try:
+            city_id = countries_airports_df.loc[countries_airports_df["city"].str.lower() == city.lower(), "city_entityId"]
+            city_id = str(int(city_id.iloc[0]))
+        except:
+            pass
+    loc_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    airport_index = AirportIndex.from_dataframe(countries_airports_df)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for city in lookups:
+        airport_index.city_entity_id(city)
+    index_seconds = time.perf_counter() - start
+
+    return {"loc_seconds": loc_seconds, "index_build_seconds": build_seconds, "index_seconds": index_seconds,
+            "speedup": loc_seconds / index_seconds if index_seconds else np.inf}
@@ -1,7 +1,18 @@
-from scipy import stats
 import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+import time
+
+# statistics computed along the resamples axis of a (B x n) bootstrap matrix
+BOOTSTRAP_STATISTICS = {
+    "mean": lambda samples: samples.mean(axis=1),
+    "median": lambda samples: np.median(samples, axis=1),
+}
+
 
 def error_band(mean, std_dev, n, confidence=0.95):
+    from scipy import stats
 
     z_score = stats.norm.ppf((1 + confidence) / 2)
     
@@ -14,4 +25,116 @@ def error_band(mean, std_dev, n, confidence=0.95):
     upper_bound = mean + margin_of_error
     return lower_bound, upper_bound, margin_of_error
 
-lower, upper, margin_of_error = error_band(8.1, 3, 9000, 0.95)
\ No newline at end of file
+
+def t_band(mean, std_dev, n, confidence=0.95):
+    # same as error_band with Student's t quantiles, wider for small groups
+    from scipy import stats
+    n = np.asarray(n, dtype=float)
+    t_score = stats.t.ppf((1 + confidence) / 2, df=np.where(n > 1, n - 1, np.nan))
+
+    margin_of_error = t_score * std_dev / np.sqrt(n)
+    return mean - margin_of_error, mean + margin_of_error, margin_of_error
+
+
+def bootstrap_band(values, confidence=0.95, n_resamples=2000, statistic="mean", max_elements=5_000_000, seed=None):
+    """
+    Percentile bootstrap interval of `statistic` for one group of values.
+
+    Resamples are drawn as (B x n) index matrices, in chunks of at most `max_elements` indices
+    so memory stays bounded for large groups.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.nan, np.nan
+
+    statistic_function = BOOTSTRAP_STATISTICS[statistic] if isinstance(statistic, str) else statistic
+    generator = np.random.default_rng(seed)
+    chunk_resamples = max(1, max_elements // len(values))
+
+    estimates = list()
+    for start in range(0, n_resamples, chunk_resamples):
+        indices = generator.integers(0, len(values), size=(min(chunk_resamples, n_resamples - start), len(values)))
+        estimates.append(statistic_function(values[indices]))
+    estimates = np.concatenate(estimates)
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(estimates, [alpha, 1 - alpha])
+    return lower, upper
+
+
+def _bootstrap_group(arguments):
+    values, confidence, n_resamples, statistic, max_elements, seed = arguments
+    return bootstrap_band(values, confidence, n_resamples, statistic, max_elements, seed)
+
+
+def grouped_intervals(dataframe, by, value_column, confidence=0.95, methods=("normal", "t", "bootstrap"),
+                      n_resamples=2000, statistic="mean", max_elements=5_000_000, max_workers=None, random_state=None):
+    """
+    Confidence intervals of `value_column` for every group of `by` in one call.
+
+    Normal and t intervals are computed from the grouped mean, standard deviation and count for all
+    groups at once. Bootstrap intervals resample each group with a vectorized index matrix, optionally
+    spreading the groups over `max_workers` processes; each group gets its own seed derived from
+    `random_state`, so results don't depend on the number of workers.
+
+    Parameters:
+    - dataframe (pd.DataFrame): Data with the grouping and value columns (e.g. flights with `price`).
+    - by (str or list): Grouping columns, e.g. ["destination_city", "week"].
+    - value_column (str): Column the intervals are computed for.
+    - confidence (float): Confidence level of all intervals.
+    - methods (tuple): Any of "normal", "t" and "bootstrap".
+    - n_resamples (int): Bootstrap resamples per group.
+    - statistic (str or callable): "mean", "median" or a function reducing a (B x n) matrix along axis 1.
+    - max_elements (int): Maximum resampled values held in memory at once per group.
+    - max_workers (int): Processes for the bootstrap; runs in this process if None or 1.
+    - random_state (int): Seed for reproducible bootstrap intervals.
+
+    Returns:
+    - pd.DataFrame: One row per group with n, mean, std and `<method>_lower`/`<method>_upper` columns.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    grouped = pd.to_numeric(dataframe[value_column], errors="coerce").groupby([dataframe[column] for column in by])
+    intervals = grouped.agg(["count", "mean", "std"]).rename(columns={"count": "n"})
+
+    if "normal" in methods:
+        intervals["normal_lower"], intervals["normal_upper"], _ = error_band(intervals["mean"], intervals["std"], intervals["n"], confidence)
+
+    if "t" in methods:
+        intervals["t_lower"], intervals["t_upper"], _ = t_band(intervals["mean"], intervals["std"], intervals["n"], confidence)
+
+    if "bootstrap" in methods:
+        seeds = np.random.SeedSequence(random_state).spawn(len(intervals))
+        tasks = [(values.to_numpy(), confidence, n_resamples, statistic, max_elements, seed)
+                 for (_, values), seed in zip(grouped, seeds)]
+
+        if max_workers is not None and max_workers > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                bands = list(executor.map(_bootstrap_group, tasks))
+        else:
+            bands = [_bootstrap_group(task) for task in tasks]
+
+        intervals["bootstrap_lower"] = [lower for lower, _ in bands]
+        intervals["bootstrap_upper"] = [upper for _, upper in bands]
+
+    return intervals
+
+
+def benchmark_bootstrap(dataframe, by, value_column, n_resamples=2000, max_workers=None):
+    """
+    Seconds for bootstrap intervals of every group with a per-resample Python loop against `grouped_intervals`.
+    """
+    generator = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    for _, values in dataframe.groupby(by)[value_column]:
+        values = values.dropna().to_numpy()
+        estimates = [generator.choice(values, size=len(values), replace=True).mean() for _ in range(n_resamples)]
+        np.quantile(estimates, [0.025, 0.975])
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grouped_intervals(dataframe, by, value_column, methods=("bootstrap",), n_resamples=n_resamples, max_workers=max_workers)
+    vectorized_seconds = time.perf_counter() - start
+
+    return {"python_loop_seconds": loop_seconds, "vectorized_seconds": vectorized_seconds}
@@ -0,0 +1,163 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import pandas as pd
+
+import collections
+import threading
+import time
+
+# (connect, read) seconds; searchFlightsComplete can take a while to assemble all itineraries
+DEFAULT_TIMEOUT = (10, 60)
+
+# connection setup timings of the request running in each thread, filled by the timed connections below
+_connection_timings = threading.local()
+
+
+class _TimedConnectionMixin:
+    # _new_conn resolves the host and opens the TCP socket; connect adds the TLS handshake on top
+    def _new_conn(self):
+        start = time.perf_counter()
+        connection = super()._new_conn()
+        _connection_timings.connect_seconds = time.perf_counter() - start
+        return connection
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connection_timings.setup_seconds = time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+class ApiClient:
+    """
+    HTTP client sharing one pooled `requests.Session` across a whole sweep: connections are kept alive
+    and reused between calls (and threads), every request gets a default timeout and the default headers,
+    and compressed (gzip/deflate) responses are negotiated.
+
+    Every request records its latency split into connection setup (DNS + TCP connect, TLS handshake;
+    zero when a pooled connection is reused), time to first byte and body transfer, plus the bytes
+    received on the wire and after decompression.
+
+    Parameters:
+    - headers (dict): Headers sent with every request (e.g. the RapidAPI key and host).
+    - timeout (float or tuple): Default `(connect, read)` timeout in seconds.
+    - pool_maxsize (int): Connections kept open per host; at least the number of threads sharing the client.
+    - max_metrics (int): Most recent requests kept in `metrics`.
+    """
+
+    def __init__(self, headers=None, timeout=DEFAULT_TIMEOUT, pool_maxsize=16, max_metrics=10000):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", **(headers or {})})
+
+        adapter = _TimedHTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.metrics = collections.deque(maxlen=max_metrics)
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        _connection_timings.connect_seconds = 0.0
+        _connection_timings.setup_seconds = 0.0
+
+        start = time.perf_counter()
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout or self.timeout, stream=True)
+        headers_received = time.perf_counter()
+        content = response.content
+        finished = time.perf_counter()
+
+        connect_seconds = _connection_timings.connect_seconds
+        setup_seconds = _connection_timings.setup_seconds
+        with self.lock:
+            self.metrics.append({
+                "endpoint": url.rstrip("/").split("/")[-1],
+                "status_code": response.status_code,
+                "reused_connection": setup_seconds == 0,
+                "connect_seconds": connect_seconds,
+                "tls_seconds": max(setup_seconds - connect_seconds, 0),
+                "ttfb_seconds": headers_received - start - setup_seconds,
+                "transfer_seconds": finished - headers_received,
+                "total_seconds": finished - start,
+                "content_encoding": response.headers.get("Content-Encoding"),
+                "wire_bytes": response.raw.tell(),
+                "body_bytes": len(content),
+            })
+
+        return response
+
+    def summarize_metrics(self, by="endpoint"):
+        """
+        Mean latency split, connection reuse rate and compression ratio per `by` group.
+        """
+        with self.lock:
+            metrics_df = pd.DataFrame(list(self.metrics))
+        if metrics_df.empty:
+            return metrics_df
+
+        summary = metrics_df.groupby(by).agg(
+            requests=("total_seconds", "size"),
+            reused_connections=("reused_connection", "mean"),
+            connect_seconds=("connect_seconds", "mean"),
+            tls_seconds=("tls_seconds", "mean"),
+            ttfb_seconds=("ttfb_seconds", "mean"),
+            transfer_seconds=("transfer_seconds", "mean"),
+            total_seconds=("total_seconds", "mean"),
+            p95_total_seconds=("total_seconds", lambda seconds: seconds.quantile(0.95)),
+            wire_bytes=("wire_bytes", "sum"),
+            body_bytes=("body_bytes", "sum"),
+        )
+        summary["compression_ratio"] = summary["body_bytes"] / summary["wire_bytes"].replace(0, float("nan"))
+        return summary
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def benchmark_connection_reuse(url, params=None, headers=None, n_requests=10):
+    """
+    Seconds for `n_requests` GETs with a bare `requests.get` each time against one pooled `ApiClient`.
+    """
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        requests.get(url, params=params, headers=headers, timeout=DEFAULT_TIMEOUT)
+    bare_seconds = time.perf_counter() - start
+
+    with ApiClient(headers=headers) as client:
+        start = time.perf_counter()
+        for _ in range(n_requests):
+            client.get(url, params=params)
+        pooled_seconds = time.perf_counter() - start
+
+    return {"bare_requests_seconds": bare_seconds, "pooled_session_seconds": pooled_seconds}
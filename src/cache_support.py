@@ -0,0 +1,124 @@
+import sqlite3
+import threading
+import hashlib
+import json
+import zlib
+import time
+import os
+
+# seconds each endpoint response stays valid: airport codes barely change, fares move within minutes
+ENDPOINT_TTLS = {
+    "searchAirport": 7 * 24 * 60 * 60,
+    "searchFlightsComplete": 15 * 60,
+    "reverse": 90 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+
+def normalize_querystring(params):
+    return {str(key): str(value).strip().lower() for key, value in sorted(params.items()) if value is not None}
+
+
+def build_cache_key(endpoint, params):
+    payload = json.dumps({"endpoint": endpoint, "params": normalize_querystring(params)}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of API JSON responses stored in a SQLite file as zlib-compressed JSON.
+
+    Entries are keyed on the endpoint and the normalized querystring, expire after the
+    endpoint TTL and are evicted least-recently-used first once the stored size exceeds `max_bytes`.
+
+    Parameters:
+    - path (str): SQLite file where responses are stored (e.g. "../data/cache/api_cache.sqlite").
+    - max_bytes (int): Maximum compressed size kept on disk.
+    - endpoint_ttls (dict): Seconds to live per endpoint name, overriding `ENDPOINT_TTLS`.
+    - default_ttl (int): Seconds to live for endpoints without a specific TTL.
+    """
+
+    def __init__(self, path, max_bytes=200 * 1024 * 1024, endpoint_ttls=None, default_ttl=DEFAULT_TTL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.endpoint_ttls = {**ENDPOINT_TTLS, **(endpoint_ttls or {})}
+        self.default_ttl = default_ttl
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                created_at REAL,
+                last_access REAL,
+                size INTEGER,
+                payload BLOB
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses (last_access)")
+        self.connection.commit()
+
+    def get(self, endpoint, params):
+        key = build_cache_key(endpoint, params)
+        ttl = self.endpoint_ttls.get(endpoint, self.default_ttl)
+        now = time.time()
+
+        with self.lock:
+            row = self.connection.execute("SELECT created_at, payload FROM responses WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            created_at, payload = row
+            if now - created_at > ttl:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.connection.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self.connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.connection.commit()
+            self.stats["hits"] += 1
+
+        return json.loads(zlib.decompress(payload))
+
+    def set(self, endpoint, params, data):
+        key = build_cache_key(endpoint, params)
+        payload = zlib.compress(json.dumps(data).encode("utf-8"))
+        now = time.time()
+
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, created_at, last_access, size, payload) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, now, now, len(payload), payload)
+            )
+            self._evict()
+            self.connection.commit()
+
+    def _evict(self):
+        total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        for key, size in self.connection.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+            self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.stats["evictions"] += 1
+            total_size -= size
+            if total_size <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
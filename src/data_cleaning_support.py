@@ -1,3 +1,4 @@
+import pandas as pd
 import numpy as np
 import re
 
@@ -22,4 +23,209 @@ def convert_to_hours(time_str):
         time_str = re.sub(r'[^\d*+]', '', time_str)
         
         return eval(time_str)/60 if time_str else np.nan
-    return np.nan
\ No newline at end of file
+    return np.nan
+
+
+# vectorized duration parsing
+NUMBER = r"\d+(?:[.,]\d+)?"
+CONNECTOR = r"(?:\s*(?:y|and)(?=\s*\d))?"  # "1 hora y 30 minutos", only when another part follows
+DURATION_PATTERN = (
+    rf"^\s*(?:(?P<number>{NUMBER})"
+    rf"|(?:(?P<days>{NUMBER})\s*(?:días|dias|día|dia|days|day|d)\.?{CONNECTOR})?\s*"
+    rf"(?:(?P<hours>{NUMBER})\s*(?:horas|hora|hours|hour|hrs|hr|h)\.?{CONNECTOR})?\s*"
+    rf"(?:(?P<minutes>{NUMBER})\s*(?:minutos|minuto|minutes|minute|mins|min|m)\.?)?)\s*$"
+)
+DURATION_REGEX = re.compile(DURATION_PATTERN, re.IGNORECASE)
+HOURS_PER_UNIT = {"days": 24, "hours": 1, "minutes": 1 / 60}
+
+
+def extract_duration_components(durations):
+    components = durations.str.extract(DURATION_REGEX)
+    components = components.apply(lambda column: pd.to_numeric(column.str.replace(",", ".", regex=False)))
+
+    unit_columns = list(HOURS_PER_UNIT)
+    has_units = components[unit_columns].notna().any(axis=1)
+    components["hours_total"] = (components[unit_columns].fillna(0) * pd.Series(HOURS_PER_UNIT)).sum(axis=1).where(has_units)
+
+    # hours per unit when the bound uses a single unit ("3 horas", "45m"), so a bare lower bound can inherit it
+    single_unit = components[unit_columns].notna().sum(axis=1) == 1
+    components["unit_hours"] = np.select([single_unit & components[unit].notna() for unit in unit_columns],
+                                         list(HOURS_PER_UNIT.values()), default=1)
+    return components
+
+
+def parse_durations(durations):
+    """
+    Parse scraped activity durations into `hours_min` and `hours_max` in one vectorized pass.
+
+    Handles days, hours and minutes in Spanish and English ("2 días", "1 hora", "1h 30m", "45 minutos",
+    "3 hours", "1 hora y 30 minutos") and ranges ("2-3 horas", "1h 15m -2h", "15 -45m"), where a bare lower bound takes the
+    unit of the upper bound. Bare numbers are read as hours, like `convert_to_hours`; text that is not
+    a duration ("Entradas") gives NaN. Without a range, `hours_max` equals `hours_min`.
+
+    Returns:
+    - pd.DataFrame: `hours_min` and `hours_max` columns, aligned with `durations`.
+    """
+    normalized = pd.Series(durations).astype("string").str.strip().str.lower()
+    bounds = normalized.str.split(r"\s*-\s*", n=1, expand=True, regex=True).reindex(columns=[0, 1]).astype("string")
+
+    lower = extract_duration_components(bounds[0])
+    upper = extract_duration_components(bounds[1])
+
+    lower_unit_hours = np.where(bounds[1].notna(), upper["unit_hours"], 1)
+    hours_min = lower["hours_total"].fillna(lower["number"] * lower_unit_hours)
+    hours_max = upper["hours_total"].fillna(upper["number"]).fillna(hours_min)
+
+    return pd.DataFrame({"hours_min": hours_min.astype(float), "hours_max": hours_max.astype(float)}, index=normalized.index)
+
+
+def benchmark_duration_parsing(durations, repeat=3):
+    """
+    Rows per second of `parse_durations` against applying `convert_to_hours` row by row.
+    """
+    import time
+
+    timings = dict()
+    for name, parser in {"convert_to_hours": lambda: durations.apply(convert_to_hours),
+                         "parse_durations": lambda: parse_durations(durations)}.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parser()
+        timings[name] = repeat * len(durations) / (time.perf_counter() - start)
+
+    return timings
+
+
+# availability long table
+ANY_TIME = -1  # available that day without a fixed start time
+DAY_REGEX = re.compile(r"'(\d{1,2})'")
+TIME_LIST_REGEX = re.compile(r"\[([^\[\]]*)\]")
+TIME_REGEX = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+def time_to_minutes(time_value):
+    if isinstance(time_value, str):
+        hours, minutes = time_value.split(":")
+        return int(hours) * 60 + int(minutes)
+    return int(time_value)
+
+
+def _as_list_repr(value):
+    # the scraper returns lists, the CSVs their repr; parse both from the repr, e.g. "[['9:00', '10:00'], []]"
+    if isinstance(value, str):
+        return value
+    return repr(value) if isinstance(value, list) else "[]"
+
+
+def resolve_available_dates(days, date_start):
+    """
+    Turn day-of-month numbers into dates, taking the first date on or after `date_start`
+    with that day, so windows crossing a month end ("28", "29", "01") land in the right month.
+    """
+    date_start = pd.Timestamp(date_start)
+    month_start = date_start.normalize() - pd.Timedelta(days=date_start.day - 1)
+    next_month_start = month_start + pd.offsets.MonthBegin(1)
+
+    days = np.asarray(days)
+    offsets = pd.to_timedelta(days - 1, unit="D")
+    return np.where(days >= date_start.day, month_start + offsets, next_month_start + offsets).astype("datetime64[ns]")
+
+
+def build_availability_table(activities_df, date_start=None):
+    """
+    Explode the `available_days` and `available_times` columns of scraped activities into a long table
+    with one row per activity, day and start time.
+
+    Works on the lists returned by the scraper and on the list reprs stored in the CSVs, which are parsed
+    with whole-column regular expressions instead of `ast.literal_eval` per cell. Start times are stored
+    as minutes since midnight; days without fixed start times get `ANY_TIME`.
+
+    Parameters:
+    - activities_df (pd.DataFrame): Activities with `available_days` and `available_times` columns.
+    - date_start (str): First date of the scraped window (e.g. "2024-10-05"), adds a `date` column when given.
+
+    Returns:
+    - pd.DataFrame: `activity_index` (row position in `activities_df`), `day`, `start_minutes` and optionally `date`.
+    """
+    available_days = [_as_list_repr(value) for value in activities_df["available_days"]]
+    available_times = [_as_list_repr(value) for value in activities_df["available_times"]]
+
+    # one regex pass over the whole column for the values, per-row counts only to rebuild the structure
+    days = np.array(DAY_REGEX.findall("\n".join(available_days)), dtype=int)
+    days_per_activity = [len(DAY_REGEX.findall(value)) for value in available_days]
+
+    # the i-th time list belongs to the i-th day; pad or cut rows where both lists disagree
+    time_lists = list()
+    for value, n_days in zip(available_times, days_per_activity):
+        activity_time_lists = TIME_LIST_REGEX.findall(value.strip()[1:-1])[:n_days]
+        time_lists.extend(activity_time_lists + [""] * (n_days - len(activity_time_lists)))
+
+    times_per_day = np.array([time_list.count(":") for time_list in time_lists], dtype=int)
+    times = np.array(TIME_REGEX.findall("\n".join(time_lists)), dtype=int).reshape(-1, 2)
+
+    rows_per_day = np.maximum(times_per_day, 1)
+    start_minutes = np.full(rows_per_day.sum(), ANY_TIME)
+    start_minutes[np.repeat(times_per_day > 0, rows_per_day)] = times[:, 0] * 60 + times[:, 1]
+
+    availability_df = pd.DataFrame({
+        "activity_index": np.repeat(np.repeat(np.arange(len(available_days)), days_per_activity), rows_per_day).astype("int32"),
+        "day": np.repeat(days, rows_per_day).astype("int8"),
+        "start_minutes": start_minutes.astype("int16"),
+    })
+    if date_start is not None:
+        availability_df["date"] = resolve_available_dates(availability_df["day"].to_numpy(), date_start)
+
+    return availability_df.sort_values(["activity_index", "day", "start_minutes"], ignore_index=True)
+
+
+def filter_availability(availability_df, days=None, start_time=None, end_time=None, include_any_time=True):
+    """
+    Boolean mask of the availability rows on any of `days` (day of month) starting between `start_time`
+    and `end_time` ("HH:MM" or minutes since midnight). Days without fixed start times match any time
+    unless `include_any_time` is False.
+    """
+    start_minutes = availability_df["start_minutes"].to_numpy()
+    mask = np.ones(len(availability_df), dtype=bool)
+
+    if days is not None:
+        mask &= np.isin(availability_df["day"].to_numpy(), np.atleast_1d(days).astype(int))
+
+    in_time_range = np.ones(len(availability_df), dtype=bool)
+    if start_time is not None:
+        in_time_range &= start_minutes >= time_to_minutes(start_time)
+    if end_time is not None:
+        in_time_range &= start_minutes <= time_to_minutes(end_time)
+
+    return mask & np.where(start_minutes == ANY_TIME, include_any_time, in_time_range)
+
+
+def activities_available(availability_df, days=None, start_time=None, end_time=None, include_any_time=True):
+    """
+    Row positions of the activities that can be started on `days` between `start_time` and `end_time`.
+    """
+    mask = filter_availability(availability_df, days, start_time, end_time, include_any_time)
+    return np.unique(availability_df["activity_index"].to_numpy()[mask])
+
+
+def benchmark_availability_loading(activities_df, repeat=3):
+    """
+    Seconds per load of the legacy `ast.literal_eval` parsing against `build_availability_table`
+    on the raw CSV columns.
+    """
+    import ast
+    import time
+
+    loaders = {
+        "literal_eval": lambda: (activities_df["available_days"].apply(ast.literal_eval),
+                                 activities_df["available_times"].apply(ast.literal_eval)),
+        "build_availability_table": lambda: build_availability_table(activities_df),
+    }
+
+    timings = dict()
+    for name, loader in loaders.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            loader()
+        timings[name] = (time.perf_counter() - start) / repeat
+
+    return timings
@@ -1,38 +1,187 @@
-from bs4 import BeautifulSoup
-
-import requests
-
 import pandas as pd
 import numpy as np
 
 import time
+import threading
+import queue
+import itertools
+import collections
+import contextlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
-from selenium import webdriver 
-from webdriver_manager.chrome import ChromeDriverManager  
-from selenium.webdriver.common.keys import Keys  
-from selenium.webdriver.support.ui import Select 
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException 
-
-from geopy.geocoders import Nominatim
-geolocator = Nominatim(user_agent="my-geopy-app")
 import random
 import re
 import datetime
 import json
 import math
-import dotenv
+import hashlib
 import os
-dotenv.load_dotenv()
 
-AIR_SCRAPPER_API_KEY = os.getenv("AIR_SCRAPPER_KEY")
+# selenium, bs4, requests and dotenv are imported on first use, so parser processes and short jobs
+# only pay for what they run; `_load_selenium` fills these names the first time a browser is driven
+webdriver = WebDriverWait = EC = By = TimeoutException = None
+
+
+def _load_selenium():
+    global webdriver, WebDriverWait, EC, By, TimeoutException
+    if webdriver is None:
+        from selenium import webdriver
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+
 
 # import suppor functions
 import sys 
 sys.path.append("..")
+from src.airport_index_support import get_airport_index
+from src.extraction_spec_support import ExtractionPlan, collect_page_errors, record_page_errors
+from src.instrumentation_support import get_tracer, trace_stage, trace_count, trace_fields
+from src.geocoding_support import add_addresses
+from src.data_cleaning_support import resolve_available_dates
 
 ### Flights - air scrapper - API
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+AIR_SCRAPPER_HOST = "sky-scrapper.p.rapidapi.com"
+
+_air_scrapper_client = None
+_air_scrapper_client_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to keep concurrent API calls under the RapidAPI quota.
+
+    Parameters:
+    - rate (float): Tokens added per second (sustained requests per second).
+    - capacity (int): Maximum burst of requests allowed at once.
+    """
+
+    def __init__(self, rate=5, capacity=5):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+def get_air_scrapper_client():
+    """
+    Shared `ApiClient` for the Air Scrapper API, created on first use so every call of a sweep
+    reuses the same pooled connections and RapidAPI headers.
+    """
+    global _air_scrapper_client
+    with _air_scrapper_client_lock:
+        if _air_scrapper_client is None:
+            import dotenv
+            from src.api_client_support import ApiClient
+
+            dotenv.load_dotenv()
+            _air_scrapper_client = ApiClient(headers={"x-rapidapi-key": os.getenv("AIR_SCRAPPER_KEY"),
+                                                      "x-rapidapi-host": AIR_SCRAPPER_HOST})
+    return _air_scrapper_client
+
+
+def request_with_retries(url, headers=None, params=None, max_retries=3, backoff_factor=1, rate_limiter=None, client=None):
+    """
+    GET request that retries with exponential backoff on 429 and 5xx responses, timeouts and dropped connections.
+    A `Retry-After` header, when sent, takes precedence over the computed backoff.
+    Requests go through `client`, the shared Air Scrapper client by default.
+    """
+    import requests
+    client = client or get_air_scrapper_client()
+
+    for attempt in range(max_retries + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
+        try:
+            response = client.get(url, headers=headers, params=params)
+        except (requests.Timeout, requests.ConnectionError):
+            if attempt == max_retries:
+                raise
+            time.sleep(backoff_factor * 2 ** attempt)
+            continue
+
+        if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+            return response
+
+        try:
+            wait_time = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            wait_time = backoff_factor * 2 ** attempt
+        time.sleep(wait_time)
+
+    return response
+
+
+# keys every complete payload of an endpoint has under "data"
+ENDPOINT_REQUIRED_DATA_KEYS = {"searchFlightsComplete": ("itineraries",)}
+
+
+def is_cacheable_payload(endpoint, data):
+    """
+    Whether an API payload is a complete answer worth caching: `status` true, a non-empty `data` with the
+    keys the endpoint always returns, and no "incomplete" search context. Error payloads come back with
+    HTTP 200 too, and caching them would serve a transient failure for the whole TTL.
+    """
+    if not isinstance(data, dict) or data.get("status") is not True or not data.get("data"):
+        return False
+
+    payload_data = data["data"]
+    if isinstance(payload_data, dict):
+        context = payload_data.get("context")
+        if isinstance(context, dict) and context.get("status") == "incomplete":
+            return False
+        if any(key not in payload_data for key in ENDPOINT_REQUIRED_DATA_KEYS.get(endpoint, ())):
+            return False
+
+    return True
+
+
+def request_json(url, headers=None, params=None, cache=None, max_retries=3, backoff_factor=1, rate_limiter=None, client=None):
+    """
+    Request an API endpoint and return `(status_code, json_data)`, serving it from `cache` when possible.
+    Only complete payloads (see `is_cacheable_payload`) are stored, so errors are always retried against the API.
+    """
+    endpoint = url.rstrip("/").split("/")[-1]
+
+    if cache is not None:
+        cached_data = cache.get(endpoint, params)
+        if cached_data is not None and is_cacheable_payload(endpoint, cached_data):
+            trace_count("api_cache_hits")
+            return 200, cached_data
+
+    with trace_stage("api_call", endpoint=endpoint) as event:
+        response = request_with_retries(url, headers=headers, params=params, max_retries=max_retries,
+                                        backoff_factor=backoff_factor, rate_limiter=rate_limiter, client=client)
+        event["status_code"] = response.status_code
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json()
+    if cache is not None and is_cacheable_payload(endpoint, data):
+        cache.set(endpoint, params, data)
+
+    return response.status_code, data
+
+
 def map_airport_codes(dictionary,country):
 
     navigation = dictionary["navigation"]
@@ -65,7 +214,7 @@ def get_country_airport_codes(response_data,country):
     return airport_codes_dict_list
 
 
-def create_country_airport_code_df(list_of_countries):
+def create_country_airport_code_df(list_of_countries, cache=None, client=None, verbose=False):
     
     list_of_countries_airports = list()
 
@@ -75,14 +224,15 @@ def create_country_airport_code_df(list_of_countries):
 
         querystring = {"query": country,"locale":"en-US"}
 
-        headers = {
-            "x-rapidapi-key": AIR_SCRAPPER_API_KEY,
-            "x-rapidapi-host": "sky-scrapper.p.rapidapi.com"
-        }
+        status_code, response_json = request_json(url, params=querystring, cache=cache, client=client)
 
-        response = requests.get(url, headers=headers, params=querystring)
+        # a failed request returns no JSON, an error payload has no "data": skip the country
+        response_data = response_json.get("data") if status_code == 200 and response_json is not None else None
+        if not isinstance(response_data, list):
+            if verbose == True:
+                print(f"Error requesting the airports of {country}: status {status_code}, {response_json}")
+            continue
 
-        response_data = response.json()["data"]
         list_of_countries_airports.extend(get_country_airport_codes(response_data,country))
     
     countries_airports = pd.DataFrame(list_of_countries_airports)
@@ -91,6 +241,151 @@ def create_country_airport_code_df(list_of_countries):
 
 
 
+def resolve_route_params(airport_index, origin_city, destination_city, origin_airport_code=None, destination_airport_code=None):
+    """
+    Build the origin/destination part of a flight search querystring.
+
+    `airport_index` can be an `AirportIndex` or the airport codes DataFrame (indexed once, see `get_airport_index`).
+    Cities resolve to their city entity id; when an airport code is given, that airport is searched instead.
+    """
+    airport_index = get_airport_index(airport_index)
+
+    route_params = dict()
+    for direction, city, airport_code in [("origin", origin_city, origin_airport_code),
+                                          ("destination", destination_city, destination_airport_code)]:
+        sky_id = city
+        entity_id = airport_index.city_entity_id(city)
+
+        if airport_code is not None:
+            airport_entity_id = airport_index.airport_entity_id(airport_code)
+            if airport_entity_id is not None:
+                sky_id, entity_id = airport_code.upper(), airport_entity_id
+
+        if entity_id is None:
+            raise ValueError(f"Unknown {direction} city '{city}'")
+
+        route_params[f"{direction}SkyId"] = sky_id
+        route_params[f"{direction}EntityId"] = entity_id
+
+    return route_params
+
+
+# itinerary JSON paths per output column, in the column order of `extract_flight_info*`.
+# A "price" path is split into amount and currency, "datetime" paths are parsed as dates.
+ITINERARY_FIELD_PATHS_ALLER_RETOUR = {
+    'score': ("float", ('score',)),
+    'price': ("price", ('price', 'formatted')),
+    'price_currency': ("currency", ('price', 'formatted')),
+    'duration_departure': ("int", ('legs', 0, 'durationInMinutes')),
+    'duration_return': ("int", ('legs', 1, 'durationInMinutes')),
+    'stops_departure': ("int", ('legs', 0, 'stopCount')),
+    'stops_return': ("int", ('legs', 1, 'stopCount')),
+    'departure_departure': ("datetime", ('legs', 0, 'departure')),
+    'arrival_departure': ("datetime", ('legs', 0, 'arrival')),
+    'departure_return': ("datetime", ('legs', 1, 'departure')),
+    'arrival_return': ("datetime", ('legs', 1, 'arrival')),
+    'company_departure': ("raw", ('legs', 0, 'carriers', 'marketing', 0, 'name')),
+    'company_return': ("raw", ('legs', 1, 'carriers', 'marketing', 0, 'name')),
+    'self_transfer': ("raw", ('isSelfTransfer',)),
+    'fare_isChangeAllowed': ("raw", ('farePolicy', 'isChangeAllowed')),
+    'fare_isPartiallyChangeable': ("raw", ('farePolicy', 'isPartiallyChangeable')),
+    'fare_isCancellationAllowed': ("raw", ('farePolicy', 'isCancellationAllowed')),
+    'fare_isPartiallyRefundable': ("raw", ('farePolicy', 'isPartiallyRefundable')),
+    'origin_airport_departure': ("raw", ('legs', 0, 'origin', 'name')),
+    'destination_airport_departure': ("raw", ('legs', 0, 'destination', 'name')),
+    'origin_airport_return': ("raw", ('legs', 1, 'origin', 'name')),
+    'destination_airport_return': ("raw", ('legs', 1, 'destination', 'name'))
+}
+
+ITINERARY_FIELD_PATHS = {
+    'duration': ("int", ('legs', 0, 'durationInMinutes')),
+    'price': ("price", ('price', 'formatted')),
+    'price_currency': ("currency", ('price', 'formatted')),
+    'stops': ("int", ('legs', 0, 'stopCount')),
+    'departure': ("datetime", ('legs', 0, 'departure')),
+    'arrival': ("datetime", ('legs', 0, 'arrival')),
+    'company': ("raw", ('legs', 0, 'carriers', 'marketing', 0, 'name')),
+    'self_transfer': ("raw", ('isSelfTransfer',)),
+    'fare_isChangeAllowed': ("raw", ('farePolicy', 'isChangeAllowed')),
+    'fare_isPartiallyChangeable': ("raw", ('farePolicy', 'isPartiallyChangeable')),
+    'fare_isCancellationAllowed': ("raw", ('farePolicy', 'isCancellationAllowed')),
+    'fare_isPartiallyRefundable': ("raw", ('farePolicy', 'isPartiallyRefundable')),
+    'score': ("float", ('score',)),
+    'origin_airport': ("raw", ('legs', 0, 'origin', 'name')),
+    'destination_airport': ("raw", ('legs', 0, 'destination', 'name'))
+}
+
+
+def _json_path_getter(path):
+    def get_value(dictionary):
+        for key in path:
+            dictionary = dictionary[key]
+        return dictionary
+    return get_value
+
+
+# column conversions per kind, applied once to the whole column
+ITINERARY_KIND_CONVERTERS = {
+    "price": lambda values: pd.to_numeric(pd.Series(values, dtype=object)).to_numpy(),
+    "currency": lambda values: np.array(values, dtype=object),
+    "int": lambda values: pd.to_numeric(pd.Series(values, dtype=object)).to_numpy(),
+    "float": lambda values: pd.to_numeric(pd.Series(values, dtype=object)).astype(float).to_numpy(),
+    "datetime": lambda values: pd.to_datetime(pd.Series(values, dtype=object)),
+}
+
+
+def build_itinerary_spec(field_paths):
+    """
+    Turn itinerary JSON paths into an extraction spec: each leg and each formatted price ("1,248 €",
+    split into amount and currency) is looked up once per itinerary and shared by the fields reading it.
+    """
+    intermediates = dict()
+    fields = dict()
+    for column, (kind, path) in field_paths.items():
+        if kind in ("price", "currency"):
+            source = "price_parts_" + "_".join(map(str, path))
+            intermediates[source] = lambda itinerary, shared, get_value=_json_path_getter(path): get_value(itinerary).split(None, 1)
+            extractor = (lambda parts: parts[0].replace(",", "")) if kind == "price" else (lambda parts: parts[1].strip())
+        elif path[0] == "legs" and len(path) > 2:
+            source = f"leg_{path[1]}"
+            intermediates[source] = lambda itinerary, shared, get_value=_json_path_getter(path[:2]): get_value(itinerary)
+            extractor = _json_path_getter(path[2:])
+        else:
+            source = "card"
+            extractor = _json_path_getter(path)
+        fields[column] = (source, extractor)
+
+    converters = {column: ITINERARY_KIND_CONVERTERS[kind] for column, (kind, _) in field_paths.items()
+                  if kind in ITINERARY_KIND_CONVERTERS}
+
+    return {"intermediates": intermediates, "fields": fields, "converters": converters}
+
+
+ITINERARY_PLAN_ALLER_RETOUR = ExtractionPlan(build_itinerary_spec(ITINERARY_FIELD_PATHS_ALLER_RETOUR),
+                                             name="itineraries_aller_retour")
+ITINERARY_PLAN = ExtractionPlan(build_itinerary_spec(ITINERARY_FIELD_PATHS), name="itineraries")
+
+
+def flatten_itineraries(itineraries_dict_list, field_paths):
+    """
+    Flatten the raw `itineraries` list of the flight search API into a DataFrame in one columnar pass.
+
+    Raw values are collected per column with a compiled `ExtractionPlan` (`field_paths` can be one,
+    or a dict of JSON paths compiled on the fly), then each column is converted at once:
+    numbers with `pd.to_numeric`, dates with a single `pd.to_datetime` and the formatted
+    price ("1,248 €") split into amount and currency.
+    Missing fields become NaN, as in `extract_flight_info_aller_retour`.
+    """
+    if len(itineraries_dict_list) == 0:
+        return pd.DataFrame()
+
+    plan = field_paths if isinstance(field_paths, ExtractionPlan) else ExtractionPlan(build_itinerary_spec(field_paths))
+    columns = plan.extract(itineraries_dict_list)
+    trace_fields("flights", columns)
+
+    return pd.DataFrame(columns)
+
+
 def extract_flight_info_aller_retour(flight_dict):
 
     flight_result_dict = {}
@@ -131,7 +426,8 @@ def extract_flight_info_aller_retour(flight_dict):
     return flight_result_dict
 
 def request_flight_itineraries_aller_retour(countries_airports_df,origin_city,destination_city, date_departure, date_return, n_adults= 1, n_children=0, n_infants=0, origin_airport_code=None, 
-                                   destination_airport_code=None, cabin_class="economy",sort_by="best",currency="EUR"):
+                                   destination_airport_code=None, cabin_class="economy",sort_by="best",currency="EUR",
+                                   max_retries=3, backoff_factor=1, rate_limiter=None, cache=None, client=None):
     
     url = "https://sky-scrapper.p.rapidapi.com/api/v2/flights/searchFlightsComplete"
 
@@ -139,31 +435,8 @@ def request_flight_itineraries_aller_retour(countries_airports_df,origin_city,de
 
     cabin_class = cabin_class if cabin_class in cabin_class_list else "economy"
 
-    try:
-        origin_city_id = countries_airports_df.loc[countries_airports_df["city"].str.lower() == origin_city.lower(), "city_entityId"]
-
-        origin_city_id = str(int(origin_city_id.iloc[0]))
-
-    except:
-        pass
-    try:
-        destination_city_id =  countries_airports_df.loc[countries_airports_df["city"].str.lower() == destination_city.lower(), "city_entityId"]
-
-        destination_city_id = str(int(destination_city_id.iloc[0]))
-
-    except:
-        pass
-    
-    if origin_airport_code != None:
-        try:
-            origin_airport_id = str(int(countries_airports_df.loc[countries_airports_df["city"].str.lower() == destination_city,"city_entityId"].unique()))
-        except:
-            pass
-    if destination_airport_code != None:
-        try:
-            destination_airport_id = str(int(countries_airports_df.loc[countries_airports_df["city"].str.lower() == destination_city,"city_entityId"].unique()))
-        except:
-            pass
+    route_params = resolve_route_params(countries_airports_df, origin_city, destination_city,
+                                        origin_airport_code, destination_airport_code)
 
     sort_by_dict = {
         "best": "best",
@@ -177,25 +450,22 @@ def request_flight_itineraries_aller_retour(countries_airports_df,origin_city,de
 
     sort_by = sort_by_dict.get(sort_by,"best")
 
-    querystring = {"originSkyId":origin_city,"destinationSkyId": destination_city,"originEntityId":origin_city_id,
-                "destinationEntityId":destination_city_id,"date": date_departure, "returnDate": date_return,"cabinClass":"economy",
+    querystring = {**route_params,"date": date_departure, "returnDate": date_return,"cabinClass":"economy",
                 "adults":str(n_adults),"childrens":str(n_children),"infants": str(n_infants),"sortBy":sort_by,"currency":currency}
 
 
 
-    headers = {
-        "x-rapidapi-key": AIR_SCRAPPER_API_KEY,
-        "x-rapidapi-host": "sky-scrapper.p.rapidapi.com"
-    }
+    status_code, response_json = request_json(url, params=querystring, cache=cache, max_retries=max_retries,
+                                              backoff_factor=backoff_factor, rate_limiter=rate_limiter, client=client)
+    if status_code != 200 or response_json is None:
+        raise ValueError(f"Flight search failed with status {status_code}")
 
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code == 200:
-        try:
-            itineraries = response.json()["data"]["itineraries"]
-        except:
-            return np.nan
-    else:
-        raise ValueError
+    # error payloads come back with HTTP 200 and no itineraries
+    payload_data = response_json.get("data")
+    itineraries = payload_data.get("itineraries") if isinstance(payload_data, dict) else None
+    if not isinstance(itineraries, list):
+        return np.nan
+    trace_count("itineraries", len(itineraries))
 
 
     return itineraries
@@ -204,12 +474,103 @@ def request_flight_itineraries_aller_retour(countries_airports_df,origin_city,de
 
 def create_itineraries_dataframe_aller_retour(itineraries_dict_list):
 
-    extracted_itinerary_info_list = list()
+    return flatten_itineraries(itineraries_dict_list, ITINERARY_PLAN_ALLER_RETOUR)
 
-    for itinerary in itineraries_dict_list:
-        extracted_itinerary_info_list.append(extract_flight_info_aller_retour(itinerary))
-        
-    return pd.DataFrame(extracted_itinerary_info_list)
+
+def build_flight_query_grid(origin_city, destination_cities, checkins, checkouts, **request_kwargs):
+    """
+    Build the list of round trip queries for every destination and (checkin, checkout) pair.
+    Each query carries its `week` number (1-based position of the date pair) as a label.
+    """
+    return [
+        {"origin_city": origin_city, "destination_city": destination_city,
+         "date_departure": checkin, "date_return": checkout, "week": week, **request_kwargs}
+        for destination_city in destination_cities
+        for week, (checkin, checkout) in enumerate(zip(checkins, checkouts), start=1)
+    ]
+
+
+def request_flight_itineraries_grid(countries_airports_df, queries, max_workers=4, requests_per_second=5, burst=5,
+                                    max_retries=3, backoff_factor=1, label_keys=("week",), cache=None, client=None,
+                                    verbose=False):
+    """
+    Run a grid of round trip flight searches concurrently and gather them into a single DataFrame.
+
+    Parameters:
+    - countries_airports_df (pd.DataFrame or AirportIndex): Airport codes table, as built by `create_country_airport_code_df`,
+      or an `AirportIndex` built from it.
+    - queries (list): Dicts of `request_flight_itineraries_aller_retour` keyword arguments
+      (e.g. from `build_flight_query_grid`).
+    - max_workers (int): Maximum number of searches in flight at the same time.
+    - requests_per_second (float): Sustained request rate allowed by the RapidAPI plan.
+    - burst (int): Maximum number of requests that can be sent at once.
+    - max_retries (int): Retries per query on 429/5xx responses.
+    - backoff_factor (float): Base seconds for the exponential backoff between retries.
+    - label_keys (tuple): Query keys that are not API parameters and are added as columns to the results.
+    - cache (ResponseCache): Optional on-disk response cache shared by all the queries.
+    - client (ApiClient): Pooled HTTP client shared by all the queries. Defaults to `get_air_scrapper_client()`.
+    - verbose (bool): Print the queries that failed.
+
+    Returns:
+    - pd.DataFrame: Itineraries of every query, with the label columns attached.
+    """
+    itineraries_dfs = list()
+    for query, itineraries_df in iter_flight_itineraries_grid(countries_airports_df, queries, max_workers=max_workers,
+                                                              requests_per_second=requests_per_second, burst=burst,
+                                                              max_retries=max_retries, backoff_factor=backoff_factor,
+                                                              label_keys=label_keys, cache=cache, client=client,
+                                                              verbose=verbose):
+        for key in label_keys:
+            if key in query:
+                itineraries_df[key] = query[key]
+        itineraries_dfs.append(itineraries_df)
+
+    if not itineraries_dfs:
+        return pd.DataFrame()
+
+    return pd.concat(itineraries_dfs).reset_index(drop=True)
+
+
+def iter_flight_itineraries_grid(countries_airports_df, queries, max_workers=4, requests_per_second=5, burst=5,
+                                 max_retries=3, backoff_factor=1, label_keys=("week",), cache=None, client=None,
+                                 verbose=False):
+    """
+    Run the searches of `request_flight_itineraries_grid` and yield `(query, itineraries_df)` as each one
+    finishes. At most `2 * max_workers` queries are submitted at a time, so results never pile up in memory.
+    Failed queries are skipped (printed when `verbose`).
+    """
+    rate_limiter = TokenBucket(rate=requests_per_second, capacity=burst)
+
+    countries_airports_df = get_airport_index(countries_airports_df)
+
+    def run_query(query):
+        request_kwargs = {key: value for key, value in query.items() if key not in label_keys}
+        return request_flight_itineraries_aller_retour(countries_airports_df, max_retries=max_retries,
+                                                       backoff_factor=backoff_factor, rate_limiter=rate_limiter,
+                                                       cache=cache, client=client, **request_kwargs)
+
+    queries = iter(queries)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_query = {executor.submit(run_query, query): query for query in itertools.islice(queries, 2 * max_workers)}
+
+        while future_to_query:
+            done, _ = wait(future_to_query, return_when=FIRST_COMPLETED)
+            for future in done:
+                query = future_to_query.pop(future)
+                for next_query in itertools.islice(queries, 1):
+                    future_to_query[executor.submit(run_query, next_query)] = next_query
+
+                try:
+                    itineraries_dict_list = future.result()
+                except Exception as e:
+                    if verbose == True:
+                        print(f"Error requesting {query} due to {e}")
+                    continue
+
+                if not isinstance(itineraries_dict_list, list):
+                    continue
+
+                yield query, create_itineraries_dataframe_aller_retour(itineraries_dict_list)
 
 
 
@@ -246,7 +607,8 @@ def extract_flight_info(flight_dict):
     return flight_result_dict
 
 def request_flight_itineraries(countries_airports_df,origin_city,destination_city, date, n_adults= 1, n_children=0, n_infants=0, origin_airport_code=None, 
-                                   destination_airport_code=None, cabin_class="economy",sort_by="best",currency="EUR"):
+                                   destination_airport_code=None, cabin_class="economy",sort_by="best",currency="EUR",
+                                   max_retries=3, backoff_factor=1, rate_limiter=None, cache=None, client=None):
     
     url = "https://sky-scrapper.p.rapidapi.com/api/v2/flights/searchFlightsComplete"
 
@@ -254,31 +616,8 @@ def request_flight_itineraries(countries_airports_df,origin_city,destination_cit
 
     cabin_class = cabin_class if cabin_class in cabin_class_list else "economy"
 
-    try:
-        origin_city_id = countries_airports_df.loc[countries_airports_df["city"].str.lower() == origin_city.lower(), "city_entityId"]
-
-        origin_city_id = str(int(origin_city_id.iloc[0]))
-
-    except:
-        pass
-    try:
-        destination_city_id =  countries_airports_df.loc[countries_airports_df["city"].str.lower() == destination_city.lower(), "city_entityId"]
-
-        destination_city_id = str(int(destination_city_id.iloc[0]))
-
-    except:
-        pass
-    
-    if origin_airport_code != None:
-        try:
-            origin_airport_id = str(int(countries_airports_df.loc[countries_airports_df["city"].str.lower() == destination_city,"city_entityId"].unique()))
-        except:
-            pass
-    if destination_airport_code != None:
-        try:
-            destination_airport_id = str(int(countries_airports_df.loc[countries_airports_df["city"].str.lower() == destination_city,"city_entityId"].unique()))
-        except:
-            pass
+    route_params = resolve_route_params(countries_airports_df, origin_city, destination_city,
+                                        origin_airport_code, destination_airport_code)
 
     sort_by_dict = {
         "best": "best",
@@ -292,23 +631,20 @@ def request_flight_itineraries(countries_airports_df,origin_city,destination_cit
 
     sort_by = sort_by_dict.get(sort_by,"best")
 
-    querystring = {"originSkyId":origin_city,"destinationSkyId": destination_city,"originEntityId":origin_city_id,
-                "destinationEntityId":destination_city_id,"date": date,"cabinClass":"economy",
+    querystring = {**route_params,"date": date,"cabinClass":"economy",
                 "adults":str(n_adults),"childrens":str(n_children),"infants": str(n_infants),"sortBy":sort_by,"currency":currency}
 
-    headers = {
-        "x-rapidapi-key": AIR_SCRAPPER_API_KEY,
-        "x-rapidapi-host": "sky-scrapper.p.rapidapi.com"
-    }
+    status_code, response_json = request_json(url, params=querystring, cache=cache, max_retries=max_retries,
+                                              backoff_factor=backoff_factor, rate_limiter=rate_limiter, client=client)
+    if status_code != 200 or response_json is None:
+        raise ValueError(f"Flight search failed with status {status_code}")
 
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code == 200:
-        try:
-            itineraries = response.json()["data"]["itineraries"]
-        except:
-            return np.nan
-    else:
-        raise ValueError
+    # error payloads come back with HTTP 200 and no itineraries
+    payload_data = response_json.get("data")
+    itineraries = payload_data.get("itineraries") if isinstance(payload_data, dict) else None
+    if not isinstance(itineraries, list):
+        return np.nan
+    trace_count("itineraries", len(itineraries))
 
 
     return itineraries
@@ -317,12 +653,173 @@ def request_flight_itineraries(countries_airports_df,origin_city,destination_cit
 
 def create_itineraries_dataframe(itineraries_dict_list):
 
-    extracted_itinerary_info_list = list()
+    return flatten_itineraries(itineraries_dict_list, ITINERARY_PLAN)
+
+
+### HTML fetch and parse pipeline
+_FETCH_DONE = object()
+
+
+def fetch_pages_concurrently(jobs, fetch_function, n_fetchers=4, queue_size=16, label_keys=(), verbose=False):
+    """
+    Run `fetch_function(job)` over `jobs` in `n_fetchers` threads and yield `(labels, html)` pairs
+    as soon as each page arrives. Pages wait in a bounded queue, so fetchers pause when parsing lags behind.
+
+    `fetch_function` may return one HTML string or an iterable of them (e.g. paginated results).
+    `labels` holds the `label_keys` values of the job that produced the page.
+    """
+    page_queue = queue.Queue(maxsize=queue_size)
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+
+    def fetcher():
+        while True:
+            try:
+                job = job_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            labels = {key: job[key] for key in label_keys if key in job}
+            try:
+                fetched = fetch_function(job)
+                for html_page in ([fetched] if isinstance(fetched, str) else fetched):
+                    page_queue.put((labels, html_page))
+            except Exception as e:
+                if verbose == True:
+                    print(f"Error fetching {job} due to {e}")
+
+        page_queue.put(_FETCH_DONE)
+
+    threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(n_fetchers)]
+    for thread in threads:
+        thread.start()
+
+    finished_fetchers = 0
+    while finished_fetchers < n_fetchers:
+        item = page_queue.get()
+        if item is _FETCH_DONE:
+            finished_fetchers += 1
+            continue
+        yield item
 
-    for itinerary in itineraries_dict_list:
-        extracted_itinerary_info_list.append(extract_flight_info(itinerary))
-        
-    return pd.DataFrame(extracted_itinerary_info_list)
+
+def merge_column_chunks(column_chunks):
+    """
+    Concatenate the column dicts emitted by the page parsers into a single DataFrame at once.
+    """
+    merged_columns = dict()
+    n_rows = 0
+    for column_chunk in column_chunks:
+        chunk_rows = len(next(iter(column_chunk.values()), []))
+        for key, values in column_chunk.items():
+            # columns missing from earlier chunks (e.g. labels) are padded with NaN
+            merged_columns.setdefault(key, [np.nan] * n_rows).extend(values)
+        n_rows += chunk_rows
+        for values in merged_columns.values():
+            values.extend([np.nan] * (n_rows - len(values)))
+
+    return pd.DataFrame(merged_columns)
+
+
+def _add_labels_to_chunk(column_chunk, labels):
+    n_rows = len(next(iter(column_chunk.values()), []))
+    for key, value in labels.items():
+        column_chunk[key] = [value] * n_rows
+    return column_chunk
+
+
+def _timed_parse(parse_function, html_page, verbose):
+    # runs in the parser process; the timing and the field error counts travel back with the columns,
+    # since the plans of the parser process are copies of the parent's
+    start = time.perf_counter()
+    with collect_page_errors() as page_errors:
+        column_chunk = parse_function(html_page, verbose)
+    return time.perf_counter() - start, column_chunk, page_errors
+
+
+def record_parsed_page(dataset, seconds, column_chunk):
+    n_cards = len(next(iter(column_chunk.values()), []))
+    get_tracer().record_stage("html_parse", seconds, dataset=dataset, cards=n_cards)
+    trace_count("pages")
+    trace_count("cards", n_cards)
+    trace_fields(dataset, column_chunk)
+
+
+def iter_parse_html_pages(pages, parse_function, max_workers=None, max_pending=None, verbose=False):
+    """
+    Parse pages in a process pool while they are still being fetched, yielding `(labels, column_chunk)`
+    in fetch order. At most `max_pending` pages are queued in the pool, so memory stays flat however
+    many pages flow through.
+
+    Parameters:
+    - pages (iterable): `(labels, html)` pairs, e.g. from `fetch_pages_concurrently`, or plain HTML strings.
+    - parse_function (callable): Module level function `(html, verbose) -> dict of columns`,
+      such as `parse_accommodations_html` or `parse_activities_html`.
+    - max_workers (int): Parser processes. Defaults to the number of cores.
+    - max_pending (int): Maximum pages queued in the pool before waiting for results.
+    - verbose (bool): Print scraping errors.
+    """
+    max_workers = max_workers or os.cpu_count()
+    max_pending = max_pending or 2 * max_workers
+    dataset = parse_function.__name__.replace("parse_", "").replace("_html", "")
+
+    def parsed_page(future):
+        seconds, column_chunk, page_errors = future.result()
+        record_page_errors(page_errors)
+        record_parsed_page(dataset, seconds, column_chunk)
+        return column_chunk
+
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for page in pages:
+            labels, html_page = page if isinstance(page, tuple) else ({}, page)
+            pending.append((executor.submit(_timed_parse, parse_function, html_page, verbose), labels))
+
+            while pending and (len(pending) >= max_pending or pending[0][0].done()):
+                future, labels = pending.popleft()
+                yield labels, parsed_page(future)
+
+        while pending:
+            future, labels = pending.popleft()
+            yield labels, parsed_page(future)
+
+
+def parse_html_pages(pages, parse_function, max_workers=None, max_pending=None, verbose=False):
+    """
+    Parse pages in a process pool while they are still being fetched (see `iter_parse_html_pages`).
+
+    Returns:
+    - pd.DataFrame: Rows of every page, in fetch order, with the page labels as columns.
+    """
+    parsed_pages = iter_parse_html_pages(pages, parse_function, max_workers=max_workers, max_pending=max_pending,
+                                         verbose=verbose)
+
+    return merge_column_chunks(_add_labels_to_chunk(column_chunk, labels) for labels, column_chunk in parsed_pages)
+
+
+def iter_fetch_parse_pipeline(jobs, fetch_function, parse_function, n_fetchers=4, n_parsers=None, queue_size=16,
+                              label_keys=(), verbose=False):
+    """
+    Overlap fetching and parsing: `n_fetchers` threads download pages into a bounded queue while
+    `n_parsers` processes parse them. Yields `(labels, column_chunk)` per page.
+    """
+    pages = fetch_pages_concurrently(jobs, fetch_function, n_fetchers=n_fetchers, queue_size=queue_size,
+                                     label_keys=label_keys, verbose=verbose)
+
+    yield from iter_parse_html_pages(pages, parse_function, max_workers=n_parsers, max_pending=queue_size, verbose=verbose)
+
+
+def run_fetch_parse_pipeline(jobs, fetch_function, parse_function, n_fetchers=4, n_parsers=None, queue_size=16,
+                             label_keys=(), verbose=False):
+    """
+    Same as `iter_fetch_parse_pipeline`, with the parsed columns concatenated once at the end.
+    """
+    parsed_pages = iter_fetch_parse_pipeline(jobs, fetch_function, parse_function, n_fetchers=n_fetchers,
+                                             n_parsers=n_parsers, queue_size=queue_size, label_keys=label_keys,
+                                             verbose=verbose)
+
+    return merge_column_chunks(_add_labels_to_chunk(column_chunk, labels) for labels, column_chunk in parsed_pages)
 
 
 ### Acommodations - booking - scraping
@@ -358,7 +855,7 @@ def build_booking_url_full(destination: str, checkin: str, checkout: str, adults
     url = f"{base_url}ss={destination}&checkin={checkin}&checkout={checkout}&group_adults={adults}&group_children={children}"
     
     if rooms is not None:
-       url.append(f"&no_rooms={rooms}")
+       url += f"&no_rooms={rooms}"
     
     if min_price is not None and max_price is not None:
         price_filter = f"price%3DEUR-{min_price}-{max_price}-1"
@@ -405,78 +902,572 @@ def build_booking_url_full(destination: str, checkin: str, checkout: str, adults
     
     return url
 
+def locate_accommodation_nodes(card):
+    # every subtree used by the field scrapers is searched once per card
+    review_score = card.find("div",{"data-testid": "review-score"})
+    return {
+        "title": card.find("div",{"data-testid":"title"}),
+        "title_link": card.find("a",{"data-testid":"title-link"}),
+        "price": card.find("span",{"data-testid":"price-and-discounted-price"}),
+        "distance": card.find("span",{"data-testid":"distance"}),
+        "review_blocks": review_score.find_all("div",recursive=False) if review_score else None,
+        "metro": card.find("span",{"class":"f419a93f12"}),
+        "sustainability": card.find("span",{"class":"abf093bdfe e6208ee469 f68ecd98ea"}),
+        "room_type": card.find("h4",{"class":"abf093bdfe e8f7c070a7"}),
+        "room_texts": [element.text for element in card.find_all("div",{"class":"abf093bdfe"})],
+        "policy_texts": [element.text for element in card.find_all("div",{"class":"abf093bdfe d068504c75"})],
+        "location_score": card.find("span",{"class":"a3332d346a"}),
+        "taxi_texts": [element.text for element in card.find_all("div",{"span":"b30f8eb2d6"})]
+    }
+
+
+def review_block_value(review_blocks, index):
+    return review_blocks[index].find("div").next_sibling.text
+
+
+# field scrapers over the located nodes, shared by the bs4 and lxml backends
+accommodation_scraper_dict = {
+    "name": lambda nodes: nodes["title"].text,
+    "url": lambda nodes: nodes["title_link"]["href"],
+    "price_currency": lambda nodes: nodes["price"].text.split()[0],
+    "total_price_amount": lambda nodes: nodes["price"].text.split()[1].replace(".","").replace(",","."),
+    "distance_city_center_km": lambda nodes: nodes["distance"].text.split()[1].replace(".","").replace(",","."),
+    "score": lambda nodes: nodes["review_value"](nodes["review_blocks"], 0).strip().replace(",","."),
+    "n_comments": lambda nodes: nodes["review_value"](nodes["review_blocks"], 1).strip().split()[0].replace(".",""),
+    "close_to_metro": lambda nodes: "Yes" if nodes["metro"] else "No",
+    "sustainability_cert": lambda nodes: "Yes" if nodes["sustainability"] else "No",
+    "room_type": lambda nodes: nodes["room_type"].text,
+    "double_bed": lambda nodes: "Yes" if any(["doble" in text for text in nodes["room_texts"]]) else "No",
+    "single_bed": lambda nodes: "Yes" if any(["individual" in text for text in nodes["room_texts"]]) else "No",
+    "free_cancellation": lambda nodes: "Yes" if any([text == "Cancelación gratis" for text in nodes["policy_texts"]]) else "No",
+    "breakfast_included": lambda nodes: "Yes" if any([text == "Cancelación gratis" for text in nodes["policy_texts"]]) else "No",
+    "pay_at_hotel": lambda nodes: "Yes" if any(['Sin pago por adelantado' in text for text in nodes["policy_texts"]]) else "No",
+    "location_score": lambda nodes: nodes["location_score"].text.split()[1].replace(",","."),
+    "free_taxi": lambda nodes: "Yes" if any(["taxi gratis" in text.lower() for text in nodes["taxi_texts"]]) else "No"
+}
+
+
+def build_accommodation_spec(locate_nodes, review_value):
+    # every field reads the nodes located once per card by the backend
+    return {
+        "intermediates": {"nodes": lambda card, shared: {**locate_nodes(card), "review_value": review_value}},
+        "fields": {key: ("nodes", accommodation_scraper_function)
+                   for key, accommodation_scraper_function in accommodation_scraper_dict.items()}
+    }
+
+
+def scrape_accommodation_cards(cards, plan, verbose=False):
+    return plan.extract(cards, verbose=verbose)
+
+
 def scrape_accommodations_from_page(page_soup, verbose=False):
-    accommodation_scraper_dict = {
-        "name": lambda card: card.find("div",{"data-testid":"title"}).text,
-        "url": lambda card: card.find("a",{"data-testid":"title-link"})["href"],
-        "price_currency": lambda card: card.find("span",{"data-testid":"price-and-discounted-price"}).text.split()[0],
-        "total_price_amount": lambda card: card.find("span",{"data-testid":"price-and-discounted-price"}).text.split()[1].replace(".","").replace(",","."),
-        "distance_city_center_km": lambda card: card.find("span",{"data-testid":"distance"}).text.split()[1].replace(".","").replace(",","."),
-        "score": lambda card: card.find("div",{"data-testid": "review-score"}).find_all("div",recursive=False)[0].find("div").next_sibling.text.strip().replace(",","."),
-        "n_comments": lambda card: card.find("div",{"data-testid": "review-score"}).find_all("div",recursive=False)[1].find("div").next_sibling.text.strip().split()[0].replace(".",""),
-        "close_to_metro": lambda card: "Yes" if card.find("span",{"class":"f419a93f12"}) else "No",
-        "sustainability_cert": lambda card: "Yes" if card.find("span",{"class":"abf093bdfe e6208ee469 f68ecd98ea"}) else "No",
-        "room_type": lambda card: card.find("h4",{"class":"abf093bdfe e8f7c070a7"}).text,
-        "double_bed": lambda card: "Yes" if any(["doble" in element.text for element in card.find_all("div",{"class":"abf093bdfe"})]) else "No",
-        "single_bed": lambda card: "Yes" if any(["individual" in element.text for element in card.find_all("div",{"class":"abf093bdfe"})]) else "No",
-        "free_cancellation": lambda card: "Yes" if any([element.text == "Cancelación gratis" for element in card.find_all("div",{"class":"abf093bdfe d068504c75"})]) else "No",
-        "breakfast_included": lambda card: "Yes" if any([element.text == "Cancelación gratis" for element in card.find_all("div",{"class":"abf093bdfe d068504c75"})]) else "No",
-        "pay_at_hotel": lambda card: "Yes" if any(['Sin pago por adelantado' in element.text for element in card.find_all("div",{"class":"abf093bdfe d068504c75"})]) else "No",
-        "location_score": lambda card: card.find("span",{"class":"a3332d346a"}).text.split()[1].replace(",","."),
-        "free_taxi": lambda card: "Yes" if any(["taxi gratis" in element.text.lower() for element in card.find_all("div",{"span":"b30f8eb2d6"})]) else "No"
+    return scrape_accommodation_cards(page_soup.findAll("div", {"aria-label":"Alojamiento"}),
+                                      ACCOMMODATION_PLANS["bs4"], verbose=verbose)
+
+
+# lxml backend: same fields, located with precompiled XPath expressions
+_LXML_XPATHS = None
+
+
+def _has_class(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def get_lxml_xpaths():
+    global _LXML_XPATHS
+    if _LXML_XPATHS is None:
+        from lxml import etree
+        xpath_expressions = {
+            "cards": "//div[@aria-label='Alojamiento']",
+            "title": ".//div[@data-testid='title']",
+            "title_link": ".//a[@data-testid='title-link']",
+            "price": ".//span[@data-testid='price-and-discounted-price']",
+            "distance": ".//span[@data-testid='distance']",
+            "review_blocks": "(.//div[@data-testid='review-score'])[1]/div",
+            "metro": f".//span[{_has_class('f419a93f12')}]",
+            "sustainability": ".//span[@class='abf093bdfe e6208ee469 f68ecd98ea']",
+            "room_type": ".//h4[@class='abf093bdfe e8f7c070a7']",
+            "room_divs": f".//div[{_has_class('abf093bdfe')}]",
+            "policy_divs": ".//div[@class='abf093bdfe d068504c75']",
+            "location_score": f".//span[{_has_class('a3332d346a')}]",
+            "taxi_divs": ".//div[@span='b30f8eb2d6']"
+        }
+        _LXML_XPATHS = {key: etree.XPath(expression) for key, expression in xpath_expressions.items()}
+    return _LXML_XPATHS
+
+
+class LxmlNode:
+    # minimal BeautifulSoup-like view (.text, ["attr"]) over an lxml element
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+
+    @property
+    def text(self):
+        return self.element.text_content()
+
+    def __getitem__(self, attribute):
+        return self.element.attrib[attribute]
+
+
+def _first_lxml_node(xpath, card):
+    elements = xpath(card)
+    return LxmlNode(elements[0]) if elements else None
+
+
+def locate_accommodation_nodes_lxml(card):
+    xpaths = get_lxml_xpaths()
+    return {
+        "title": _first_lxml_node(xpaths["title"], card),
+        "title_link": _first_lxml_node(xpaths["title_link"], card),
+        "price": _first_lxml_node(xpaths["price"], card),
+        "distance": _first_lxml_node(xpaths["distance"], card),
+        "review_blocks": xpaths["review_blocks"](card) or None,
+        "metro": _first_lxml_node(xpaths["metro"], card),
+        "sustainability": _first_lxml_node(xpaths["sustainability"], card),
+        "room_type": _first_lxml_node(xpaths["room_type"], card),
+        "room_texts": [element.text_content() for element in xpaths["room_divs"](card)],
+        "policy_texts": [element.text_content() for element in xpaths["policy_divs"](card)],
+        "location_score": _first_lxml_node(xpaths["location_score"], card),
+        "taxi_texts": [element.text_content() for element in xpaths["taxi_divs"](card)]
     }
 
-    accommodation_data_dict = {key: [] for key in accommodation_scraper_dict}
 
-    for accommodation_card in page_soup.findAll("div", {"aria-label":"Alojamiento"}):
-            for key, accommodation_scraper_function in accommodation_scraper_dict.items():
-                try:
-                    accommodation_data_dict[key].append(accommodation_scraper_function(accommodation_card))
-                except Exception as e:
-                    if verbose == True:
-                        print(f"Error filling {key} due to {e}")
-                    accommodation_data_dict[key].append(np.nan)
+def review_block_value_lxml(review_blocks, index):
+    # mirrors `.find("div").next_sibling.text`: the sibling is either the text after the div or the next element
+    first_div = review_blocks[index].iterdescendants("div")
+    first_div = next(first_div)
+    if first_div.tail:
+        return first_div.tail
+    return first_div.getnext().text_content()
+
+
+ACCOMMODATION_PLANS = {
+    "bs4": ExtractionPlan(build_accommodation_spec(locate_accommodation_nodes, review_block_value), name="accommodations_bs4"),
+    "lxml": ExtractionPlan(build_accommodation_spec(locate_accommodation_nodes_lxml, review_block_value_lxml),
+                           name="accommodations_lxml"),
+}
+
+
+def scrape_accommodations_from_html(html_page, verbose=False, backend="bs4"):
+    """
+    Scrape the accommodation cards of a Booking.com results page with the chosen parser backend.
+
+    Parameters:
+    - html_page (str): Raw page HTML.
+    - verbose (bool): Print the fields that could not be filled.
+    - backend (str): "bs4" (BeautifulSoup with html.parser) or "lxml" (precompiled XPath, requires lxml).
 
-    return accommodation_data_dict
+    Returns:
+    - dict: Column lists, identical for both backends.
+    """
+    if backend == "lxml":
+        from lxml import html as lxml_html
+        page_tree = lxml_html.fromstring(html_page)
+        return scrape_accommodation_cards(get_lxml_xpaths()["cards"](page_tree), ACCOMMODATION_PLANS["lxml"],
+                                          verbose=verbose)
+
+    from bs4 import BeautifulSoup
+    page_soup = BeautifulSoup(html_page, "html.parser")
+    return scrape_accommodations_from_page(page_soup, verbose=verbose)
+
+
+def get_default_parser_backend():
+    try:
+        import lxml
+        return "lxml"
+    except ImportError:
+        return "bs4"
+
+
+def parse_accommodations_html(html_page, verbose=False, backend=None):
+    return scrape_accommodations_from_html(html_page, verbose=verbose, backend=backend or get_default_parser_backend())
+
+
+def benchmark_parser_backends(html_pages, backends=("bs4", "lxml"), repeat=3):
+    """
+    Measure pages parsed per second by each accommodation parser backend over saved result pages.
+    """
+    pages_per_second = dict()
+    for backend in backends:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html_page in html_pages:
+                scrape_accommodations_from_html(html_page, backend=backend)
+        pages_per_second[backend] = repeat * len(html_pages) / (time.perf_counter() - start)
+
+    return pages_per_second
 
 
 # dynamic html loading functions
-def scroll_to_bottom(driver):
-    last_height = driver.execute_script("return window.pageYOffset")
+# fixed sleeps of the previous scroll/load loop, used to report the idle wait removed per page
+LEGACY_PAGE_SLEEP_SECONDS = 1
+LEGACY_SCROLL_SLEEP_SECONDS = 0.2
+
+BOOKING_CARD_SELECTOR = 'div[aria-label="Alojamiento"]'
+# "xpath" is the value of `By.XPATH`
+BOOKING_LOAD_MORE_LOCATOR = ("xpath", '//button[.//span[contains(normalize-space(.), "Cargar más resultados")]]')
+# absolute paths break with any layout change, so they are only checked once the text locator has timed out
+BOOKING_LOAD_MORE_FALLBACK_LOCATORS = [
+    ("xpath", '//*[@id="bodyconstraint-inner"]/div[2]/div/div[2]/div[3]/div[2]/div[2]/div[3]/div[*]/button')
+]
+
+# counts cards appended to the DOM and the time of the last change, so waits can poll a variable
+CARD_OBSERVER_SCRIPT = """
+const selector = arguments[0];
+window.__appendedCards = 0;
+window.__lastCardMutation = performance.now();
+if (window.__cardObserver) { window.__cardObserver.disconnect(); }
+window.__cardObserver = new MutationObserver((mutations) => {
+    for (const mutation of mutations) {
+        for (const node of mutation.addedNodes) {
+            if (node.nodeType !== 1) { continue; }
+            const added = (node.matches(selector) ? 1 : 0) + node.querySelectorAll(selector).length;
+            if (added > 0) {
+                window.__appendedCards += added;
+                window.__lastCardMutation = performance.now();
+            }
+        }
+    }
+});
+window.__cardObserver.observe(document.body, {childList: true, subtree: true});
+return document.querySelectorAll(selector).length;
+"""
 
-    while True:
 
-        driver.execute_script('window.scrollBy(0, 2000)')
-        time.sleep(0.2)
-        
-        new_height =  driver.execute_script("return window.pageYOffset")
-        if new_height == last_height:
-            break
-        last_height = new_height
+def wait_for_elements(driver, css_selectors, timeout=20, poll_frequency=0.1):
+    """
+    Wait until every CSS selector is present in the page. Returns True when all showed up before `timeout`.
+    """
+    _load_selenium()
+    try:
+        for css_selector in css_selectors:
+            WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)))
+    except TimeoutException:
+        return False
+    return True
+
+
+def install_card_observer(driver, card_selector):
+    return driver.execute_script(CARD_OBSERVER_SCRIPT, card_selector)
+
+
+def count_cards(driver, card_selector):
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length", card_selector)
+
+
+def wait_for_new_cards(driver, appended_before, timeout=10, poll_frequency=0.05):
+    """
+    Wait until the card observer reports cards appended after `appended_before`. Returns True if they arrived.
+    """
+    _load_selenium()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+            lambda driver: driver.execute_script("return window.__appendedCards") > appended_before)
+    except TimeoutException:
+        return False
+    return True
+
+
+def wait_for_card_count_convergence(driver, quiet_seconds=0.5, timeout=10, poll_frequency=0.1):
+    """
+    Wait until no card has been appended for `quiet_seconds`, i.e. the result list stopped growing.
+    """
+    _load_selenium()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+            lambda driver: driver.execute_script("return performance.now() - window.__lastCardMutation") >= quiet_seconds * 1000)
+    except TimeoutException:
+        return False
+    return True
+
+
+def load_page(driver, url, ready_selectors=(), timeout=20, scroll_pixels=None, page_timings=None):
+    """
+    Open `url` and wait until `ready_selectors` are present, recording how long each step took.
+    `scroll_pixels` scrolls down first, to trigger lazily loaded sections.
+    """
+    with trace_stage("page_load", url=url) as event:
+        start = time.perf_counter()
+        driver.get(url)
+        loaded = time.perf_counter()
+
+        if scroll_pixels:
+            driver.execute_script(f"window.scrollBy(0, {scroll_pixels})")
+        ready = wait_for_elements(driver, ready_selectors, timeout=timeout)
+        event["ready"] = ready
+
+    if page_timings is not None:
+        page_timings.append({"url": url, "get_seconds": loaded - start, "ready_seconds": time.perf_counter() - loaded,
+                             "ready": ready, "legacy_sleep_seconds": LEGACY_PAGE_SLEEP_SECONDS})
+    return ready
+
+
+def scroll_to_bottom(driver):
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
 
 def scroll_back_up(driver):
     driver.execute_script('window.scrollBy(0, -600)')
-    time.sleep(0.2)
 
-def click_load_more(driver, css_selector):
-    try:
-        button = driver.find_element("xpath",'//*[@id="bodyconstraint-inner"]/div[2]/div/div[2]/div[3]/div[2]/div[2]/div[3]/div[*]/button')
-        button.click()
-        return True
-    except:
-        return print("'Load more' not found")
+def click_load_more(driver, css_selector=None, timeout=1, verbose=False):
+    """
+    Click the "load more" button, waiting up to `timeout` seconds for it by its text.
+
+    `css_selector` and the absolute XPaths of `BOOKING_LOAD_MORE_FALLBACK_LOCATORS` are only checked,
+    without waiting again, when the text-based locator finds nothing.
+
+    Returns:
+    - bool: Whether a button was clicked.
+    """
+    _load_selenium()
+    fallback_locators = ([(By.CSS_SELECTOR, css_selector)] if css_selector else []) + BOOKING_LOAD_MORE_FALLBACK_LOCATORS
+    for locator, locator_timeout in [(BOOKING_LOAD_MORE_LOCATOR, timeout)] + [(locator, 0) for locator in fallback_locators]:
+        try:
+            button = WebDriverWait(driver, locator_timeout).until(EC.element_to_be_clickable(locator))
+            driver.execute_script("arguments[0].click()", button)
+            return True
+        except Exception:
+            continue
+
+    if verbose == True:
+        print("'Load more' not found")
+    return False
+
+def scroll_and_click_cycle(driver, css_selector=None, card_selector=BOOKING_CARD_SELECTOR, timeout=10, verbose=False):
+    """
+    Scroll and click "load more" until the button disappears, waiting on appended cards instead of fixed sleeps.
+
+    Returns:
+    - dict: Cycles run, final card count, seconds spent waiting for cards and the fixed sleep time the old loop would have spent.
+    """
+    start = time.perf_counter()
+    initial_cards = install_card_observer(driver, card_selector)
+    appended_cards = 0
+    wait_seconds = 0
+    cycles = 0
 
-def scroll_and_click_cycle(driver, css_selector):
     while True:
         scroll_to_bottom(driver)
         scroll_back_up(driver)
-        if not click_load_more(driver, css_selector):
+        if not click_load_more(driver, css_selector, verbose=verbose):
             break
+        cycles += 1
 
+        wait_start = time.perf_counter()
+        if not wait_for_new_cards(driver, appended_cards, timeout=timeout):
+            break
+        wait_for_card_count_convergence(driver, timeout=timeout)
+        wait_seconds += time.perf_counter() - wait_start
+        appended_cards = driver.execute_script("return window.__appendedCards")
 
-def extract_all_accommodations(destination: str, checkin: str, checkout: str, adults: int = 1, children: int = 0,
-                           rooms: int = 1, min_price: int = 1, max_price: int = 1, star_ratings: list = None, 
-                           meal_plan: str = None, review_score: list = None, max_distance_meters: int = None, verbose=False):
+    return {"cycles": cycles, "cards": initial_cards + appended_cards, "wait_seconds": wait_seconds,
+            "total_seconds": time.perf_counter() - start,
+            # previous loop: >= 2 scroll steps of 0.2s plus 0.2s scrolling back up per cycle
+            "legacy_sleep_seconds": (cycles + 1) * 3 * LEGACY_SCROLL_SLEEP_SECONDS}
+
+
+def summarize_page_timings(page_timings):
+    """
+    Per-page timing table with the fixed sleep time each page no longer spends idle.
+    """
+    page_timings_df = pd.DataFrame(page_timings)
+    if page_timings_df.empty:
+        return page_timings_df
+
+    measured_columns = [column for column in ["get_seconds", "ready_seconds", "total_seconds"] if column in page_timings_df]
+    page_timings_df["measured_seconds"] = page_timings_df[measured_columns].fillna(0).sum(axis=1)
+    return page_timings_df
+
+
+def create_chrome_driver(headless=True):
+    _load_selenium()
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1920,1080")
+
+    return webdriver.Chrome(options=options)
+
+
+class BrowserPool:
+    """
+    Pool of reusable browser drivers shared by concurrent scraping jobs.
+
+    Drivers are created lazily, handed to one job at a time and recycled (quit and
+    recreated) after `pages_per_driver` searches or when a job fails with them.
+
+    Parameters:
+    - n_drivers (int): Number of drivers kept alive at the same time.
+    - pages_per_driver (int): Searches served by a driver before it is recycled.
+    - driver_factory (callable): Function returning a new driver. Defaults to a headless Chrome.
+    - headless (bool): Run the default Chrome drivers without a window.
+    """
+
+    def __init__(self, n_drivers=4, pages_per_driver=20, driver_factory=None, headless=True):
+        self.n_drivers = n_drivers
+        self.pages_per_driver = pages_per_driver
+        self.driver_factory = driver_factory or (lambda: create_chrome_driver(headless=headless))
+        self.slots = queue.Queue()
+        self.stats = {"drivers_started": 0, "drivers_recycled": 0, "pages": 0}
+        self.stats_lock = threading.Lock()
+
+        for _ in range(n_drivers):
+            self.slots.put({"driver": None, "pages": 0})
+
+    def _quit_driver(self, slot):
+        if slot["driver"] is not None:
+            try:
+                slot["driver"].quit()
+            except Exception:
+                pass
+        slot["driver"] = None
+        slot["pages"] = 0
+
+    @contextmanager
+    def driver(self):
+        slot = self.slots.get()
+        try:
+            if slot["driver"] is not None and slot["pages"] >= self.pages_per_driver:
+                self._quit_driver(slot)
+                with self.stats_lock:
+                    self.stats["drivers_recycled"] += 1
+
+            if slot["driver"] is None:
+                with trace_stage("driver_startup"):
+                    slot["driver"] = self.driver_factory()
+                with self.stats_lock:
+                    self.stats["drivers_started"] += 1
+
+            try:
+                yield slot["driver"]
+            except Exception:
+                self._quit_driver(slot)
+                raise
+
+            slot["pages"] += 1
+            with self.stats_lock:
+                self.stats["pages"] += 1
+        finally:
+            self.slots.put(slot)
+
+    def close(self):
+        for _ in range(self.n_drivers):
+            slot = self.slots.get()
+            self._quit_driver(slot)
+        for _ in range(self.n_drivers):
+            self.slots.put({"driver": None, "pages": 0})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_party_type(adults, children):
+    if adults == 1 and children == 0:
+        return "solitary"
+    elif adults == 2 and children == 2:
+        return "two people"
+    elif adults == 2 and children == 0:
+        return "couple"
+    return "friends"
+
+
+def build_accommodation_search_jobs(destination_cities, checkins, checkouts, n_adults, n_children, **search_filters):
+    """
+    Build the `extract_all_accommodations` parameter sets for every destination, week and party size.
+    Each job is labelled with its `week` (1-based position of the date pair) and party `type`.
+    """
+    return [
+        {"destination": destination_city, "checkin": checkin, "checkout": checkout, "adults": adults,
+         "children": children, "week": week, "type": get_party_type(adults, children), **search_filters}
+        for destination_city in destination_cities
+        for week, (checkin, checkout) in enumerate(zip(checkins, checkouts), start=1)
+        for adults, children in zip(n_adults, n_children)
+    ]
+
+
+def extract_accommodations_batch(jobs, n_drivers=4, pages_per_driver=20, driver_factory=None, headless=True,
+                                 n_parsers=None, label_keys=("week", "type"), fetch_mode="browser", requests_per_second=2,
+                                 page_workers=4, verbose=False):
+    """
+    Run many Booking.com searches over a pool of reused browser drivers and merge them into one DataFrame.
+    Pages are parsed in a process pool while the browsers keep fetching the next searches.
+
+    Parameters:
+    - jobs (list): Dicts of `extract_all_accommodations` keyword arguments (e.g. from `build_accommodation_search_jobs`).
+    - n_drivers (int): Number of browsers searching at the same time.
+    - pages_per_driver (int): Searches served by a browser before it is recycled.
+    - driver_factory (callable): Function returning a new driver. Defaults to a headless Chrome.
+    - headless (bool): Run the default Chrome drivers without a window.
+    - n_parsers (int): Parser processes. Defaults to the number of cores.
+    - label_keys (tuple): Job keys that are not search parameters and are added as columns to the results.
+    - fetch_mode (str): "browser" loads each search in Chrome, "http" requests the result pages directly
+      (see `fetch_accommodations_pages_http`), using the browsers only for pages that need rendering.
+    - requests_per_second (float): Result pages requested per second over all searches in "http" mode.
+    - page_workers (int): Result pages of one search requested at the same time in "http" mode.
+    - verbose (bool): Print failed searches and scraping errors.
+
+    Returns:
+    - pd.DataFrame: Accommodations of every search, with the label columns attached.
+    """
+    searches = iter_accommodations_batch(jobs, n_drivers=n_drivers, pages_per_driver=pages_per_driver,
+                                         driver_factory=driver_factory, headless=headless, n_parsers=n_parsers,
+                                         label_keys=label_keys, fetch_mode=fetch_mode,
+                                         requests_per_second=requests_per_second, page_workers=page_workers,
+                                         verbose=verbose)
+
+    return merge_column_chunks(_add_labels_to_chunk(column_chunk, {key: job[key] for key in label_keys if key in job})
+                               for job, column_chunk in searches)
+
+
+def iter_accommodations_batch(jobs, n_drivers=4, pages_per_driver=20, driver_factory=None, headless=True,
+                              n_parsers=None, label_keys=("week", "type"), fetch_mode="browser", requests_per_second=2,
+                              page_workers=4, verbose=False):
+    """
+    Run the searches of `extract_accommodations_batch`, yielding `(job, column_chunk)` as soon as all the
+    result pages of each search are parsed. `label_keys` are the job keys that are not search parameters.
+    """
+    jobs = list(jobs)
+    rate_limiter = TokenBucket(rate=requests_per_second, capacity=max(1, page_workers))
+    page_counts = dict()
+
+    with BrowserPool(n_drivers=n_drivers, pages_per_driver=pages_per_driver,
+                     driver_factory=driver_factory, headless=headless) as browser_pool:
+
+        def fetch_job(job):
+            search_kwargs = {key: value for key, value in jobs[job["job"]].items() if key not in label_keys}
+            if fetch_mode == "http":
+                html_pages = fetch_accommodations_pages_http(**search_kwargs, rate_limiter=rate_limiter,
+                                                             page_workers=page_workers,
+                                                             driver_context=browser_pool.driver, verbose=verbose)
+            else:
+                with browser_pool.driver() as driver:
+                    html_pages = [fetch_accommodations_html(**search_kwargs, driver=driver)]
+            # known before the pages are queued, so the search is complete once this many are parsed
+            page_counts[job["job"]] = len(html_pages)
+            return html_pages
+
+        parsed_pages = iter_fetch_parse_pipeline([{"job": index} for index in range(len(jobs))], fetch_job,
+                                                 parse_accommodations_html, n_fetchers=n_drivers, n_parsers=n_parsers,
+                                                 queue_size=2 * n_drivers, label_keys=("job",), verbose=verbose)
+        job_chunks = collections.defaultdict(list)
+        for labels, column_chunk in parsed_pages:
+            job_index = labels["job"]
+            job_chunks[job_index].append(column_chunk)
+            if len(job_chunks[job_index]) == page_counts[job_index]:
+                column_chunks = job_chunks.pop(job_index)
+                yield jobs[job_index], {key: [value for chunk in column_chunks for value in chunk[key]]
+                                        for key in column_chunks[0]}
+
+
+def fetch_accommodations_html(destination: str, checkin: str, checkout: str, adults: int = 1, children: int = 0,
+                              rooms: int = 1, min_price: int = 1, max_price: int = 1, star_ratings: list = None, 
+                              meal_plan: str = None, review_score: list = None, max_distance_meters: int = None,
+                              driver=None, page_timings=None):
     accommodation_link = build_booking_url_full(
         destination=destination,
         checkin=checkin,
@@ -491,175 +1482,580 @@ def extract_all_accommodations(destination: str, checkin: str, checkout: str, ad
         max_distance_meters=max_distance_meters 
     )
 
-    # open driver
-    driver = webdriver.Chrome()
-    driver.maximize_window()
-    driver.get(accommodation_link)
+    # open driver, unless a pooled one is lent by the caller
+    own_driver = driver is None
+    if own_driver:
+        _load_selenium()
+        with trace_stage("driver_startup"):
+            driver = webdriver.Chrome()
+            driver.maximize_window()
 
-    # scroll and load more until bottom
-    css_selector = "#bodyconstraint-inner > div:nth-child(8) > div > div.af5895d4b2 > div.df7e6ba27d > div.bcbf33c5c3 > div.dcf496a7b9.bb2746aad9 > div.d4924c9e74 > div.c82435a4b8.f581fde0b8 > button"
-    scroll_and_click_cycle(driver, css_selector)
+    try:
+        load_page(driver, accommodation_link, ready_selectors=[BOOKING_CARD_SELECTOR], page_timings=page_timings)
 
-    # parse and get accommodations info
-    html_page = driver.page_source
+        # scroll and load more until bottom
+        css_selector = "#bodyconstraint-inner > div:nth-child(8) > div > div.af5895d4b2 > div.df7e6ba27d > div.bcbf33c5c3 > div.dcf496a7b9.bb2746aad9 > div.d4924c9e74 > div.c82435a4b8.f581fde0b8 > button"
+        with trace_stage("load_more") as event:
+            cycle_timings = scroll_and_click_cycle(driver, css_selector)
+            event.update(cycles=cycle_timings["cycles"], cards=cycle_timings["cards"])
+        if page_timings is not None:
+            page_timings[-1].update(cycle_timings)
 
-    page_soup = BeautifulSoup(html_page, "html.parser")
-    
-    total_accommodation_df = pd.DataFrame(scrape_accommodations_from_page(page_soup,verbose=verbose))
+        # parse and get accommodations info
+        html_page = driver.page_source
+    finally:
+        if own_driver:
+            driver.quit()
+
+    return html_page
+
+
+# browserless fetch: offset paginated result pages requested over a pooled HTTP client
+BOOKING_PAGE_SIZE = 25
+# Booking lists at most 1000 results per search
+BOOKING_MAX_PAGES = 40
+BOOKING_RESULTS_COUNT_REGEX = re.compile(r"([\d.,]+)\s+alojamientos? encontrados?")
+BOOKING_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "es-ES,es;q=0.9",
+}
+
+_booking_client = None
+_booking_client_lock = threading.Lock()
+
+
+def get_booking_client():
+    # shared like the Air Scrapper client, so every result page of a sweep reuses the same connections
+    global _booking_client
+    with _booking_client_lock:
+        if _booking_client is None:
+            from src.api_client_support import ApiClient
+            _booking_client = ApiClient(headers=BOOKING_HTTP_HEADERS, timeout=(10, 30))
+    return _booking_client
+
+
+def count_booking_cards(html_page):
+    return html_page.count('aria-label="Alojamiento"')
+
+
+def get_booking_results_count(html_page):
+    match = BOOKING_RESULTS_COUNT_REGEX.search(html_page)
+    return int(re.sub(r"[.,]", "", match.group(1))) if match else None
+
+
+@contextmanager
+def own_chrome_driver(headless=True):
+    with trace_stage("driver_startup"):
+        driver = create_chrome_driver(headless=headless)
+    try:
+        yield driver
+    finally:
+        driver.quit()
+
+
+def fetch_accommodations_pages_http(destination: str, checkin: str, checkout: str, adults: int = 1, children: int = 0,
+                                    rooms: int = 1, min_price: int = 1, max_price: int = 1, star_ratings: list = None,
+                                    meal_plan: str = None, review_score: list = None, max_distance_meters: int = None,
+                                    client=None, rate_limiter=None, page_workers=4, max_pages=BOOKING_MAX_PAGES,
+                                    driver_context=None, verbose=False):
+    """
+    Fetch the result pages of a Booking.com search without a browser, requesting the `offset` paginated
+    pages of the `build_booking_url_full` URL concurrently over a pooled HTTP client.
+
+    A page that comes back without accommodation cards (e.g. a page that needs JavaScript rendering) is
+    loaded in a browser instead; when that happens to the first page, the whole search falls back to
+    `fetch_accommodations_html`.
+
+    Parameters:
+    - destination ... max_distance_meters: Search filters, as in `build_booking_url_full`.
+    - client (ApiClient): Pooled HTTP client. Defaults to `get_booking_client()`.
+    - rate_limiter (TokenBucket): Shared limit on the pages requested per second.
+    - page_workers (int): Result pages requested at the same time.
+    - max_pages (int): Maximum result pages fetched.
+    - driver_context (callable): Returns a context manager lending a driver for the fallback
+      (e.g. `BrowserPool.driver`). Defaults to starting a headless Chrome.
+    - verbose (bool): Print the pages that fell back to the browser.
+
+    Returns:
+    - list: HTML of every result page, in offset order.
+    """
+    search_kwargs = dict(destination=destination, checkin=checkin, checkout=checkout, adults=adults, children=children,
+                         rooms=rooms, min_price=min_price, max_price=max_price, star_ratings=star_ratings,
+                         meal_plan=meal_plan, review_score=review_score, max_distance_meters=max_distance_meters)
+    search_url = build_booking_url_full(**search_kwargs)
+    client = client or get_booking_client()
+    driver_context = driver_context or own_chrome_driver
+
+    def fetch_offset(offset, fallback=True):
+        page_url = f"{search_url}&offset={offset}" if offset else search_url
+        with trace_stage("http_page", offset=offset) as event:
+            response = request_with_retries(page_url, rate_limiter=rate_limiter, client=client)
+            if "charset" not in response.headers.get("Content-Type", "").lower():
+                # requests would decode text/html without a charset as ISO-8859-1 and garble the "€"
+                response.encoding = "utf-8"
+            html_page = response.text if response.status_code == 200 else ""
+            event.update(status_code=response.status_code, cards=count_booking_cards(html_page))
+
+        if event["cards"] == 0 and fallback and offset:
+            trace_count("selenium_fallback_pages")
+            if verbose == True:
+                print(f"No cards in {page_url} (status {response.status_code}), loading it in the browser")
+            with driver_context() as driver:
+                load_page(driver, page_url, ready_selectors=[BOOKING_CARD_SELECTOR])
+                html_page = driver.page_source
+        return html_page
+
+    first_page = fetch_offset(0)
+    if count_booking_cards(first_page) == 0:
+        trace_count("selenium_fallback_searches")
+        if verbose == True:
+            print(f"No cards in the first result page of {destination} {checkin}, searching in the browser")
+        with driver_context() as driver:
+            return [fetch_accommodations_html(**search_kwargs, driver=driver)]
+
+    results_count = get_booking_results_count(first_page)
+    if results_count is None:
+        # no results header: walk the offsets until a page is not full
+        html_pages = [first_page]
+        while count_booking_cards(html_pages[-1]) >= BOOKING_PAGE_SIZE and len(html_pages) < max_pages:
+            html_pages.append(fetch_offset(len(html_pages) * BOOKING_PAGE_SIZE, fallback=False))
+        return html_pages
+
+    n_pages = min(max_pages, math.ceil(results_count / BOOKING_PAGE_SIZE))
+    with ThreadPoolExecutor(max_workers=page_workers) as executor:
+        return [first_page] + list(executor.map(fetch_offset, [page * BOOKING_PAGE_SIZE for page in range(1, n_pages)]))
+
+
+def extract_all_accommodations(destination: str, checkin: str, checkout: str, adults: int = 1, children: int = 0,
+                           rooms: int = 1, min_price: int = 1, max_price: int = 1, star_ratings: list = None, 
+                           meal_plan: str = None, review_score: list = None, max_distance_meters: int = None, verbose=False,
+                           driver=None, fetch_mode="browser"):
+    search_kwargs = dict(destination=destination, checkin=checkin, checkout=checkout, adults=adults,
+                         children=children, rooms=rooms, min_price=min_price, max_price=max_price,
+                         star_ratings=star_ratings, meal_plan=meal_plan, review_score=review_score,
+                         max_distance_meters=max_distance_meters)
+
+    if fetch_mode == "http":
+        driver_context = (lambda: contextlib.nullcontext(driver)) if driver is not None else None
+        html_pages = fetch_accommodations_pages_http(**search_kwargs, driver_context=driver_context, verbose=verbose)
+        return merge_column_chunks(parse_accommodations_html(html_page, verbose=verbose) for html_page in html_pages)
+
+    html_page = fetch_accommodations_html(**search_kwargs, driver=driver)
+
+    total_accommodation_df = pd.DataFrame(parse_accommodations_html(html_page, verbose=verbose))
 
     return total_accommodation_df
     
 
 ### Activities - civitatis
 
-def get_pagination_htmls_by_city_date(city_name, date_start, date_end, page_start, n_pages, driver):
+CIVITATIS_READY_SELECTORS = ["div.m-availability", "#activitiesShowing"]
+
+
+def get_pagination_htmls_by_city_date(city_name, date_start, date_end, page_start, n_pages, driver, page_timings=None):
 
-    html_contents = list()
+    return list(iter_pagination_htmls_by_city_date(city_name, date_start, date_end, page_start, n_pages, driver,
+                                                   page_timings=page_timings))
+
+
+def iter_pagination_htmls_by_city_date(city_name, date_start, date_end, page_start, n_pages, driver, page_timings=None):
 
     for page_number in range(page_start, n_pages + page_start):
 
         activities_link = f"https://www.civitatis.com/es/{city_name}/?page={page_number}&fromDate={date_start}&toDate={date_end}"
 
-        driver.get(activities_link)
-        driver.maximize_window()
-        
         # make sure availability cards and amount of available activities show in the page
-        time.sleep(1)
-        try:
-            driver.implicitly_wait(20)
-            driver.execute_script('window.scrollBy(0, 4000)')
-            driver.find_element("css selector","div.m-availability")
-            driver.find_element("css selector","#activitiesShowing")
-        except:
-            pass
-        
+        load_page(driver, activities_link, ready_selectors=CIVITATIS_READY_SELECTORS, scroll_pixels=4000,
+                  page_timings=page_timings)
+
+        yield driver.page_source
+
+
+# activity card fields: the link, its GTM JSON, the article and the features are located once per card
+ACTIVITY_SPEC = {
+    "intermediates": {
+        "link": lambda card, shared: card.find("a", {"class": "ga-trackEvent-element _activity-link"}),
+        "gtm": lambda card, shared: json.loads(shared["link"]["data-gtm-new-model-click"]),
+        "image": lambda card, shared: card.find("img"),
+        "article": lambda card, shared: card.find("article", recursive=False),
+        "first_feature": lambda card, shared: card.find("div", {"class": "comfort-card__features"}).findAll("span")[0].text.strip(),
+        # keep page order, so days come out sorted and fingerprints stay stable between runs
+        "availability_cards": lambda card, shared: [availability_card for availability_card in card.findAll("div", {"class": "m-availability__item"})
+                                                    if "_no-dates" not in availability_card.get("class", [])],
+    },
+    "fields": {
+        "activity_name": ("link", lambda link: link["title"]),
+        "description": ("card", lambda card: card.find("div", {"class": "comfort-card__text l-list-card__text"}).text.strip().replace("\xa0", " ")),
+        "url": ("card", lambda card: "www.civitatis.com" + card.find("a",{"data-eventcategory":"Actividades Listado"})["href"]),
+        # image/gif
+        "image": ("image", lambda image: "www.civitatis.com" + image["src"]),
+        "image2": ("image", lambda image: "www.civitatis.com" + image["data-src"]),
+        # NOTE_: I'LL HAVE TO HANDLE LAST AND FIRST DAYS OF MONTH CAREFULLY, AS MONTH NOT SPECIFIED
+        "available_days": ("availability_cards", lambda cards: [el.find('br').next_sibling.strip() for el in cards]),
+        "available_times": ("availability_cards", lambda cards: [[time.text for time in el.find_all("span", {"class": "_time"})] for el in cards]),
+        "duration": ("first_feature", lambda feature: feature),
+        # address: use latitude and longitude, then convert with geopy
+        "latitude": ("article", lambda article: article["data-latitude"]),
+        "longitude": ("article", lambda article: article["data-longitude"]),
+        # filled afterwards from latitude/longitude by the geocoding stage (geocoding_support.add_addresses)
+        "address": ("card", lambda _: np.nan),
+        "price": ("gtm", lambda gtm: gtm["ecommerce"]["click"]["products"][0]["price"]),
+        "currency": ("gtm", lambda gtm: gtm["ecommerce"]["currencyCode"]),
+        "category": ("first_feature", lambda feature: feature)
+    }
+}
 
-        html_content = driver.page_source
+ACTIVITY_PLAN = ExtractionPlan(ACTIVITY_SPEC, name="activities")
 
-        html_contents.append(html_content)
 
-    return html_contents
+def scrape_activities_from_page(page_soup, verbose=False):
+    return ACTIVITY_PLAN.extract(page_soup.findAll("div",{"class","o-search-list__item"}), verbose=verbose)
 
 
-def scrape_activities_from_page(page_soup, verbose=False):
-    activity_data_dict = {
-            "activity_name": [],
-            "description": [],
-            "url": [],
-            "image": [],
-            "image2": [],
-            "available_days": [],
-            "available_times": [],
-            "duration": [],
-            "latitude": [],
-            "longitude": [],
-            "address": [],
-            "price": [],
-            "currency": [],
-            "category": []
-    }
+def parse_activities_html(html_page, verbose=False):
+    from bs4 import BeautifulSoup
+    page_soup = BeautifulSoup(html_page, "html.parser")
+    return scrape_activities_from_page(page_soup, verbose=verbose)
 
-    for element in page_soup.findAll("div",{"class","o-search-list__item"}):
 
-        availability_cards = list(set(element.findAll("div", {"class": "m-availability__item"})) - 
-                                set(element.findAll("div", {"class": "m-availability__item _no-dates"})))
-        
-        activity_scraper_dict = {
+def open_activities_first_page(city_name, date_start, date_end, page_timings=None):
+    # define url 
+    first_link = f"https://www.civitatis.com/es/{city_name}/?fromDate={date_start}&toDate={date_end}"
 
-            "activity_name": lambda element: element.find("a", {"class": "ga-trackEvent-element _activity-link"})["title"],
+    # open driver
+    _load_selenium()
+    with trace_stage("driver_startup"):
+        driver = webdriver.Chrome()
+        driver.maximize_window()
 
-            "description": lambda element: element.find("div", {"class": "comfort-card__text l-list-card__text"}).text.strip().replace("\xa0", " "),
+    # make sure availability cards and amount of available activities show in the page
+    load_page(driver, first_link, ready_selectors=CIVITATIS_READY_SELECTORS, page_timings=page_timings)
 
-            "url": lambda element: "www.civitatis.com" + element.find("a",{"data-eventcategory":"Actividades Listado"})["href"],
+    return driver, driver.page_source
 
-            # image/gif
-            "image": lambda element: "www.civitatis.com" + element.find("img")["src"],
 
-            # image/gif
-            "image2": lambda element: "www.civitatis.com" + element.find("img")["data-src"],
+def get_activities_last_page(html_page):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_page, "html.parser")
 
-            # NOTE_: I'LL HAVE TO HANDLE LAST AND FIRST DAYS OF MONTH CAREFULLY, AS MONTH NOT SPECIFIED
-            "available_days": lambda _: [el.find('br').next_sibling.strip() for el in availability_cards],
-            
-            "available_times": lambda _: [[time.text for time in el.find_all("span", {"class": "_time"})] for el in availability_cards],
-            
-            "duration": lambda element: element.find("div", {"class": "comfort-card__features"}).findAll("span")[0].text.strip(),
-            
-            # address: use latitude and longitude, then convert with geopy
-            "latitude": lambda element: element.find("article", recursive=False)["data-latitude"],
-            "longitude": lambda element: element.find("article", recursive=False)["data-longitude"],
+    return math.ceil(int(soup.find("div",{"class","columns o-pagination__showing"}).find("div",{"class":"left"}).text.split()[0])/20)
 
-            "address": lambda element: geolocator.reverse(
-                (element.find("article", recursive=False)["data-latitude"], 
-                element.find("article", recursive=False)["data-longitude"])
-            ).address,
-    
-            "price": lambda element: json.loads(element.find("a", {"class": "ga-trackEvent-element _activity-link"})["data-gtm-new-model-click"])["ecommerce"]["click"]["products"][0]["price"],
-            
-            "currency": lambda element: json.loads(element.find("a", {"class": "ga-trackEvent-element _activity-link"})["data-gtm-new-model-click"])["ecommerce"]["currencyCode"],
-            
-            "category": lambda element: element.find("div", {"class": "comfort-card__features"}).findAll("span")[0].text.strip()
-        }
-        
-        
 
-        for key, activity_scraper_function in activity_scraper_dict.items():
-            try:
-                activity_data_dict[key].append(activity_scraper_function(element))
-                
-            except Exception as e:
-                if verbose == True:
-                    print(f"Error filling {key} due to {e}")
-                activity_data_dict[key].append(np.nan)
+def iter_activities(city_name, date_start, date_end, verbose=False, n_parsers=None, page_timings=None):
+    """
+    Crawl the Civitatis listings of a city and yield the parsed column dict of every results page,
+    parsing pages in a process pool while the next ones load.
+    """
+    driver, html_content1 = open_activities_first_page(city_name, date_start, date_end, page_timings=page_timings)
 
-    return activity_data_dict
+    try:
+        # parse first page to get last page number
+        last_page = get_activities_last_page(html_content1)
 
+        def html_contents():
+            yield html_content1
+            yield from iter_pagination_htmls_by_city_date(city_name, date_start, date_end, 2, last_page - 1, driver,
+                                                          page_timings=page_timings)
 
+        for _, column_chunk in iter_parse_html_pages(html_contents(), parse_activities_html, max_workers=n_parsers,
+                                                     verbose=verbose):
+            yield column_chunk
+    finally:
+        driver.quit()
 
 
+def extract_all_activities(city_name, date_start, date_end, verbose=False, n_parsers=None, geocode=True,
+                           geocoder=None, known_addresses=None, geocode_cache=None, page_timings=None):
+    total_actitivities_df = merge_column_chunks(iter_activities(city_name, date_start, date_end, verbose=verbose,
+                                                                n_parsers=n_parsers, page_timings=page_timings))
 
-def extract_all_activities(city_name, date_start, date_end, verbose=False):
-    # define url 
-    first_link = f"https://www.civitatis.com/es/{city_name}/?fromDate={date_start}&toDate={date_end}"
+    # reverse geocode each distinct meeting point once, outside the parse loop
+    if geocode and not total_actitivities_df.empty:
+        total_actitivities_df = add_addresses(total_actitivities_df, geocoder=geocoder, known_addresses=known_addresses, cache=geocode_cache, verbose=verbose)
 
-    # open driver
-    driver = webdriver.Chrome()
-    driver.maximize_window()
-    driver.get(first_link)
+    return total_actitivities_df
+
+
+# incremental crawl
+ACTIVITY_FINGERPRINT_FIELDS = ["price", "currency", "available_days", "available_times"]
+
+
+def weekly_availability(available_days, available_times, date_start):
+    """
+    Availability of an activity as sorted `[weekday, start times]` pairs, with the day-of-month numbers of
+    the listing resolved to dates of the window starting at `date_start`.
+
+    The day numbers move with every weekly window; the weekdays and start times only change when the
+    listing does, so fingerprints built on them stay comparable from one window to the next.
+    """
+    day_times = [(int(day), sorted(times)) for day, times in zip(available_days, available_times) if str(day).strip().isdigit()]
+    if not day_times:
+        return []
+    dates = resolve_available_dates([day for day, _ in day_times], date_start)
+    return sorted([int(pd.Timestamp(date).weekday()), times] for date, (_, times) in zip(dates, day_times))
+
+
+def fingerprint_activities(activity_data_dict, date_start=None):
+    """
+    Return `(url, fingerprint)` pairs for the activities of a parsed page, where the
+    fingerprint hashes the fields that change between crawls (price and availability).
+
+    With `date_start`, the availability is hashed as `weekly_availability` of the window starting that day,
+    so crawls of different weeks only differ where the price or the weekly availability changed.
+    """
+    fingerprints = list()
+    for row_values in zip(activity_data_dict["url"], *[activity_data_dict[field] for field in ACTIVITY_FINGERPRINT_FIELDS]):
+        url, price, currency, available_days, available_times = row_values
+        availability = ([available_days, available_times] if date_start is None
+                        else weekly_availability(available_days, available_times, date_start))
+        payload = json.dumps([price, currency, availability], sort_keys=True, default=str)
+        fingerprints.append((url, hashlib.sha1(payload.encode("utf-8")).hexdigest()))
+
+    return fingerprints
+
+
+def load_crawl_manifest(manifest_path):
+    if not os.path.exists(manifest_path):
+        return dict()
+    with open(manifest_path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_crawl_manifest(manifest, manifest_path):
+    directory = os.path.dirname(manifest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = manifest_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+    os.replace(temporary_path, manifest_path)
+
+
+def extract_new_activities(city_name, date_start, date_end, manifest_path, manifest_key=None, unchanged_pages_to_stop=1,
+                           verbose=False, geocode=True, geocoder=None, known_addresses=None, geocode_cache=None, page_timings=None):
+    """
+    Incrementally crawl the Civitatis listings of a city, returning only new or changed activities.
+
+    Every activity card is fingerprinted (URL plus a hash of price and weekly availability in the
+    `date_start` - `date_end` window) and stored in a JSON crawl manifest kept per city, so the refresh
+    of a later week compares against the previous one. On later runs pagination stops once
+    `unchanged_pages_to_stop` consecutive pages contain only already-seen, unchanged cards.
+
+    Parameters:
+    - city_name (str): Civitatis city slug (e.g. "roma").
+    - date_start (str): First activity date in YYYY-MM-DD format.
+    - date_end (str): Last activity date in YYYY-MM-DD format.
+    - manifest_path (str): JSON file where fingerprints are kept between runs.
+    - manifest_key (str): Manifest section for this crawl. Defaults to the city, shared by all its date windows.
+    - unchanged_pages_to_stop (int): Consecutive unchanged pages after which pagination stops.
+    - verbose (bool): Print scraping errors and crawl progress.
+    - geocode (bool): Fill the address of the new or changed rows.
+    - geocoder: Geocoder passed to `add_addresses`.
+    - known_addresses (KnownAddressCache): Known-address cache passed to `add_addresses`.
+    - geocode_cache (ResponseCache): Coordinate -> address cache passed to `add_addresses`.
+    - page_timings (list): Optional list where per-page load timings are appended (see `summarize_page_timings`).
+
+    Returns:
+    - tuple: (DataFrame of new or changed activities, DataFrame delta log with url, status, page and fingerprints).
+    """
+    manifest_key = manifest_key or city_name
+    manifest = load_crawl_manifest(manifest_path)
+    seen_fingerprints = manifest.get(manifest_key, {}).get("fingerprints", {})
+
+    driver, html_content1 = open_activities_first_page(city_name, date_start, date_end, page_timings=page_timings)
+
+    column_chunks = list()
+    delta_log = list()
+    crawled_at = datetime.datetime.now().isoformat(timespec="seconds")
 
-    # make sure availability cards and amount of available activities show in the page
-    time.sleep(1)
     try:
-        driver.implicitly_wait(20)
-        driver.find_element("css selector","div.m-availability")
-        driver.find_element("css selector","#activitiesShowing")
-    except:
-        pass
+        last_page = get_activities_last_page(html_content1)
+
+        def html_contents():
+            yield html_content1
+            yield from iter_pagination_htmls_by_city_date(city_name, date_start, date_end, 2, last_page - 1, driver,
+                                                          page_timings=page_timings)
+
+        unchanged_pages = 0
+        for page_number, html_page in enumerate(html_contents(), start=1):
+            start = time.perf_counter()
+            activity_data_dict = parse_activities_html(html_page, verbose=verbose)
+            record_parsed_page("activities", time.perf_counter() - start, activity_data_dict)
+
+            changed_rows = list()
+            for row, (url, fingerprint) in enumerate(fingerprint_activities(activity_data_dict, date_start)):
+                previous_fingerprint = seen_fingerprints.get(url)
+                if previous_fingerprint == fingerprint:
+                    continue
+
+                changed_rows.append(row)
+                delta_log.append({"url": url, "status": "new" if previous_fingerprint is None else "changed",
+                                  "page": page_number, "previous_fingerprint": previous_fingerprint,
+                                  "fingerprint": fingerprint, "crawled_at": crawled_at})
+                seen_fingerprints[url] = fingerprint
+
+            column_chunks.append({key: [values[row] for row in changed_rows] for key, values in activity_data_dict.items()})
+
+            unchanged_pages = 0 if changed_rows else unchanged_pages + 1
+            if unchanged_pages >= unchanged_pages_to_stop:
+                if verbose == True:
+                    print(f"Stopping at page {page_number} of {last_page}: no new or changed activities")
+                break
+    finally:
+        driver.quit()
 
-    # parse first page to get last page number
-    html_content1 = driver.page_source
+    manifest[manifest_key] = {"fingerprints": seen_fingerprints, "last_crawl": crawled_at}
+    save_crawl_manifest(manifest, manifest_path)
 
-    soup = BeautifulSoup(html_content1, "html.parser")
+    new_activities_df = merge_column_chunks(column_chunks)
+    if geocode and not new_activities_df.empty:
+        new_activities_df = add_addresses(new_activities_df, geocoder=geocoder, known_addresses=known_addresses, cache=geocode_cache, verbose=verbose)
 
-    last_page = math.ceil(int(soup.find("div",{"class","columns o-pagination__showing"}).find("div",{"class":"left"}).text.split()[0])/20)
-    last_page
+    return new_activities_df, pd.DataFrame(delta_log, columns=["url", "status", "page", "previous_fingerprint",
+                                                               "fingerprint", "crawled_at"])
 
-    page_start = 2
-    n_pages = last_page - 1
 
-    # collect unparsed pages html
-    html_contents = get_pagination_htmls_by_city_date(city_name, date_start, date_end, page_start, n_pages, driver)
-    html_contents.append(html_content1)
+# streaming extraction: batches go to an append-only sink as they arrive, completed jobs to a checkpoint
+def build_activity_search_jobs(destination_cities, checkins, checkouts):
+    """
+    Build the `extract_all_activities` parameter sets for every destination and week. Activity dates
+    leave one day of travel on each side of the stay.
+    """
+    return [
+        {"city_name": destination_city, "destination": destination_city, "week": week,
+         "date_start": (pd.to_datetime(checkin) + datetime.timedelta(days=1)).strftime("%Y-%m-%d"),
+         "date_end": (pd.to_datetime(checkout) - datetime.timedelta(days=1)).strftime("%Y-%m-%d")}
+        for destination_city in destination_cities
+        for week, (checkin, checkout) in enumerate(zip(checkins, checkouts), start=1)
+    ]
 
-    # parse each page and scrape elements
-    total_actitivities_df = pd.DataFrame()
-    for page_html in html_contents:
 
-        page_soup = BeautifulSoup(page_html, "html.parser")
-        page_activities_df = pd.DataFrame(scrape_activities_from_page(page_soup, verbose=verbose))
-        total_actitivities_df = pd.concat([total_actitivities_df,page_activities_df]).reset_index(drop=True)
-        
+def _write_job_batch(sink, batch, job, columns_from_job):
+    batch_df = batch if isinstance(batch, pd.DataFrame) else pd.DataFrame(batch)
+    for column in columns_from_job:
+        if column in job:
+            batch_df[column] = job[column]
+    sink.write(batch_df)
+    return len(batch_df)
 
-    return total_actitivities_df
 
+def _finish_job(sink, checkpoint, job, rows, summary):
+    sink.commit()
+    if checkpoint is not None:
+        checkpoint.mark_done(job, rows=rows)
+    summary["completed"] += 1
+    summary["rows"] += rows
+
+
+def _pending_jobs(jobs, checkpoint, summary):
+    jobs = list(jobs)
+    pending = checkpoint.pending(jobs) if checkpoint is not None else jobs
+    summary["skipped"] = len(jobs) - len(pending)
+    return pending
+
+
+def stream_flight_itineraries(countries_airports_df, queries, sink, checkpoint=None,
+                              columns_from_job=("destination_city", "week"), verbose=False, **grid_kwargs):
+    """
+    Run a flight query grid, writing the itineraries of every query to `sink` as soon as it returns.
+    Queries already completed in `checkpoint` are skipped; failed queries are left pending for the next run.
+
+    Parameters:
+    - countries_airports_df (pd.DataFrame or AirportIndex): Airport codes per city.
+    - queries (list): Query dicts (e.g. from `build_flight_query_grid`).
+    - sink (JsonlSink or ParquetSink): Append-only output dataset.
+    - checkpoint (CrawlCheckpoint): Completed queries, e.g. keyed by ("destination_city", "week").
+    - columns_from_job (tuple): Query keys added as columns to the written rows.
+    - verbose (bool): Print failed queries and progress.
+    - grid_kwargs: Passed to `iter_flight_itineraries_grid` (max_workers, requests_per_second, cache, ...).
+
+    Returns:
+    - dict: Number of completed and skipped queries and of written rows.
+    """
+    summary = {"completed": 0, "skipped": 0, "rows": 0}
+    pending = _pending_jobs(queries, checkpoint, summary)
+
+    for query, itineraries_df in iter_flight_itineraries_grid(countries_airports_df, pending, verbose=verbose, **grid_kwargs):
+        rows = _write_job_batch(sink, itineraries_df, query, columns_from_job)
+        _finish_job(sink, checkpoint, query, rows, summary)
+        if verbose == True:
+            print(f"Wrote {rows} itineraries for {query.get('destination_city')} week {query.get('week')}")
+
+    return summary
+
+
+def stream_accommodations(jobs, sink, checkpoint=None, columns_from_job=("destination", "week", "type"),
+                          verbose=False, **batch_kwargs):
+    """
+    Run Booking.com searches over a browser pool, writing each search to `sink` as soon as it is parsed.
+    Searches already completed in `checkpoint` are skipped; failed searches are left pending for the next run.
+
+    Parameters:
+    - jobs (list): Search dicts (e.g. from `build_accommodation_search_jobs`).
+    - sink (JsonlSink or ParquetSink): Append-only output dataset.
+    - checkpoint (CrawlCheckpoint): Completed searches, e.g. keyed by ("destination", "week", "type").
+    - columns_from_job (tuple): Job keys added as columns to the written rows.
+    - verbose (bool): Print failed searches and progress.
+    - batch_kwargs: Passed to `iter_accommodations_batch` (n_drivers, driver_factory, n_parsers, ...).
+
+    Returns:
+    - dict: Number of completed and skipped searches and of written rows.
+    """
+    summary = {"completed": 0, "skipped": 0, "rows": 0}
+    pending = _pending_jobs(jobs, checkpoint, summary)
+
+    for job, column_chunk in iter_accommodations_batch(pending, verbose=verbose, **batch_kwargs):
+        rows = _write_job_batch(sink, column_chunk, job, columns_from_job)
+        _finish_job(sink, checkpoint, job, rows, summary)
+        if verbose == True:
+            print(f"Wrote {rows} accommodations for {job.get('destination')} week {job.get('week')} ({job.get('type')})")
+
+    return summary
+
+
+def stream_activities(jobs, sink, checkpoint=None, columns_from_job=("destination", "week"), verbose=False,
+                      n_parsers=None, geocode=False, geocoder=None, known_addresses=None, geocode_cache=None, page_timings=None):
+    """
+    Crawl the Civitatis listings of several cities and weeks, writing every results page to `sink` as
+    soon as it is parsed. A job's pages are committed together once its last page is written, so an
+    interrupted crawl resumes from the first incomplete (destination, week) job.
 
+    Parameters:
+    - jobs (list): Dicts with city_name, date_start and date_end (e.g. from `build_activity_search_jobs`).
+    - sink (JsonlSink or ParquetSink): Append-only output dataset.
+    - checkpoint (CrawlCheckpoint): Completed jobs, e.g. keyed by ("destination", "week").
+    - columns_from_job (tuple): Job keys added as columns to the written rows.
+    - verbose (bool): Print failed jobs and progress.
+    - n_parsers (int): Parser processes per job.
+    - geocode (bool): Fill the address of every page before writing it.
+    - geocoder: Geocoder passed to `add_addresses`.
+    - known_addresses (KnownAddressCache): Known-address cache passed to `add_addresses`.
+    - geocode_cache (ResponseCache): Coordinate -> address cache passed to `add_addresses`.
+    - page_timings (list): Optional list where per-page load timings are appended.
+
+    Returns:
+    - dict: Number of completed and skipped jobs and of written rows.
+    """
+    summary = {"completed": 0, "skipped": 0, "rows": 0}
+
+    for job in _pending_jobs(jobs, checkpoint, summary):
+        rows = 0
+        try:
+            for column_chunk in iter_activities(job["city_name"], job["date_start"], job["date_end"], verbose=verbose,
+                                                n_parsers=n_parsers, page_timings=page_timings):
+                page_df = pd.DataFrame(column_chunk)
+                if geocode and not page_df.empty:
+                    page_df = add_addresses(page_df, geocoder=geocoder, known_addresses=known_addresses, cache=geocode_cache, verbose=verbose)
+                rows += _write_job_batch(sink, page_df, job, columns_from_job)
+        except Exception as e:
+            sink.discard()
+            if verbose == True:
+                print(f"Error crawling activities of {job['city_name']} {job['date_start']} due to {e}")
+            continue
+
+        _finish_job(sink, checkpoint, job, rows, summary)
+        if verbose == True:
+            print(f"Wrote {rows} activities for {job.get('destination')} week {job.get('week')}")
+
+    return summary
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from contextlib import contextmanager
+import collections
+import threading
+
+# named plans, so counts collected in a parser process can be added to the same plan of the parent
+_plans = dict()
+# per-thread list of (plan name, field errors, cards) filled by `extract` while `collect_page_errors` is active
+_page_errors = threading.local()
+
+
+class ExtractionPlan:
+    """
+    Declarative extraction spec compiled once into a plan that fills column lists card by card.
+
+    A spec is a dict with:
+    - "intermediates": name -> function `(card, shared) -> value`, evaluated once per card in declaration
+      order; `shared` holds the card (as "card") and the intermediates already computed, so a parsed JSON
+      attribute or a located node is shared by every field reading it.
+    - "fields": column -> `(intermediate name, extractor)`, the extractor receiving that intermediate
+      ("card" for the card itself). Columns come out in this order.
+    - "converters" (optional): column -> function converting the whole column list at once (e.g. `pd.to_numeric`).
+
+    A field whose extractor or intermediate fails is filled with NaN and counted in `error_counts`.
+    Counts of pages parsed in other processes are added with `record_errors` (see `collect_page_errors`).
+
+    Parameters:
+    - spec (dict): Intermediates, fields and converters as described above.
+    - name (str): Registers the plan under this name, so parser processes can report their counts back.
+    """
+
+    def __init__(self, spec, name=None):
+        self.intermediates = list(spec.get("intermediates", {}).items())
+        self.fields = [(column, source, extractor) for column, (source, extractor) in spec["fields"].items()]
+        self.converters = dict(spec.get("converters", {}))
+        self.columns = [column for column, _, _ in self.fields]
+
+        known_sources = {"card"} | {name for name, _ in self.intermediates}
+        unknown_sources = {source for _, source, _ in self.fields} - known_sources
+        if unknown_sources:
+            raise ValueError(f"Fields read undeclared intermediates: {sorted(unknown_sources)}")
+
+        self.error_counts = collections.Counter()
+        self.n_cards = 0
+        self.lock = threading.Lock()
+
+        self.name = name
+        if name is not None:
+            _plans[name] = self
+
+    def extract(self, cards, verbose=False):
+        """
+        Extract every field of `cards` and return a dict of column lists (or converted columns).
+        """
+        columns = {column: [] for column in self.columns}
+        field_columns = [(column, source, extractor, columns[column]) for column, source, extractor in self.fields]
+        page_errors = collections.Counter()
+        n_cards = 0
+
+        for card in cards:
+            n_cards += 1
+            shared = {"card": card}
+            for name, function in self.intermediates:
+                try:
+                    shared[name] = function(card, shared)
+                except Exception as e:
+                    shared[name] = e
+
+            for column, source, extractor, values in field_columns:
+                value = shared[source]
+                try:
+                    if isinstance(value, Exception):
+                        raise value
+                    values.append(extractor(value))
+                except Exception:
+                    values.append(np.nan)
+                    page_errors[column] += 1
+
+        for column, converter in self.converters.items():
+            columns[column] = converter(columns[column])
+
+        self.record_errors(page_errors, n_cards)
+        collector = getattr(_page_errors, "collector", None)
+        if collector is not None and self.name is not None:
+            collector.append((self.name, page_errors, n_cards))
+        if verbose == True and page_errors:
+            print(f"Fields not filled in {n_cards} cards: {dict(page_errors)}")
+
+        return columns
+
+    def record_errors(self, page_errors, n_cards):
+        with self.lock:
+            self.n_cards += n_cards
+            self.error_counts.update(page_errors)
+
+    def error_rates(self):
+        """
+        Share of the cards extracted so far (in this process) where each field could not be filled.
+        """
+        with self.lock:
+            error_counts, n_cards = collections.Counter(self.error_counts), self.n_cards
+        return pd.Series({column: error_counts[column] / n_cards if n_cards else np.nan
+                          for column in self.columns}, name="error_rate")
+
+    def reset_errors(self):
+        with self.lock:
+            self.error_counts = collections.Counter()
+            self.n_cards = 0
+
+
+@contextmanager
+def collect_page_errors():
+    """
+    Collect the `(plan name, field errors, cards)` of every named plan extraction run in this thread
+    inside the block, e.g. in a parser process, to be sent back and added with `record_page_errors`.
+    """
+    previous_collector = getattr(_page_errors, "collector", None)
+    _page_errors.collector = list()
+    try:
+        yield _page_errors.collector
+    finally:
+        _page_errors.collector = previous_collector
+
+
+def record_page_errors(page_errors):
+    for name, field_errors, n_cards in page_errors:
+        _plans[name].record_errors(field_errors, n_cards)
@@ -0,0 +1,158 @@
+import pandas as pd
+import numpy as np
+
+import sys
+sys.path.append("..")
+from src.instrumentation_support import trace_stage, trace_count
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def round_coordinates(latitudes, longitudes, precision=4):
+    # 4 decimals is ~11 m, enough to merge the same meeting point scraped on different weeks
+    latitudes = pd.to_numeric(pd.Series(latitudes), errors="coerce").round(precision)
+    longitudes = pd.to_numeric(pd.Series(longitudes), errors="coerce").round(precision)
+    return latitudes.to_numpy(), longitudes.to_numpy()
+
+
+def coordinates_to_unit_vectors(latitudes, longitudes):
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))
+    longitudes = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack([np.cos(latitudes) * np.cos(longitudes),
+                            np.cos(latitudes) * np.sin(longitudes),
+                            np.sin(latitudes)])
+
+
+class NominatimReverseGeocoder:
+    """
+    Online reverse geocoder backed by Nominatim, throttled to respect its usage policy (1 request per second).
+    """
+
+    def __init__(self, user_agent="my-geopy-app", min_delay_seconds=1, max_retries=2):
+        self.user_agent = user_agent
+        self.min_delay_seconds = min_delay_seconds
+        self.max_retries = max_retries
+        self._reverse = None
+
+    def reverse(self, latitude, longitude):
+        if self._reverse is None:
+            from geopy.geocoders import Nominatim
+            from geopy.extra.rate_limiter import RateLimiter
+            geolocator = Nominatim(user_agent=self.user_agent)
+            self._reverse = RateLimiter(geolocator.reverse, min_delay_seconds=self.min_delay_seconds,
+                                        max_retries=self.max_retries, swallow_exceptions=True, return_value_on_exception=None)
+
+        location = self._reverse((latitude, longitude))
+        return location.address if location is not None else np.nan
+
+
+class KnownAddressCache:
+    """
+    Addresses already known for nearby points: returns the address of the nearest known point within `max_distance_km`.
+
+    This is not a gazetteer. It is built from a table with latitude, longitude and address columns, e.g. the
+    `civitatis_activities_cleaned.csv` of an earlier scrape, and only resolves meeting points close to one of
+    those rows; anything else comes back as NaN and is left to the rate-limited geocoder in `add_addresses`.
+    """
+
+    def __init__(self, latitudes, longitudes, addresses, max_distance_km=0.5):
+        from scipy.spatial import cKDTree
+
+        known = ~(pd.isna(latitudes) | pd.isna(longitudes) | pd.isna(addresses))
+        self.addresses = np.asarray(addresses, dtype=object)[known]
+        self.tree = cKDTree(coordinates_to_unit_vectors(np.asarray(latitudes)[known], np.asarray(longitudes)[known]))
+        # chord length on the unit sphere equivalent to the maximum distance
+        self.max_chord = 2 * np.sin(max_distance_km / EARTH_RADIUS_KM / 2)
+
+    @classmethod
+    def from_dataframe(cls, dataframe, max_distance_km=0.5):
+        dataframe = dataframe.dropna(subset=["latitude", "longitude", "address"]).drop_duplicates(subset=["latitude", "longitude"])
+        return cls(pd.to_numeric(dataframe["latitude"]).to_numpy(), pd.to_numeric(dataframe["longitude"]).to_numpy(),
+                   dataframe["address"].to_numpy(), max_distance_km=max_distance_km)
+
+    @classmethod
+    def from_csv(cls, path, max_distance_km=0.5):
+        return cls.from_dataframe(pd.read_csv(path, usecols=["latitude", "longitude", "address"]), max_distance_km=max_distance_km)
+
+    def reverse_many(self, latitudes, longitudes):
+        distances, indices = self.tree.query(coordinates_to_unit_vectors(latitudes, longitudes),
+                                             distance_upper_bound=self.max_chord)
+        found = np.isfinite(distances)
+        addresses = np.full(len(indices), np.nan, dtype=object)
+        addresses[found] = self.addresses[indices[found]]
+        return addresses
+
+    def reverse(self, latitude, longitude):
+        return self.reverse_many([latitude], [longitude])[0]
+
+
+def add_addresses(activities_df, geocoder=None, known_addresses=None, cache=None, precision=4, verbose=False):
+    """
+    Fill the `address` column of scraped activities from their latitude and longitude.
+
+    Coordinates are rounded to `precision` decimals and deduplicated. Each unique point is looked up in
+    the persistent `cache` first, then in `known_addresses`, and only the points neither can resolve
+    are sent to the rate-limited geocoder.
+
+    Parameters:
+    - activities_df (pd.DataFrame): Activities with `latitude` and `longitude` columns.
+    - geocoder: Online geocoder for the remaining points, `NominatimReverseGeocoder` by default.
+    - known_addresses (KnownAddressCache): Optional addresses of nearby points already scraped.
+    - cache (ResponseCache): Optional coordinate -> address cache shared across runs.
+    - precision (int): Decimals kept when deduplicating coordinates.
+    - verbose (bool): Print how many points were resolved at each step and how many fell back to the geocoder.
+
+    Returns:
+    - pd.DataFrame: Copy of `activities_df` with the `address` column filled.
+    """
+    geocoder = geocoder or NominatimReverseGeocoder()
+    activities_df = activities_df.copy()
+
+    latitudes, longitudes = round_coordinates(activities_df["latitude"], activities_df["longitude"], precision)
+    points = pd.DataFrame({"latitude": latitudes, "longitude": longitudes})
+    unique_points = points.dropna().drop_duplicates().reset_index(drop=True)
+
+    addresses = dict()
+    missing_points = list()
+    for latitude, longitude in unique_points.itertuples(index=False):
+        cached = cache.get("reverse", {"lat": latitude, "lon": longitude}) if cache is not None else None
+        if cached is not None:
+            addresses[(latitude, longitude)] = cached["address"]
+        else:
+            missing_points.append((latitude, longitude))
+    n_cached = len(addresses)
+
+    n_known = 0
+    if missing_points and known_addresses is not None:
+        missing_latitudes, missing_longitudes = map(np.array, zip(*missing_points))
+        known = known_addresses.reverse_many(missing_latitudes, missing_longitudes)
+        remaining_points = list()
+        for point, address in zip(missing_points, known):
+            if pd.isna(address):
+                remaining_points.append(point)
+            else:
+                addresses[point] = address
+        n_known = len(missing_points) - len(remaining_points)
+        missing_points = remaining_points
+
+    if missing_points:
+        trace_count("geocode_fallback_points", len(missing_points))
+        with trace_stage("geocode", points=len(missing_points), geocoder=type(geocoder).__name__):
+            if hasattr(geocoder, "reverse_many"):
+                missing_latitudes, missing_longitudes = map(np.array, zip(*missing_points))
+                resolved = geocoder.reverse_many(missing_latitudes, missing_longitudes)
+            else:
+                resolved = [geocoder.reverse(latitude, longitude) for latitude, longitude in missing_points]
+
+        for point, address in zip(missing_points, resolved):
+            addresses[point] = address
+            if cache is not None and not pd.isna(address):
+                cache.set("reverse", {"lat": point[0], "lon": point[1]}, {"address": address})
+
+    if verbose == True:
+        print(f"{n_cached} points from cache, {n_known} from known addresses, "
+              f"{len(missing_points)} fell back to {type(geocoder).__name__}")
+
+    activities_df["address"] = [addresses.get((latitude, longitude), np.nan) for latitude, longitude in zip(latitudes, longitudes)]
+
+    return activities_df
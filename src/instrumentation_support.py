@@ -0,0 +1,298 @@
+import pandas as pd
+import numpy as np
+
+from contextlib import contextmanager
+import collections
+import subprocess
+import threading
+import json
+import time
+import sys
+import os
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+class Tracer:
+    """
+    Low overhead instrumentation of a scraping run.
+
+    Stages (driver startup, page load, load-more cycles, HTML parse, geocode, API call) are timed with
+    `stage`, items (pages, cards, itineraries) are counted with `count`, and the columns returned by the
+    scrapers are checked with `record_fields`, so a field whose missing rate jumps (e.g. after Booking
+    renames an obfuscated class like `f419a93f12`) shows up in `field_report`.
+
+    Aggregates are kept in memory; when `trace_path` is given every stage is also appended to a JSONL
+    trace, written through a buffered file.
+
+    Parameters:
+    - trace_path (str): Optional JSONL file where one event per stage is appended.
+    - enabled (bool): Turn all recording off without removing the instrumentation calls.
+    """
+
+    def __init__(self, trace_path=None, enabled=True):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.started_at = time.time()
+        self.lock = threading.Lock()
+
+        self.stage_seconds = collections.defaultdict(list)
+        self.stage_errors = collections.Counter()
+        self.counters = collections.Counter()
+        self.field_rows = collections.Counter()
+        self.field_missing = collections.Counter()
+
+        self.file = None
+        if trace_path is not None:
+            directory = os.path.dirname(trace_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.file = open(trace_path, "a", encoding="utf-8")
+
+    def _write_event(self, event):
+        if self.file is not None:
+            self.file.write(json.dumps(event, default=str) + "\n")
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """
+        Time the enclosed block as one call of stage `name`. The yielded dict can be filled with
+        extra event fields (e.g. the number of cards parsed), written to the trace with the timing.
+        """
+        if not self.enabled:
+            yield dict()
+            return
+
+        extras = dict()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield extras
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.record_stage(name, time.perf_counter() - start, error=error, **labels, **extras)
+
+    def record_stage(self, name, seconds, error=None, **fields):
+        # for timings measured elsewhere, e.g. in a parser process
+        if not self.enabled:
+            return
+        with self.lock:
+            self.stage_seconds[name].append(seconds)
+            if error is not None:
+                self.stage_errors[name] += 1
+            self._write_event({"ts": time.time(), "stage": name, "seconds": seconds, "error": error, **fields})
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] += n
+
+    def record_fields(self, dataset, columns):
+        """
+        Count the rows and missing values (None/NaN) of every field in a dict of column lists.
+        """
+        if not self.enabled:
+            return
+        missing = {column: int(pd.isna(values).sum()) if isinstance(values, (np.ndarray, pd.Series, pd.Index))
+                   else sum(map(_is_missing, values)) for column, values in columns.items()}
+        with self.lock:
+            for column, values in columns.items():
+                self.field_rows[(dataset, column)] += len(values)
+                self.field_missing[(dataset, column)] += missing[column]
+
+    def summary(self):
+        """
+        Per-stage calls, errors and timing percentiles.
+        """
+        with self.lock:
+            stage_seconds = {name: np.array(seconds) for name, seconds in self.stage_seconds.items()}
+            stage_errors = dict(self.stage_errors)
+
+        rows = [{"stage": name, "calls": len(seconds), "errors": stage_errors.get(name, 0),
+                 "total_seconds": seconds.sum(), "mean_seconds": seconds.mean(),
+                 "p50_seconds": np.percentile(seconds, 50), "p95_seconds": np.percentile(seconds, 95),
+                 "max_seconds": seconds.max()}
+                for name, seconds in stage_seconds.items()]
+        return pd.DataFrame(rows, columns=["stage", "calls", "errors", "total_seconds", "mean_seconds",
+                                           "p50_seconds", "p95_seconds", "max_seconds"]).set_index("stage")
+
+    def throughput(self):
+        """
+        Counted items (pages, cards, itineraries, ...) in total and per second of wall time since the tracer started.
+        """
+        elapsed = time.time() - self.started_at
+        with self.lock:
+            counters = dict(self.counters)
+        return pd.DataFrame({"count": counters, "per_second": {name: n / elapsed for name, n in counters.items()}})
+
+    def field_report(self, min_missing_rate=0):
+        """
+        Missing rate of every field per dataset, highest first.
+        """
+        with self.lock:
+            rows = [{"dataset": dataset, "field": column, "rows": n_rows,
+                     "missing": self.field_missing[(dataset, column)],
+                     "missing_rate": self.field_missing[(dataset, column)] / n_rows if n_rows else np.nan}
+                    for (dataset, column), n_rows in self.field_rows.items()]
+        report = pd.DataFrame(rows, columns=["dataset", "field", "rows", "missing", "missing_rate"])
+        report = report[report["missing_rate"] >= min_missing_rate]
+        return report.sort_values(["dataset", "missing_rate"], ascending=[True, False]).reset_index(drop=True)
+
+    def report(self):
+        return {"stages": self.summary(), "throughput": self.throughput(), "fields": self.field_report()}
+
+    def flush(self):
+        if self.file is not None:
+            with self.lock:
+                self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            with self.lock:
+                self.file.close()
+                self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# tracer used by the support modules; in-memory only until `set_tracer` installs one with a trace file
+_tracer = Tracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer(tracer):
+    """
+    Make `tracer` the one recording the support modules, returning the previous one.
+    """
+    global _tracer
+    previous_tracer, _tracer = _tracer, tracer
+    return previous_tracer
+
+
+def trace_stage(name, **labels):
+    return _tracer.stage(name, **labels)
+
+
+def trace_count(name, n=1):
+    _tracer.count(name, n)
+
+
+def trace_fields(dataset, columns):
+    _tracer.record_fields(dataset, columns)
+
+
+def summarize_trace(trace_path):
+    """
+    Per-stage summary of a JSONL trace file, e.g. one written by an earlier run.
+    """
+    events = pd.read_json(trace_path, lines=True)
+    if events.empty:
+        return events
+
+    grouped = events.groupby("stage")["seconds"]
+    summary = grouped.agg(calls="size", total_seconds="sum", mean_seconds="mean", max_seconds="max")
+    summary["p50_seconds"] = grouped.quantile(0.5)
+    summary["p95_seconds"] = grouped.quantile(0.95)
+    summary["errors"] = events["error"].notna().groupby(events["stage"]).sum()
+    return summary
+
+
+def benchmark_tracer_overhead(n_stages=100000, trace_path=None):
+    """
+    Microseconds added per traced stage, in memory or also writing a JSONL trace.
+    """
+    tracer = Tracer(trace_path=trace_path)
+
+    start = time.perf_counter()
+    for _ in range(n_stages):
+        pass
+    empty_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(n_stages):
+        with tracer.stage("benchmark"):
+            pass
+    traced_seconds = time.perf_counter() - start
+    tracer.close()
+
+    return (traced_seconds - empty_seconds) / n_stages * 1e6
+
+
+# cold import budgets of the support modules, in ms on top of the `import pandas` they all need
+IMPORT_BUDGETS_MS = {
+    "src.data_cleaning_support": 30,
+    "src.data_extraction_support": 60,
+    "src.analysis_support": 30,
+    "src.storage_support": 30,
+}
+# dependencies that only the functions using them should import
+LAZY_DEPENDENCIES = ["selenium", "webdriver_manager", "bs4", "geopy", "requests", "dotenv", "scipy", "pyarrow"]
+
+
+def _parse_importtime(stderr):
+    # lines look like "import time:  self [us] | cumulative | imported package", nested imports indented
+    rows = [line.split("|") for line in stderr.splitlines()
+            if line.startswith("import time:") and "imported package" not in line]
+    return [(name.strip(), int(cumulative)) for _, cumulative, name in rows]
+
+
+def measure_import_time(module, baseline="pandas", repeat=5):
+    """
+    Cold import of `module` with `python -X importtime`, in a fresh interpreter that has already imported
+    `baseline`, best of `repeat` runs. Timing the module in the same run as the baseline keeps the
+    run-to-run noise of the baseline out of the measure; the module is byte-compiled first, so the
+    measure doesn't include compiling a changed source (e.g. with PYTHONDONTWRITEBYTECODE set).
+
+    Returns:
+    - tuple: (milliseconds on top of `baseline`, set of top-level packages imported by the module but not by `baseline`).
+    """
+    import compileall
+
+    repository_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    compileall.compile_dir(os.path.join(repository_path, "src"), quiet=1)
+
+    best_ms = np.inf
+    for _ in range(repeat):
+        code = f"import {baseline}; import {module}" if baseline else f"import {module}"
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=repository_path,
+                                 capture_output=True, text=True, check=True)
+        imports = _parse_importtime(process.stderr)
+        # imports are listed in completion order, so everything after the baseline line was loaded for the module
+        baseline_position = [name for name, _ in imports].index(baseline) + 1 if baseline else 0
+        module_imports = imports[baseline_position:]
+        best_ms = min(best_ms, dict(module_imports)[module] / 1000)
+
+    return best_ms, {name.split(".")[0] for name, _ in module_imports}
+
+
+def check_import_budgets(budgets_ms=None, baseline="pandas", repeat=5):
+    """
+    Regression check of cold import times: every module must stay within its budget on top of the
+    `baseline` import and must not pull in any of `LAZY_DEPENDENCIES` (beyond what `baseline` itself loads).
+
+    Returns:
+    - pd.DataFrame: Overhead milliseconds, budget, eagerly loaded lazy dependencies and pass/fail per module.
+    """
+    budgets_ms = budgets_ms or IMPORT_BUDGETS_MS
+
+    rows = list()
+    for module, budget_ms in budgets_ms.items():
+        overhead_ms, packages = measure_import_time(module, baseline=baseline, repeat=repeat)
+        eager_dependencies = sorted(packages & set(LAZY_DEPENDENCIES))
+        rows.append({"module": module, "overhead_ms": overhead_ms, "budget_ms": budget_ms,
+                     "eager_dependencies": eager_dependencies,
+                     "within_budget": overhead_ms <= budget_ms and not eager_dependencies})
+
+    return pd.DataFrame(rows).set_index("module")
@@ -0,0 +1,289 @@
+import pandas as pd
+import numpy as np
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import heapq
+
+import sys
+sys.path.append("..")
+from src.airport_index_support import get_airport_index
+from src.data_extraction_support import TokenBucket, request_flight_itineraries, create_itineraries_dataframe
+from src.instrumentation_support import trace_count
+
+# search parameters that are not part of a leg: the return leg swaps the airport codes, the rest are labels
+LEG_QUERY_KEYS = {"origin_city", "destination_city", "date_departure", "date_return",
+                  "origin_airport_code", "destination_airport_code"}
+
+# columns of `extract_flight_info_aller_retour`, so composed trips can be used wherever native round trips are
+COMPOSED_COLUMNS = ["score", "price", "price_currency", "duration_departure", "duration_return", "stops_departure",
+                    "stops_return", "departure_departure", "arrival_departure", "departure_return", "arrival_return",
+                    "company_departure", "company_return", "self_transfer", "fare_isChangeAllowed",
+                    "fare_isPartiallyChangeable", "fare_isCancellationAllowed", "fare_isPartiallyRefundable",
+                    "origin_airport_departure", "destination_airport_departure", "origin_airport_return",
+                    "destination_airport_return", "fare_type", "leg_index_departure", "leg_index_return"]
+
+FARE_POLICY_COLUMNS = ["fare_isChangeAllowed", "fare_isPartiallyChangeable", "fare_isCancellationAllowed",
+                       "fare_isPartiallyRefundable"]
+
+
+def leg_key(origin_city, destination_city, date, **request_kwargs):
+    return (origin_city, destination_city, date,
+            tuple(sorted((name, value) for name, value in request_kwargs.items() if value is not None)))
+
+
+def split_round_trip_query(query, label_keys=("week",)):
+    """
+    Outbound and return leg keys of a round trip query (e.g. from `build_flight_query_grid`).
+    """
+    request_kwargs = {key: value for key, value in query.items() if key not in LEG_QUERY_KEYS and key not in label_keys}
+    outbound_codes = {"origin_airport_code": query.get("origin_airport_code"),
+                      "destination_airport_code": query.get("destination_airport_code")}
+    return_codes = {"origin_airport_code": query.get("destination_airport_code"),
+                    "destination_airport_code": query.get("origin_airport_code")}
+
+    outbound_key = leg_key(query["origin_city"], query["destination_city"], query["date_departure"],
+                           **request_kwargs, **outbound_codes)
+    return_key = leg_key(query["destination_city"], query["origin_city"], query["date_return"],
+                         **request_kwargs, **return_codes)
+    return outbound_key, return_key
+
+
+class RoundTripPlanner:
+    """
+    Round trips composed locally from one-way legs, so a sweep over N outbound dates and M return dates
+    costs N + M calls to `request_flight_itineraries` instead of N·M round trip searches.
+
+    Every (route, date) leg set is requested once and kept in memory sorted by price; a round trip query
+    merges its outbound and return legs best-first with a heap and stops after the `top_k` cheapest
+    valid pairs (return leaving at least `min_connection_hours` after the outbound landing), and a
+    price calendar over all the date combinations is answered from the legs already fetched.
+
+    Composed fares are two one-way tickets: their price can differ from the native round trip fare of the
+    same flights, see `compare_with_native_fares`.
+
+    Parameters:
+    - countries_airports_df (pd.DataFrame or AirportIndex): Airport codes table, as built by `create_country_airport_code_df`.
+    - max_workers (int): Maximum number of leg searches in flight at the same time.
+    - requests_per_second (float): Sustained request rate allowed by the RapidAPI plan.
+    - burst (int): Maximum number of requests that can be sent at once.
+    - min_connection_hours (float): Minimum hours between the outbound arrival and the return departure.
+    - cache (ResponseCache): Optional on-disk response cache shared by all the leg searches.
+    - client (ApiClient): Pooled HTTP client shared by all the leg searches.
+    - verbose (bool): Print the leg searches that failed.
+    """
+
+    def __init__(self, countries_airports_df, max_workers=4, requests_per_second=5, burst=5, min_connection_hours=0,
+                 cache=None, client=None, verbose=False):
+        self.airport_index = get_airport_index(countries_airports_df)
+        self.max_workers = max_workers
+        self.rate_limiter = TokenBucket(rate=requests_per_second, capacity=burst)
+        self.min_connection = np.timedelta64(int(min_connection_hours * 60), "m")
+        self.cache = cache
+        self.client = client
+        self.verbose = verbose
+
+        self.legs = dict()
+        self.lock = threading.Lock()
+        self.stats = {"api_calls": 0, "leg_cache_hits": 0, "failed_legs": 0}
+
+    def _request_legs(self, key):
+        origin_city, destination_city, date, request_items = key
+        request_kwargs = dict(request_items)
+        try:
+            itineraries_dict_list = request_flight_itineraries(self.airport_index, origin_city, destination_city, date,
+                                                               rate_limiter=self.rate_limiter, cache=self.cache,
+                                                               client=self.client, **request_kwargs)
+        except Exception as e:
+            if self.verbose == True:
+                print(f"Error requesting {origin_city} -> {destination_city} on {date} due to {e}")
+            itineraries_dict_list = np.nan
+
+        with self.lock:
+            self.stats["api_calls"] += 1
+        if not isinstance(itineraries_dict_list, list):
+            with self.lock:
+                self.stats["failed_legs"] += 1
+            return None
+
+        legs_df = create_itineraries_dataframe(itineraries_dict_list)
+        if legs_df.empty:
+            return legs_df
+        legs_df = legs_df[legs_df["price"].notna()]
+        return legs_df.sort_values("price", kind="stable").reset_index(drop=True)
+
+    def fetch_legs(self, keys):
+        """
+        Request the leg sets of `keys` (from `leg_key`) not fetched yet, concurrently. Failed searches are
+        not kept, so a later call retries them.
+        """
+        missing_keys = [key for key in dict.fromkeys(keys) if key not in self.legs]
+        self.stats["leg_cache_hits"] += len(keys) - len(missing_keys)
+        trace_count("leg_cache_hits", len(keys) - len(missing_keys))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for key, legs_df in zip(missing_keys, executor.map(self._request_legs, missing_keys)):
+                if legs_df is not None:
+                    self.legs[key] = legs_df
+
+        return {key: self.legs.get(key) for key in keys}
+
+    def get_legs(self, origin_city, destination_city, date, **request_kwargs):
+        key = leg_key(origin_city, destination_city, date, **request_kwargs)
+        return self.fetch_legs([key])[key]
+
+    def compose_pairs(self, outbound_df, return_df, top_k=10):
+        """
+        Positions and total prices of the `top_k` cheapest valid (outbound, return) pairs of two
+        price-sorted leg tables, cheapest first. Pairs are popped from a heap in increasing total price,
+        so only the pairs next to the ones already taken are ever priced.
+        """
+        if outbound_df is None or return_df is None or outbound_df.empty or return_df.empty:
+            return []
+
+        outbound_prices = outbound_df["price"].to_numpy(dtype=float)
+        return_prices = return_df["price"].to_numpy(dtype=float)
+        earliest_returns = pd.to_datetime(outbound_df["arrival"]).to_numpy().astype("datetime64[m]") + self.min_connection
+        return_departures = pd.to_datetime(return_df["departure"]).to_numpy().astype("datetime64[m]")
+
+        pairs = list()
+        heap = [(outbound_prices[0] + return_prices[0], 0, 0)]
+        while heap and len(pairs) < top_k:
+            total_price, i, j = heapq.heappop(heap)
+            if return_departures[j] >= earliest_returns[i]:
+                pairs.append((i, j, total_price))
+            # each pair is pushed once: (i + 1, j) only from the first column, (i, j + 1) from every pair
+            if j == 0 and i + 1 < len(outbound_prices):
+                heapq.heappush(heap, (outbound_prices[i + 1] + return_prices[0], i + 1, 0))
+            if j + 1 < len(return_prices):
+                heapq.heappush(heap, (outbound_prices[i] + return_prices[j + 1], i, j + 1))
+
+        return pairs
+
+    def compose_round_trips(self, origin_city, destination_city, date_departure, date_return, top_k=10, **request_kwargs):
+        """
+        The `top_k` cheapest round trips built from the one-way legs of both dates, with the columns of
+        `create_itineraries_dataframe_aller_retour` plus `fare_type` ("composed") and the leg positions.
+        """
+        outbound_key, return_key = split_round_trip_query({"origin_city": origin_city, "destination_city": destination_city,
+                                                           "date_departure": date_departure, "date_return": date_return,
+                                                           **request_kwargs}, label_keys=())
+        legs = self.fetch_legs([outbound_key, return_key])
+        return self._round_trips_dataframe(legs[outbound_key], legs[return_key], top_k)
+
+    def _round_trips_dataframe(self, outbound_df, return_df, top_k):
+        pairs = self.compose_pairs(outbound_df, return_df, top_k=top_k)
+        if not pairs:
+            return pd.DataFrame(columns=COMPOSED_COLUMNS)
+
+        outbound_positions, return_positions, total_prices = map(list, zip(*pairs))
+        outbound = outbound_df.iloc[outbound_positions].reset_index(drop=True)
+        inbound = return_df.iloc[return_positions].reset_index(drop=True)
+
+        round_trips_df = pd.DataFrame({
+            "score": (outbound["score"] + inbound["score"]) / 2,
+            "price": total_prices,
+            "price_currency": outbound["price_currency"],
+            "duration_departure": outbound["duration"],
+            "duration_return": inbound["duration"],
+            "stops_departure": outbound["stops"],
+            "stops_return": inbound["stops"],
+            "departure_departure": outbound["departure"],
+            "arrival_departure": outbound["arrival"],
+            "departure_return": inbound["departure"],
+            "arrival_return": inbound["arrival"],
+            "company_departure": outbound["company"],
+            "company_return": inbound["company"],
+            "self_transfer": outbound["self_transfer"].fillna(False).astype(bool) | inbound["self_transfer"].fillna(False).astype(bool),
+            # a composed trip is only changeable/refundable if both tickets are
+            **{column: outbound[column].fillna(False).astype(bool) & inbound[column].fillna(False).astype(bool)
+               for column in FARE_POLICY_COLUMNS},
+            "origin_airport_departure": outbound["origin_airport"],
+            "destination_airport_departure": outbound["destination_airport"],
+            "origin_airport_return": inbound["origin_airport"],
+            "destination_airport_return": inbound["destination_airport"],
+            "fare_type": "composed",
+            "leg_index_departure": outbound_positions,
+            "leg_index_return": return_positions,
+        })
+        return round_trips_df
+
+    def compose_grid(self, queries, top_k=10, label_keys=("week",)):
+        """
+        Composed counterpart of `request_flight_itineraries_grid`: the same round trip queries (e.g. from
+        `build_flight_query_grid`) answered with the `top_k` composed round trips of each, fetching every
+        distinct leg once.
+
+        Returns:
+        - pd.DataFrame: Composed round trips of every query, with `destination_city` and the label columns attached.
+        """
+        leg_keys = [split_round_trip_query(query, label_keys=label_keys) for query in queries]
+        self.fetch_legs([key for keys in leg_keys for key in keys])
+
+        round_trips_dfs = list()
+        for query, (outbound_key, return_key) in zip(queries, leg_keys):
+            round_trips_df = self._round_trips_dataframe(self.legs.get(outbound_key), self.legs.get(return_key), top_k)
+            if round_trips_df.empty:
+                continue
+            round_trips_df["destination_city"] = query["destination_city"]
+            for key in label_keys:
+                if key in query:
+                    round_trips_df[key] = query[key]
+            round_trips_dfs.append(round_trips_df)
+
+        if not round_trips_dfs:
+            return pd.DataFrame(columns=COMPOSED_COLUMNS)
+
+        return pd.concat(round_trips_dfs).reset_index(drop=True)
+
+    def price_calendar(self, origin_city, destination_city, dates_departure, dates_return, **request_kwargs):
+        """
+        Cheapest composed round trip price for every (departure date, return date) combination, after
+        fetching the N outbound and M return leg sets. Combinations without a valid pair are NaN.
+
+        Returns:
+        - pd.DataFrame: Departure dates as index, return dates as columns.
+        """
+        calendar_queries = [{"origin_city": origin_city, "destination_city": destination_city, "date_departure": date_departure,
+                             "date_return": date_return, **request_kwargs}
+                            for date_departure in dates_departure for date_return in dates_return]
+        leg_keys = [split_round_trip_query(query, label_keys=()) for query in calendar_queries]
+        self.fetch_legs([key for keys in leg_keys for key in keys])
+
+        prices = list()
+        for outbound_key, return_key in leg_keys:
+            pairs = self.compose_pairs(self.legs.get(outbound_key), self.legs.get(return_key), top_k=1)
+            prices.append(pairs[0][2] if pairs else np.nan)
+
+        calendar = pd.DataFrame(np.array(prices, dtype=float).reshape(len(dates_departure), len(dates_return)),
+                                index=pd.Index(dates_departure, name="date_departure"),
+                                columns=pd.Index(dates_return, name="date_return"))
+        return calendar
+
+
+def compare_with_native_fares(composed_df, native_df, keys=("destination_city", "week")):
+    """
+    Cheapest composed and native round trip fares per query side by side, e.g. for `compose_grid` and
+    `request_flight_itineraries_grid` run on the same queries.
+
+    Returns:
+    - pd.DataFrame: Cheapest native and composed price per `keys`, the saving of the composed fare
+      (negative when the native round trip is cheaper) and which one to book.
+    """
+    keys = list(keys)
+    cheapest_native = native_df.groupby(keys)["price"].min().rename("native_price")
+    cheapest_composed = composed_df.groupby(keys)["price"].min().rename("composed_price")
+
+    comparison = pd.concat([cheapest_native, cheapest_composed], axis=1)
+    comparison["composed_saving"] = comparison["native_price"] - comparison["composed_price"]
+    comparison["cheapest_fare_type"] = np.where(comparison["composed_saving"] > 0, "composed",
+                                                np.where(comparison["native_price"].notna(), "round_trip", "composed"))
+    return comparison
+
+
+def stack_with_native_fares(composed_df, native_df):
+    """
+    Native round trips and composed ones in one table, told apart by `fare_type`.
+    """
+    native_df = native_df.assign(fare_type="round_trip")
+    return pd.concat([native_df, composed_df], ignore_index=True)
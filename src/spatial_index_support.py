@@ -0,0 +1,221 @@
+import pandas as pd
+import numpy as np
+
+import time
+
+import sys
+sys.path.append("..")
+from src.geocoding_support import coordinates_to_unit_vectors, EARTH_RADIUS_KM
+from src.trip_optimizer_support import destination_key
+
+
+def km_to_chord(distance_km):
+    # straight-line distance between two points of the unit sphere `distance_km` apart along the surface
+    return 2 * np.sin(np.minimum(np.asarray(distance_km, dtype=float) / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2, 0, 1))
+
+
+def haversine_km(latitudes_a, longitudes_a, latitudes_b, longitudes_b):
+    """
+    Great-circle distance in km between points a and b, element-wise with numpy broadcasting.
+    """
+    latitudes_a, longitudes_a, latitudes_b, longitudes_b = (np.radians(np.asarray(values, dtype=float)) for values in
+                                                            (latitudes_a, longitudes_a, latitudes_b, longitudes_b))
+    a = (np.sin((latitudes_b - latitudes_a) / 2) ** 2
+         + np.cos(latitudes_a) * np.cos(latitudes_b) * np.sin((longitudes_b - longitudes_a) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def haversine_matrix_km(latitudes_a, longitudes_a, latitudes_b, longitudes_b):
+    """
+    Distances in km between every point of a (rows) and every point of b (columns) in one vectorized pass.
+    """
+    return haversine_km(np.asarray(latitudes_a, dtype=float)[:, None], np.asarray(longitudes_a, dtype=float)[:, None],
+                        np.asarray(latitudes_b, dtype=float)[None, :], np.asarray(longitudes_b, dtype=float)[None, :])
+
+
+class ActivityIndex:
+    """
+    KD-tree over the coordinates of a destination's activities, for radius and nearest-neighbour queries.
+
+    Points are stored as unit vectors, so straight-line (chord) distances in the tree map exactly to
+    great-circle distances and the index works at any latitude without projecting. Queries return the
+    row positions of the activities in the DataFrame the index was built from, closest first.
+
+    Parameters:
+    - latitudes (array): Activity latitudes; rows without coordinates are left out of the index.
+    - longitudes (array): Activity longitudes.
+    - positions (array): Row positions returned for each point, `range(len(latitudes))` by default.
+    """
+
+    def __init__(self, latitudes, longitudes, positions=None):
+        from scipy.spatial import cKDTree
+
+        latitudes = pd.to_numeric(pd.Series(latitudes), errors="coerce").to_numpy(dtype=float)
+        longitudes = pd.to_numeric(pd.Series(longitudes), errors="coerce").to_numpy(dtype=float)
+        positions = np.arange(len(latitudes)) if positions is None else np.asarray(positions)
+
+        known = ~(np.isnan(latitudes) | np.isnan(longitudes))
+        self.latitudes = latitudes[known]
+        self.longitudes = longitudes[known]
+        self.positions = positions[known]
+        self.tree = cKDTree(coordinates_to_unit_vectors(self.latitudes, self.longitudes))
+
+    @classmethod
+    def from_dataframe(cls, activities_df):
+        return cls(activities_df["latitude"], activities_df["longitude"])
+
+    def __len__(self):
+        return len(self.positions)
+
+    def within(self, latitude, longitude, radius_km):
+        """
+        Positions and distances (km) of the activities within `radius_km` of the point, closest first.
+        """
+        point = coordinates_to_unit_vectors([latitude], [longitude])[0]
+        indices = np.asarray(self.tree.query_ball_point(point, km_to_chord(radius_km)), dtype=int)
+        distances = chord_to_km(np.linalg.norm(self.tree.data[indices] - point, axis=1))
+        order = np.argsort(distances, kind="stable")
+        return self.positions[indices[order]], distances[order]
+
+    def nearest(self, latitude, longitude, k=5, max_distance_km=None):
+        """
+        Positions and distances (km) of the `k` activities closest to the point, optionally within `max_distance_km`.
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return self.positions[:0], np.empty(0)
+
+        upper_bound = km_to_chord(max_distance_km) if max_distance_km is not None else np.inf
+        chords, indices = self.tree.query(coordinates_to_unit_vectors([latitude], [longitude])[0], k=k,
+                                          distance_upper_bound=upper_bound)
+        chords, indices = np.atleast_1d(chords), np.atleast_1d(indices)
+        found = np.isfinite(chords)
+        return self.positions[indices[found]], chord_to_km(chords[found])
+
+    def count_within(self, latitudes, longitudes, radius_km):
+        """
+        Number of activities within `radius_km` of each of many points (e.g. all candidate hotels) at once.
+        """
+        points = coordinates_to_unit_vectors(latitudes, longitudes)
+        return np.asarray(self.tree.query_ball_point(points, km_to_chord(radius_km), return_length=True))
+
+
+def build_activity_indexes(activities_df, destination_column="destination"):
+    """
+    One `ActivityIndex` per destination (keyed by `destination_key`), whose queries return row
+    positions in `activities_df`.
+    """
+    destination_keys = activities_df[destination_column].map(destination_key).to_numpy()
+    latitudes = activities_df["latitude"].to_numpy()
+    longitudes = activities_df["longitude"].to_numpy()
+
+    indexes = dict()
+    for key in pd.unique(destination_keys):
+        positions = np.flatnonzero(destination_keys == key)
+        indexes[key] = ActivityIndex(latitudes[positions], longitudes[positions], positions=positions)
+    return indexes
+
+
+def cluster_days(latitudes, longitudes, n_days, max_per_day=None, n_iterations=20):
+    """
+    Group chosen activities into `n_days` geographically compact days.
+
+    K-means on the unit vectors of the points, started from the points farthest apart so the result is
+    deterministic. With `max_per_day`, points are then given to their closest day with room left,
+    closest pairs first.
+
+    Returns:
+    - np.ndarray: Day number (0 to n_days - 1) of every point, days ordered by their first point.
+    """
+    points = coordinates_to_unit_vectors(latitudes, longitudes)
+    n_points = len(points)
+    n_days = min(n_days, n_points)
+    if n_days == 0:
+        return np.empty(0, dtype=int)
+    if max_per_day is not None and max_per_day * n_days < n_points:
+        raise ValueError(f"{n_points} activities don't fit in {n_days} days of {max_per_day}")
+
+    # farthest-point initialization: the point farthest from the mean, then each time the farthest from those taken
+    chosen = [int(np.argmax(np.linalg.norm(points - points.mean(axis=0), axis=1)))]
+    distances = np.linalg.norm(points - points[chosen[0]], axis=1)
+    for _ in range(n_days - 1):
+        chosen.append(int(np.argmax(distances)))
+        distances = np.minimum(distances, np.linalg.norm(points - points[chosen[-1]], axis=1))
+    centers = points[chosen]
+
+    labels = np.full(n_points, -1)
+    for _ in range(n_iterations):
+        point_center_distances = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+        new_labels = point_center_distances.argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for day in range(n_days):
+            if (labels == day).any():
+                centers[day] = points[labels == day].mean(axis=0)
+
+    if max_per_day is not None:
+        point_center_distances = np.linalg.norm(points[:, None, :] - centers[None, :, :], axis=2)
+        labels = np.full(n_points, -1)
+        room = np.full(n_days, max_per_day)
+        for flat_index in np.argsort(point_center_distances, axis=None, kind="stable"):
+            point, day = divmod(int(flat_index), n_days)
+            if labels[point] == -1 and room[day] > 0:
+                labels[point] = day
+                room[day] -= 1
+
+    # renumber days in order of first appearance
+    _, first = np.unique(labels, return_index=True)
+    day_numbers = np.zeros(n_days, dtype=int)
+    day_numbers[labels[np.sort(first)]] = np.arange(len(first))
+    return day_numbers[labels]
+
+
+def score_hotel_proximity(hotel_latitudes, hotel_longitudes, activity_latitudes, activity_longitudes, radius_km=1):
+    """
+    Proximity of every candidate hotel to a set of activities, from one haversine distance matrix.
+
+    Returns:
+    - pd.DataFrame: Per hotel, mean, max and nearest distance (km) to the activities and how many are within `radius_km`.
+    """
+    distances = haversine_matrix_km(hotel_latitudes, hotel_longitudes, activity_latitudes, activity_longitudes)
+    if distances.shape[1] == 0:
+        return pd.DataFrame({"mean_distance_km": np.nan, "max_distance_km": np.nan, "nearest_distance_km": np.nan,
+                             "activities_within_radius": 0}, index=range(distances.shape[0]))
+
+    return pd.DataFrame({
+        "mean_distance_km": np.nanmean(distances, axis=1),
+        "max_distance_km": np.nanmax(distances, axis=1),
+        "nearest_distance_km": np.nanmin(distances, axis=1),
+        "activities_within_radius": (distances <= radius_km).sum(axis=1),
+    })
+
+
+def benchmark_spatial_queries(index, n_queries=1000, radius_km=1, k=5, seed=0):
+    """
+    Microseconds per radius and k-nearest query of `index` against a brute-force haversine scan,
+    on random points around the indexed activities.
+    """
+    rng = np.random.default_rng(seed)
+    latitudes = rng.uniform(index.latitudes.min(), index.latitudes.max(), n_queries)
+    longitudes = rng.uniform(index.longitudes.min(), index.longitudes.max(), n_queries)
+
+    queries = {
+        "within": lambda latitude, longitude: index.within(latitude, longitude, radius_km),
+        "nearest": lambda latitude, longitude: index.nearest(latitude, longitude, k=k),
+        "brute_force_within": lambda latitude, longitude: np.flatnonzero(
+            haversine_km(latitude, longitude, index.latitudes, index.longitudes) <= radius_km),
+    }
+
+    timings = dict()
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for latitude, longitude in zip(latitudes, longitudes):
+            query(latitude, longitude)
+        timings[f"{name}_us"] = (time.perf_counter() - start) / n_queries * 1e6
+
+    return timings
@@ -0,0 +1,482 @@
+import pandas as pd
+import numpy as np
+
+import datetime
+import json
+import ast
+import time
+import os
+import shutil
+
+# column types per dataset; columns missing from a given file are skipped
+DATASET_SCHEMAS = {
+    "flights": {
+        "datetime": ["departure_departure", "arrival_departure", "departure_return", "arrival_return",
+                     "departure", "arrival"],
+        "boolean": ["self_transfer", "fare_isChangeAllowed", "fare_isPartiallyChangeable",
+                    "fare_isCancellationAllowed", "fare_isPartiallyRefundable"],
+        "category": ["price_currency", "company_departure", "company_return", "company", "destination_city",
+                     "origin_airport_departure", "destination_airport_departure", "origin_airport_return",
+                     "destination_airport_return", "origin_airport", "destination_airport"],
+        "list": [],
+        "partition": ["destination_city", "week"]
+    },
+    "accommodations": {
+        "datetime": [],
+        "boolean": ["close_to_metro", "sustainability_cert", "double_bed", "single_bed", "free_cancellation",
+                    "breakfast_included", "pay_at_hotel", "free_taxi"],
+        "category": ["price_currency", "destination", "type"],
+        "list": [],
+        "partition": ["destination", "week"]
+    },
+    "activities": {
+        "datetime": [],
+        "boolean": [],
+        "category": ["currency", "category", "destination"],
+        "list": ["available_days", "available_times"],
+        "partition": ["destination", "week"]
+    },
+    "availability": {
+        "datetime": ["date"],
+        "boolean": [],
+        "category": [],
+        "list": [],
+        "partition": []
+    },
+    "hotels": {
+        "datetime": [],
+        "boolean": ["close_to_metro", "sustainability_cert"],
+        "category": ["country", "destination"],
+        "list": [],
+        "partition": []
+    },
+    "offers": {
+        "datetime": ["checkin", "checkout"],
+        "boolean": ["double_bed", "single_bed", "free_cancellation", "breakfast_included", "pay_at_hotel", "free_taxi"],
+        "category": ["price_currency", "room_type", "destination", "type"],
+        "list": [],
+        "partition": ["destination", "week"]
+    }
+}
+
+YES_NO_BOOLEANS = {"Yes": True, "No": False, "True": True, "False": False, True: True, False: False}
+
+
+def parse_list_column(series):
+    # lists come back from CSV as their Python repr, e.g. "['05', '08']"
+    return series.map(lambda value: ast.literal_eval(value) if isinstance(value, str) else value)
+
+
+def prepare_dataframe(dataframe, dataset):
+    """
+    Drop CSV index leftovers (`Unnamed: 0`) and cast columns to the dtypes of `DATASET_SCHEMAS[dataset]`:
+    datetimes, nullable booleans (also from "Yes"/"No"), categoricals and native lists.
+    """
+    schema = DATASET_SCHEMAS[dataset]
+    dataframe = dataframe.loc[:, ~dataframe.columns.astype(str).str.startswith("Unnamed")].copy()
+
+    for column in schema["datetime"]:
+        if column in dataframe:
+            dataframe[column] = pd.to_datetime(dataframe[column], errors="coerce")
+
+    for column in schema["boolean"]:
+        if column in dataframe:
+            dataframe[column] = dataframe[column].map(YES_NO_BOOLEANS).astype("boolean")
+
+    for column in schema["category"]:
+        if column in dataframe:
+            dataframe[column] = dataframe[column].astype("category")
+
+    for column in schema["list"]:
+        if column in dataframe:
+            dataframe[column] = parse_list_column(dataframe[column])
+
+    return dataframe.reset_index(drop=True)
+
+
+def write_dataset(dataframe, path, dataset, partition_cols=None, overwrite=True):
+    """
+    Write a scraped dataset as Parquet, partitioned by destination and week when those columns exist.
+
+    Parameters:
+    - dataframe (pd.DataFrame): Raw or cleaned dataset, as read from CSV or returned by the extractors.
+    - path (str): Output directory of the partitioned dataset.
+    - dataset (str): "flights", "accommodations", "activities" or "availability", selects the dtypes and default partitions.
+    - partition_cols (list): Partition columns, overriding the dataset defaults.
+    - overwrite (bool): Remove an existing dataset at `path` before writing.
+    """
+    dataframe = prepare_dataframe(dataframe, dataset)
+    partition_cols = partition_cols if partition_cols is not None else DATASET_SCHEMAS[dataset]["partition"]
+    partition_cols = [column for column in partition_cols if column in dataframe]
+
+    if overwrite and os.path.exists(path):
+        shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+
+    for column in partition_cols:
+        # partition values become directory names; categoricals would also write their unused categories
+        if isinstance(dataframe[column].dtype, pd.CategoricalDtype):
+            dataframe[column] = dataframe[column].astype(str)
+
+    dataframe.to_parquet(path, engine="pyarrow", index=False, partition_cols=partition_cols or None)
+
+
+def _to_list(value):
+    # pyarrow gives list cells back as (nested) numpy arrays
+    if isinstance(value, np.ndarray):
+        return [_to_list(item) for item in value]
+    return value
+
+
+def restore_list_columns(dataframe):
+    """
+    Turn the list columns read from Parquet, which come back as numpy arrays, into the Python lists
+    that were written (e.g. `available_days` and `available_times`).
+    """
+    for column in dataframe.columns[dataframe.dtypes == object]:
+        values = dataframe[column].dropna()
+        if len(values) and isinstance(values.iloc[0], np.ndarray):
+            dataframe[column] = dataframe[column].map(_to_list)
+    return dataframe
+
+
+def read_dataset(path, columns=None, filters=None):
+    """
+    Read a Parquet dataset, loading only `columns` and the partitions/row groups matching `filters`.
+    List columns come back as Python lists, as written.
+
+    `filters` uses the pyarrow syntax, e.g. `[("destination_city", "==", "Paris"), ("week", "in", [1, 2])]`.
+    """
+    return restore_list_columns(pd.read_parquet(path, engine="pyarrow", columns=columns, filters=filters))
+
+
+def convert_csv_to_parquet(csv_path, parquet_path, dataset, partition_cols=None):
+    write_dataset(pd.read_csv(csv_path, index_col=0), parquet_path, dataset, partition_cols=partition_cols)
+
+
+def benchmark_load(csv_path, parquet_path, columns=None, filters=None, repeat=3):
+    """
+    Compare load time and memory of the current `pd.read_csv` call against `read_dataset`.
+
+    Returns:
+    - pd.DataFrame: Seconds per load and deep memory usage (MB) for each reader.
+    """
+    readers = {
+        "csv": lambda: pd.read_csv(csv_path, index_col=0),
+        "parquet": lambda: read_dataset(parquet_path),
+    }
+    if columns is not None or filters is not None:
+        readers["parquet_projected"] = lambda: read_dataset(parquet_path, columns=columns, filters=filters)
+
+    results = list()
+    for reader_name, reader in readers.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            dataframe = reader()
+        results.append({"reader": reader_name, "seconds": (time.perf_counter() - start) / repeat,
+                        "memory_mb": dataframe.memory_usage(deep=True).sum() / 1024 ** 2, "rows": len(dataframe)})
+
+    return pd.DataFrame(results)
+
+
+# append-only sinks for streaming extraction
+class _PartSink:
+    """
+    Append-only dataset made of part files in `path`. Batches written between two `commit` calls go
+    to a temporary part that is renamed into place on commit, so a crash never leaves half-written
+    parts behind; leftovers of an interrupted run are removed when the sink is opened again.
+    """
+    suffix = None
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        for file_name in os.listdir(path):
+            if file_name.endswith(".tmp"):
+                os.remove(os.path.join(path, file_name))
+
+        self.n_parts = len([file_name for file_name in os.listdir(path) if file_name.endswith(self.suffix)])
+        self.temporary_path = None
+        self.stats = {"batches": 0, "rows": 0, "parts": 0}
+
+    def write(self, dataframe):
+        if dataframe is None or dataframe.empty:
+            return
+        if self.temporary_path is None:
+            self.temporary_path = os.path.join(self.path, f"part-{self.n_parts:05d}{self.suffix}.tmp")
+        self._write(dataframe)
+        self.stats["batches"] += 1
+        self.stats["rows"] += len(dataframe)
+
+    def commit(self):
+        if self.temporary_path is None:
+            return
+        self._finish()
+        os.replace(self.temporary_path, self.temporary_path[:-len(".tmp")])
+        self.temporary_path = None
+        self.n_parts += 1
+        self.stats["parts"] += 1
+
+    def discard(self):
+        if self.temporary_path is None:
+            return
+        self._finish()
+        os.remove(self.temporary_path)
+        self.temporary_path = None
+
+    def close(self):
+        self.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonlSink(_PartSink):
+    """
+    Append-only JSON Lines dataset; every batch is flushed to disk as soon as it is written.
+    """
+    suffix = ".jsonl"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.file = None
+
+    def _write(self, dataframe):
+        if self.file is None:
+            self.file = open(self.temporary_path, "w", encoding="utf-8")
+        self.file.write(dataframe.to_json(orient="records", lines=True, date_format="iso", force_ascii=False).rstrip("\n") + "\n")
+        self.file.flush()
+
+    def _finish(self):
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+
+class ParquetSink(_PartSink):
+    """
+    Append-only Parquet dataset, one row group per batch. The batches of a part are kept as Arrow
+    tables until commit, where they get a common schema (pages where a column was always empty
+    come back as null columns) before being written.
+    """
+    suffix = ".parquet"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.tables = list()
+
+    def _write(self, dataframe):
+        import pyarrow as pa
+
+        dataframe = dataframe.copy()
+        for column in dataframe.columns[dataframe.isna().all().to_numpy()]:
+            dataframe[column] = pd.Series([None] * len(dataframe), index=dataframe.index, dtype=object)
+        self.tables.append(pa.Table.from_pandas(dataframe, preserve_index=False))
+
+    def _finish(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.unify_schemas([table.schema for table in self.tables], promote_options="permissive")
+        with pq.ParquetWriter(self.temporary_path, schema) as writer:
+            for table in self.tables:
+                columns = [table.column(field.name).cast(field.type) if field.name in table.column_names
+                           else pa.nulls(table.num_rows, field.type) for field in schema]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        self.tables = list()
+
+
+def read_sink(path):
+    """
+    Read the committed parts of a `JsonlSink` or `ParquetSink` dataset into one DataFrame.
+    """
+    part_paths = sorted(os.path.join(path, file_name) for file_name in os.listdir(path)
+                        if file_name.endswith((".jsonl", ".parquet")))
+    parts = [pd.read_json(part_path, lines=True) if part_path.endswith(".jsonl") else restore_list_columns(pd.read_parquet(part_path))
+             for part_path in part_paths]
+
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+class CrawlCheckpoint:
+    """
+    Keys of the completed jobs of a sweep, kept in a JSON file so an interrupted sweep resumes
+    after the last completed (destination, week, party) job instead of starting over.
+
+    Parameters:
+    - path (str): JSON file holding the completed keys.
+    - key_fields (tuple): Job fields identifying a unit of work, e.g. ("destination", "week", "type").
+    """
+
+    def __init__(self, path, key_fields):
+        self.path = path
+        self.key_fields = tuple(key_fields)
+        self.completed = dict()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.completed = json.load(file)["completed"]
+
+    def key(self, job):
+        return "|".join(str(job.get(field)) for field in self.key_fields)
+
+    def is_done(self, job):
+        return self.key(job) in self.completed
+
+    def pending(self, jobs):
+        return [job for job in jobs if not self.is_done(job)]
+
+    def mark_done(self, job, **info):
+        self.completed[self.key(job)] = {"finished_at": datetime.datetime.now().isoformat(timespec="seconds"), **info}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump({"key_fields": self.key_fields, "completed": self.completed}, file)
+        os.replace(temporary_path, self.path)
+
+
+# hotel dimension and offer fact tables
+# Booking hotel URLs look like https://www.booking.com/hotel/fr/the-five.es.html?aid=...&label=...&srpvid=...;
+# the country and slug of the path identify the hotel, the querystring is search state and tracking
+HOTEL_URL_REGEX = r"/hotel/(?P<country>[a-z]{2})/(?P<slug>[^./?#]+)"
+HOTEL_COLUMNS = ["name", "distance_city_center_km", "score", "n_comments", "close_to_metro", "sustainability_cert",
+                 "location_score", "destination"]
+# search parameters kept from the URL querystring as offer columns
+OFFER_URL_PARAMS = {"checkin": "checkin", "checkout": "checkout", "adults": "group_adults", "children": "group_children"}
+
+
+def canonicalize_hotel_urls(urls):
+    """
+    Canonical hotel id ("fr/the-five") and tracking-free URL of every Booking hotel URL.
+    URLs without a hotel path get a missing id.
+    """
+    urls = pd.Series(urls).astype("string")
+    parts = urls.str.extract(HOTEL_URL_REGEX)
+    hotel_ids = parts["country"] + "/" + parts["slug"]
+
+    return pd.DataFrame({"hotel_id": hotel_ids, "country": parts["country"],
+                         "url": "https://www.booking.com/hotel/" + hotel_ids + ".html"}, index=urls.index)
+
+
+def extract_url_params(urls, params):
+    """
+    Values of the querystring `params` of every URL, one column per parameter.
+    """
+    urls = pd.Series(urls).astype("string")
+    return pd.DataFrame({column: urls.str.extract(rf"[?&]{param}=([^&#]*)", expand=False)
+                         for column, param in params.items()}, index=urls.index)
+
+
+def normalize_accommodations(dataframe, hotels_df=None):
+    """
+    Split scraped accommodations into a hotel dimension table and a slim offers fact table.
+
+    Hotels are identified by the country and slug of their Booking URL path, so the same hotel seen for
+    several party sizes, weeks or sweeps becomes a single row with an integer `hotel_key`. The tracking
+    querystring is dropped; the search dates and party size it carried are kept as offer columns. Offers
+    keep the price and room details with integer keys, nullable booleans (from "Yes"/"No") and categoricals.
+
+    Parameters:
+    - dataframe (pd.DataFrame): Accommodations as returned by `extract_all_accommodations` or read from the CSVs.
+    - hotels_df (pd.DataFrame): Hotel table of earlier sweeps; its keys are kept and new hotels appended.
+
+    Returns:
+    - tuple: (hotels_df, offers_df).
+    """
+    dataframe = dataframe.loc[:, ~dataframe.columns.astype(str).str.startswith("Unnamed")].reset_index(drop=True)
+    canonical = canonicalize_hotel_urls(dataframe["url"])
+    # hotels without a hotel path (e.g. apartments listed elsewhere) keep their URL without the querystring
+    canonical["hotel_id"] = canonical["hotel_id"].fillna(dataframe["url"].astype("string").str.split("?").str[0])
+    canonical["url"] = canonical["url"].fillna(canonical["hotel_id"])
+
+    # latest values of every hotel seen in this sweep (score and comments move between sweeps)
+    hotel_columns = [column for column in HOTEL_COLUMNS if column in dataframe]
+    new_hotels_df = pd.concat([canonical, dataframe[hotel_columns]], axis=1).drop_duplicates("hotel_id", keep="last")
+
+    known_keys = dict(zip(hotels_df["hotel_id"], hotels_df["hotel_key"])) if hotels_df is not None else dict()
+    next_key = max(known_keys.values(), default=-1) + 1
+    is_new = ~new_hotels_df["hotel_id"].isin(known_keys)
+    known_keys.update(zip(new_hotels_df.loc[is_new, "hotel_id"], range(next_key, next_key + is_new.sum())))
+    new_hotels_df.insert(0, "hotel_key", new_hotels_df["hotel_id"].map(known_keys))
+
+    if hotels_df is not None:
+        new_hotels_df = pd.concat([hotels_df[~hotels_df["hotel_id"].isin(new_hotels_df["hotel_id"])], new_hotels_df])
+    hotels_df = new_hotels_df
+    hotels_df["hotel_key"] = hotels_df["hotel_key"].astype("int32")
+    if "n_comments" in hotels_df:
+        hotels_df["n_comments"] = pd.to_numeric(hotels_df["n_comments"], errors="coerce").astype("Int32")
+    hotels_df["hotel_id"] = hotels_df["hotel_id"].astype("string")
+    hotels_df = prepare_dataframe(hotels_df.sort_values("hotel_key"), "hotels")
+
+    offer_columns = [column for column in dataframe.columns if column not in hotel_columns + ["url"] or column == "destination"]
+    offers_df = dataframe[offer_columns].copy()
+    offers_df.insert(0, "hotel_key", canonical["hotel_id"].map(known_keys).astype("int32"))
+    for column, values in extract_url_params(dataframe["url"], OFFER_URL_PARAMS).items():
+        if column not in offers_df:
+            offers_df[column] = pd.to_numeric(values, downcast="integer") if column in ("adults", "children") else values
+    if "total_price_amount" in offers_df:
+        offers_df["total_price_amount"] = pd.to_numeric(offers_df["total_price_amount"], errors="coerce", downcast="float")
+    if "week" in offers_df:
+        offers_df["week"] = pd.to_numeric(offers_df["week"], downcast="integer")
+
+    return hotels_df, prepare_dataframe(offers_df, "offers")
+
+
+def denormalize_accommodations(hotels_df, offers_df):
+    """
+    Join the offers back to their hotels, giving one row per offer as in the scraped table (canonical URLs).
+    """
+    hotel_columns = [column for column in hotels_df.columns if column not in offers_df.columns or column == "hotel_key"]
+    return offers_df.merge(hotels_df[hotel_columns], on="hotel_key", how="left")
+
+
+def write_accommodation_tables(hotels_df, offers_df, path, overwrite=True):
+    """
+    Write the hotel table to `path`/hotels.parquet and the offers as a dataset in `path`/offers.
+    """
+    os.makedirs(path, exist_ok=True)
+    hotels_df.to_parquet(os.path.join(path, "hotels.parquet"), engine="pyarrow", index=False)
+    write_dataset(offers_df, os.path.join(path, "offers"), "offers", overwrite=overwrite)
+
+
+def read_accommodation_tables(path, filters=None):
+    """
+    Read the hotel table and the offers written by `write_accommodation_tables`, offers filtered with `filters`.
+    """
+    hotels_df = pd.read_parquet(os.path.join(path, "hotels.parquet"), engine="pyarrow")
+    offers_df = read_dataset(os.path.join(path, "offers"), filters=filters)
+    return hotels_df, offers_df
+
+
+def _path_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(directory, file_name))
+               for directory, _, file_names in os.walk(path) for file_name in file_names)
+
+
+def benchmark_accommodation_footprint(csv_path, output_path):
+    """
+    Memory and file size of a scraped accommodations CSV against its hotel and offer tables.
+
+    Returns:
+    - pd.DataFrame: Rows, deep memory (MB) and size on disk (MB) of the raw table and each normalized table.
+    """
+    accommodations_df = pd.read_csv(csv_path, index_col=0)
+    hotels_df, offers_df = normalize_accommodations(accommodations_df)
+    write_accommodation_tables(hotels_df, offers_df, output_path)
+
+    tables = {
+        "csv": (accommodations_df, csv_path),
+        "hotels": (hotels_df, os.path.join(output_path, "hotels.parquet")),
+        "offers": (offers_df, os.path.join(output_path, "offers")),
+    }
+    return pd.DataFrame([{"table": name, "rows": len(dataframe),
+                          "memory_mb": dataframe.memory_usage(deep=True).sum() / 1024 ** 2,
+                          "file_mb": _path_size(path) / 1024 ** 2}
+                         for name, (dataframe, path) in tables.items()]).set_index("table")
@@ -0,0 +1,314 @@
+import pandas as pd
+import numpy as np
+
+import itertools
+import heapq
+import time
+
+import sys
+sys.path.append("..")
+from src.airport_index_support import normalize_name, CITY_ALIASES
+from src.data_cleaning_support import build_availability_table, resolve_available_dates, time_to_minutes, ANY_TIME
+
+# destination spellings left by the cleaning step, e.g. "New" from splitting "New York JFK" on spaces
+DESTINATION_ALIASES = {"new": "new york"}
+
+TRIP_COLUMNS = ["destination", "week", "total_price", "flight_price", "accommodation_price", "activities_price", "score",
+                "flight_index", "accommodation_index", "activity_indices", "activity_starts"]
+
+
+def destination_key(destination):
+    """
+    Common key for the destination names of the three datasets ("Rome", "roma", "New", "nueva-york").
+    """
+    key = normalize_name(destination)
+    key = CITY_ALIASES.get(key, key)
+    return DESTINATION_ALIASES.get(key, key)
+
+
+def _group_positions(dataframe, destination_column):
+    keys = zip(dataframe[destination_column].map(destination_key), dataframe["week"])
+    groups = dict()
+    for position, key in enumerate(keys):
+        groups.setdefault(key, []).append(position)
+    return {key: np.array(positions) for key, positions in groups.items()}
+
+
+class TripOptimizer:
+    """
+    Top-K search of combined trips (round-trip flight + accommodation + activity schedule) per destination and week.
+
+    Flights, accommodations and activities are grouped by destination and week once and kept as arrays
+    sorted by cost, so a query walks them best-first and stops as soon as the lower bound of the next
+    candidate cannot enter the current top-K, instead of cross joining the three tables.
+
+    Activities are scheduled greedily, cheapest first, in the time between the arrival of the outbound
+    flight (plus `arrival_buffer_hours`) and the departure of the return flight (minus `departure_buffer_hours`),
+    using their available days and start times without overlaps.
+
+    Parameters:
+    - flights_df (pd.DataFrame): Cleaned round-trip itineraries (`extract_flight_info_aller_retour` columns, `week`, `destination_city`).
+    - accommodations_df (pd.DataFrame): Cleaned accommodations with `total_price_amount`, `score`, `destination` and `week`.
+    - activities_df (pd.DataFrame): Cleaned activities with `price`, `hours_min`, `destination`, `week` and availability columns.
+    - availability_df (pd.DataFrame): Output of `build_availability_table(activities_df)`, built here if not given.
+    - arrival_buffer_hours (float): Hours after landing before the first activity can start.
+    - departure_buffer_hours (float): Hours before the return flight when the last activity must end.
+    - default_activity_hours (float): Duration used for activities without a parsed duration.
+    - any_time_start (str): Start time assumed for days without fixed start times.
+    """
+
+    def __init__(self, flights_df, accommodations_df, activities_df=None, availability_df=None, arrival_buffer_hours=2,
+                 departure_buffer_hours=3, default_activity_hours=2, any_time_start="10:00"):
+        self.flights_df = flights_df.reset_index(drop=True)
+        self.accommodations_df = accommodations_df.reset_index(drop=True)
+        self.activities_df = activities_df.reset_index(drop=True) if activities_df is not None else None
+
+        self.arrival_buffer = np.timedelta64(int(arrival_buffer_hours * 60), "m")
+        self.departure_buffer = np.timedelta64(int(departure_buffer_hours * 60), "m")
+        self.any_time_start = time_to_minutes(any_time_start)
+        self.schedules = dict()
+
+        flight_prices = pd.to_numeric(self.flights_df["price"], errors="coerce").to_numpy(dtype=float)
+        self.flight_arrays = {
+            "price": flight_prices,
+            "score": pd.to_numeric(self.flights_df["score"], errors="coerce").fillna(0).to_numpy(dtype=float),
+            "stops": np.maximum(self.flights_df["stops_departure"].to_numpy(), self.flights_df["stops_return"].to_numpy()),
+            "arrival": pd.to_datetime(self.flights_df["arrival_departure"]).to_numpy().astype("datetime64[m]"),
+            "departure": pd.to_datetime(self.flights_df["departure_return"]).to_numpy().astype("datetime64[m]"),
+        }
+        self.accommodation_arrays = {
+            "price": pd.to_numeric(self.accommodations_df["total_price_amount"], errors="coerce").to_numpy(dtype=float),
+            # Booking scores go from 0 to 10, flight scores from 0 to 1
+            "score": pd.to_numeric(self.accommodations_df["score"], errors="coerce").fillna(0).to_numpy(dtype=float) / 10,
+        }
+
+        # positions per (destination, week), sorted by each objective; rows without price can't be priced
+        self.flight_groups = self._sorted_groups(self.flights_df, "destination_city", self.flight_arrays)
+        self.accommodation_groups = self._sorted_groups(self.accommodations_df, "destination", self.accommodation_arrays)
+        self.activity_groups = dict()
+
+        if self.activities_df is not None:
+            if availability_df is None:
+                availability_df = build_availability_table(self.activities_df)
+            self._prepare_activities(availability_df, default_activity_hours)
+
+    @staticmethod
+    def _sorted_groups(dataframe, destination_column, arrays):
+        sorted_groups = dict()
+        for key, positions in _group_positions(dataframe, destination_column).items():
+            positions = positions[~np.isnan(arrays["price"][positions])]
+            sorted_groups[key] = {
+                "price": positions[np.argsort(arrays["price"][positions], kind="stable")],
+                "score": positions[np.argsort(-arrays["score"][positions], kind="stable")],
+            }
+        return sorted_groups
+
+    def _prepare_activities(self, availability_df, default_activity_hours):
+        prices = pd.to_numeric(self.activities_df["price"], errors="coerce").to_numpy(dtype=float)
+        hours = pd.to_numeric(self.activities_df["hours_min"], errors="coerce").fillna(default_activity_hours)
+        self.activity_prices = prices
+        self.activity_minutes = (hours.to_numpy(dtype=float) * 60).astype("timedelta64[m]")
+
+        availability_df = availability_df.sort_values(["activity_index", "day", "start_minutes"])
+        slot_positions = availability_df["activity_index"].to_numpy()
+        start_minutes = availability_df["start_minutes"].to_numpy().astype(int)
+        start_minutes = np.where(start_minutes == ANY_TIME, self.any_time_start, start_minutes)
+        slot_dates = availability_df["date"].to_numpy().astype("datetime64[D]") if "date" in availability_df else None
+
+        # the same activity is scraped once per results page it shows up in; keep its cheapest row
+        activity_urls = self.activities_df["url"].to_numpy() if "url" in self.activities_df else np.arange(len(prices))
+
+        for key, positions in _group_positions(self.activities_df, "destination").items():
+            positions = positions[~np.isnan(prices[positions])]
+            positions = positions[np.argsort(prices[positions], kind="stable")]
+            _, first = np.unique(activity_urls[positions], return_index=True)
+            positions = positions[np.sort(first)]
+
+            in_group = np.isin(slot_positions, positions)
+            self.activity_groups[key] = {
+                "positions": positions,
+                "cheapest_prices": np.cumsum(prices[positions]),
+                "slot_positions": slot_positions[in_group],
+                "slot_days": availability_df["day"].to_numpy()[in_group],
+                "slot_dates": slot_dates[in_group] if slot_dates is not None else None,
+                "slot_minutes": start_minutes[in_group].astype("timedelta64[m]"),
+            }
+
+    def schedule_activities(self, key, window_start, window_end, n_activities):
+        """
+        Greedy cheapest-first schedule of `n_activities` distinct activities of group `key` fitting in
+        [window_start, window_end] without overlaps. Returns (price, [(position, start)]) or None.
+        """
+        cache_key = (key, window_start, window_end, n_activities)
+        if cache_key in self.schedules:
+            return self.schedules[cache_key]
+
+        group = self.activity_groups.get(key)
+        schedule = None
+        if group is not None and len(group["positions"]) >= n_activities:
+            if group["slot_dates"] is not None:
+                slot_dates = group["slot_dates"]
+            else:
+                # availability only knows the day of the month; place it in the month of the trip
+                slot_dates = resolve_available_dates(group["slot_days"], window_start.astype("datetime64[D]")).astype("datetime64[D]")
+            slot_starts = slot_dates.astype("datetime64[m]") + group["slot_minutes"]
+            slot_ends = slot_starts + self.activity_minutes[group["slot_positions"]]
+            fits = (slot_starts >= window_start) & (slot_ends <= window_end)
+
+            slots_by_activity = dict()
+            for position, start, end in zip(group["slot_positions"][fits], slot_starts[fits], slot_ends[fits]):
+                slots_by_activity.setdefault(position, []).append((start, end))
+
+            chosen = list()
+            for position in group["positions"]:
+                for start, end in sorted(slots_by_activity.get(position, [])):
+                    if all(end <= other_start or start >= other_end for _, other_start, other_end in chosen):
+                        chosen.append((position, start, end))
+                        break
+                if len(chosen) == n_activities:
+                    schedule = (float(self.activity_prices[[position for position, _, _ in chosen]].sum()),
+                                [(position, start) for position, start, _ in chosen])
+                    break
+
+        self.schedules[cache_key] = schedule
+        return schedule
+
+    def top_trips(self, k=10, destinations=None, weeks=None, budget=None, n_activities=0, objective="price", max_stops=None):
+        """
+        Find the `k` best combined trips over the selected destinations and weeks.
+
+        Parameters:
+        - k (int): Number of trips returned; an empty frame when 0 or less.
+        - destinations (list): Destination names (any dataset spelling), all if None.
+        - weeks (list): Weeks, all if None.
+        - budget (float): Maximum total price of flight, accommodation and activities.
+        - n_activities (int): Activities that must fit between the flights.
+        - objective (str): "price" for the cheapest trips, "score" for the best flight + accommodation score.
+        - max_stops (int): Maximum stops of either flight leg.
+
+        Returns:
+        - pd.DataFrame: One row per trip, best first, with prices, score, and the row positions of the
+          flight, accommodation and scheduled activities in the input DataFrames.
+        """
+        if objective not in ("price", "score"):
+            raise ValueError(f"Unknown objective {objective}, use 'price' or 'score'")
+        if k <= 0:
+            return pd.DataFrame(columns=TRIP_COLUMNS)
+
+        destination_keys = {destination_key(destination) for destination in destinations} if destinations is not None else None
+        weeks = set(weeks) if weeks is not None else None
+        group_keys = [key for key in self.flight_groups
+                      if key in self.accommodation_groups
+                      and (destination_keys is None or key[0] in destination_keys)
+                      and (weeks is None or key[1] in weeks)]
+
+        # costs are minimized: price, or the negated combined score
+        flight_costs = self.flight_arrays["price"] if objective == "price" else -self.flight_arrays["score"]
+        accommodation_costs = self.accommodation_arrays["price"] if objective == "price" else -self.accommodation_arrays["score"]
+
+        best = list()  # max-heap on cost of the current top-k, as (-cost, tie breaker, trip)
+        counter = itertools.count()
+
+        def kth_cost():
+            return -best[0][0] if len(best) == k else np.inf
+
+        for key in group_keys:
+            flights = self.flight_groups[key][objective]
+            accommodations = self.accommodation_groups[key][objective]
+            if len(accommodations) == 0:
+                continue
+
+            cheapest_accommodation_price = self.accommodation_arrays["price"][accommodations].min()
+            activity_price_bound = 0.0
+            if n_activities > 0:
+                activities = self.activity_groups.get(key)
+                if activities is None or len(activities["positions"]) < n_activities:
+                    continue
+                activity_price_bound = activities["cheapest_prices"][n_activities - 1]
+            best_accommodation_cost = accommodation_costs[accommodations[0]]
+            activity_cost_bound = activity_price_bound if objective == "price" else 0.0
+
+            for flight in flights:
+                flight_price = self.flight_arrays["price"][flight]
+                if flight_costs[flight] + best_accommodation_cost + activity_cost_bound >= kth_cost():
+                    break  # flights are sorted by cost, no later one can enter the top-k
+                if budget is not None and flight_price + cheapest_accommodation_price + activity_price_bound > budget:
+                    if objective == "price":
+                        break
+                    continue
+                if max_stops is not None and self.flight_arrays["stops"][flight] > max_stops:
+                    continue
+
+                activities_price, schedule = 0.0, []
+                if n_activities > 0:
+                    window_start = self.flight_arrays["arrival"][flight] + self.arrival_buffer
+                    window_end = self.flight_arrays["departure"][flight] - self.departure_buffer
+                    scheduled = self.schedule_activities(key, window_start, window_end, n_activities)
+                    if scheduled is None:
+                        continue
+                    activities_price, schedule = scheduled
+                activity_cost = activities_price if objective == "price" else 0.0
+
+                for accommodation in accommodations:
+                    cost = flight_costs[flight] + activity_cost + accommodation_costs[accommodation]
+                    if cost >= kth_cost():
+                        break
+                    total_price = flight_price + activities_price + self.accommodation_arrays["price"][accommodation]
+                    if budget is not None and total_price > budget:
+                        if objective == "price":
+                            break
+                        continue
+
+                    trip = {
+                        "destination": key[0],
+                        "week": key[1],
+                        "total_price": total_price,
+                        "flight_price": flight_price,
+                        "accommodation_price": self.accommodation_arrays["price"][accommodation],
+                        "activities_price": activities_price,
+                        "score": self.flight_arrays["score"][flight] + self.accommodation_arrays["score"][accommodation],
+                        "flight_index": flight,
+                        "accommodation_index": accommodation,
+                        "activity_indices": [position for position, _ in schedule],
+                        "activity_starts": [pd.Timestamp(start) for _, start in schedule],
+                    }
+                    entry = (-cost, -next(counter), trip)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    else:
+                        heapq.heapreplace(best, entry)
+
+        trips = [trip for _, _, trip in sorted(best, key=lambda entry: (-entry[0], -entry[1]))]
+        return pd.DataFrame(trips, columns=TRIP_COLUMNS)
+
+
+def cross_join_top_trips(flights_df, accommodations_df, k=10):
+    """
+    Reference top-k cheapest flight + accommodation pairs by merging both tables on destination and week.
+    """
+    flights = flights_df.reset_index(drop=True).reset_index(names="flight_index")
+    accommodations = accommodations_df.reset_index(drop=True).reset_index(names="accommodation_index")
+    flights["destination_key"] = flights["destination_city"].map(destination_key)
+    accommodations["destination_key"] = accommodations["destination"].map(destination_key)
+
+    trips = flights[["flight_index", "destination_key", "week", "price"]].merge(
+        accommodations[["accommodation_index", "destination_key", "week", "total_price_amount"]], on=["destination_key", "week"])
+    trips["total_price"] = trips["price"] + trips["total_price_amount"]
+    return trips.nsmallest(k, "total_price")
+
+
+def benchmark_top_trips(optimizer, k=10, repeat=5, **query):
+    """
+    Seconds per `top_trips` query against the cross join reference (flights and accommodations only).
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        optimizer.top_trips(k=k, **query)
+    optimizer_seconds = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cross_join_top_trips(optimizer.flights_df, optimizer.accommodations_df, k=k)
+    cross_join_seconds = (time.perf_counter() - start) / repeat
+
+    return {"top_trips_seconds": optimizer_seconds, "cross_join_seconds": cross_join_seconds}
@@ -0,0 +1,35 @@
+import glob
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+import pytest
+
+from src.data_extraction_support import count_booking_cards, parse_accommodations_html, scrape_accommodations_from_html
+
+FIXTURE_PATHS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "booking_results_page*.html")))
+
+
+@pytest.fixture(params=FIXTURE_PATHS, ids=os.path.basename)
+def html_page(request):
+    with open(request.param, encoding="utf-8") as file:
+        return file.read()
+
+
+def test_lxml_and_bs4_backends_return_equal_dataframes(html_page):
+    bs4_df = pd.DataFrame(scrape_accommodations_from_html(html_page, backend="bs4"))
+    lxml_df = pd.DataFrame(scrape_accommodations_from_html(html_page, backend="lxml"))
+
+    assert len(bs4_df) == count_booking_cards(html_page)
+    pd.testing.assert_frame_equal(lxml_df, bs4_df)
+
+
+def test_saved_pages_fill_the_accommodation_fields(html_page):
+    accommodations_df = pd.DataFrame(parse_accommodations_html(html_page))
+
+    # every card has a name, link, price and distance; new properties have no score or comments yet
+    assert accommodations_df[["name", "url", "total_price_amount", "distance_city_center_km"]].notna().all().all()
+    assert accommodations_df["score"].notna().any() and accommodations_df["score"].isna().any()
+    assert set(accommodations_df["close_to_metro"]) == {"Yes", "No"}
+    assert accommodations_df["price_currency"].eq("€").all()
@@ -0,0 +1,116 @@
+import os
+import sys
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from src import data_extraction_support
+from src.data_extraction_support import (BOOKING_CARD_SELECTOR, BrowserPool, build_accommodation_search_jobs,
+                                         count_booking_cards, extract_accommodations_batch)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+# saved result pages, served by destination
+PAGES = {destination: open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8").read()
+         for destination, file_name in [("Paris", "booking_results_page1.html"), ("Berlin", "booking_results_page2.html")]}
+
+
+class FakeDriver:
+    """
+    Stands in for a Chrome driver: `get` loads the saved page of the searched destination, searching
+    "Nowhere" fails like a crashed browser.
+    """
+
+    def __init__(self):
+        self.urls = list()
+        self.quit_calls = 0
+        self.page_source = ""
+
+    def get(self, url):
+        if "ss=Nowhere" in url:
+            raise RuntimeError("browser crashed")
+        self.urls.append(url)
+        self.page_source = next(page for destination, page in PAGES.items() if f"ss={destination}" in url)
+
+    def find_element(self, by, value):
+        if by == "css selector" and value == BOOKING_CARD_SELECTOR and count_booking_cards(self.page_source):
+            return object()
+        raise NoSuchElementException(value)
+
+    def execute_script(self, script, *args):
+        return 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class FakeDriverFactory:
+
+    def __init__(self):
+        self.drivers = list()
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.drivers.append(FakeDriver())
+            return self.drivers[-1]
+
+
+@pytest.fixture(autouse=True)
+def no_load_more_button(monkeypatch):
+    # the saved pages hold every result, so there is no "load more" button to wait for
+    monkeypatch.setattr(data_extraction_support, "click_load_more", lambda *args, **kwargs: False)
+
+
+def search_jobs(destinations):
+    return build_accommodation_search_jobs(destinations, ["2024-11-08", "2024-11-15"], ["2024-11-10", "2024-11-17"],
+                                           n_adults=[2], n_children=[0])
+
+
+def test_pool_recycles_drivers_after_k_pages():
+    driver_factory = FakeDriverFactory()
+    jobs = search_jobs(["Paris", "Berlin", "Paris"])
+
+    accommodations_df = extract_accommodations_batch(jobs, n_drivers=1, pages_per_driver=2,
+                                                     driver_factory=driver_factory, n_parsers=1)
+
+    # 6 searches over one slot recycled every 2 pages
+    assert len(driver_factory.drivers) == 3
+    assert [len(driver.urls) for driver in driver_factory.drivers] == [2, 2, 2]
+    assert all(driver.quit_calls == 1 for driver in driver_factory.drivers)
+
+    expected_rows = sum(count_booking_cards(PAGES[job["destination"]]) for job in jobs)
+    assert len(accommodations_df) == expected_rows
+    assert accommodations_df.groupby("week").size().to_dict() == {1: expected_rows // 2, 2: expected_rows // 2}
+    assert set(accommodations_df["type"]) == {"couple"}
+
+
+def test_pool_quits_drivers_of_failed_searches():
+    driver_factory = FakeDriverFactory()
+    jobs = search_jobs(["Paris", "Nowhere", "Berlin"])
+
+    accommodations_df = extract_accommodations_batch(jobs, n_drivers=2, pages_per_driver=10,
+                                                     driver_factory=driver_factory, n_parsers=1)
+
+    # each of the 2 failed searches tears its driver down and the next search starts a new one
+    assert len(driver_factory.drivers) >= 3
+    assert all(driver.quit_calls == 1 for driver in driver_factory.drivers)
+    assert len(accommodations_df) == 2 * (count_booking_cards(PAGES["Paris"]) + count_booking_cards(PAGES["Berlin"]))
+
+
+def test_driver_context_quits_on_exception_and_close_quits_all():
+    driver_factory = FakeDriverFactory()
+    browser_pool = BrowserPool(n_drivers=2, pages_per_driver=5, driver_factory=driver_factory)
+
+    with pytest.raises(RuntimeError):
+        with browser_pool.driver() as driver:
+            raise RuntimeError("page failed")
+    assert driver.quit_calls == 1
+
+    with browser_pool.driver() as first_driver, browser_pool.driver() as second_driver:
+        assert first_driver is not second_driver
+    browser_pool.close()
+
+    assert all(driver.quit_calls == 1 for driver in driver_factory.drivers)
+    assert browser_pool.stats == {"drivers_started": 3, "drivers_recycled": 0, "pages": 2}
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+import pytest
+
+from src.api_client_support import ApiClient
+from src.data_extraction_support import (AIR_SCRAPPER_HOST, TokenBucket, build_flight_query_grid,
+                                         request_flight_itineraries_grid, request_with_retries)
+
+AIRPORTS_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "airport_codes", "countries_airports.csv")
+DESTINATIONS = ["Paris", "Berlin", "Rome", "Lisbon"]
+CHECKINS = ["2024-11-08", "2024-11-15", "2024-11-22"]
+CHECKOUTS = ["2024-11-10", "2024-11-17", "2024-11-24"]
+
+
+def itinerary_payload(query):
+    leg = {"durationInMinutes": 130, "stopCount": 0, "departure": f"{query['date'][0]}T09:00:00",
+           "arrival": f"{query['date'][0]}T11:10:00", "carriers": {"marketing": [{"name": "transavia"}]},
+           "origin": {"name": "Madrid"}, "destination": {"name": query["destinationSkyId"][0]}}
+    itinerary = {"score": 0.9, "price": {"formatted": "225 €"}, "legs": [leg, leg], "isSelfTransfer": False,
+                 "farePolicy": {"isChangeAllowed": False, "isPartiallyChangeable": False,
+                                "isCancellationAllowed": False, "isPartiallyRefundable": False}}
+    return {"status": True, "data": {"context": {"status": "complete"}, "itineraries": [itinerary]}}
+
+
+class StubAirScrapperHandler(BaseHTTPRequestHandler):
+    """
+    Answers each distinct search with the statuses in `server.failures` first and a one-itinerary payload after.
+    """
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlsplit(self.path).query)
+        key = (query["destinationSkyId"][0], query["date"][0])
+        with server.lock:
+            server.request_times.append(time.monotonic())
+            attempt = server.attempts.get(key, 0)
+            server.attempts[key] = attempt + 1
+
+        time.sleep(server.latency)
+        if attempt < len(server.failures):
+            self.send_response(server.failures[attempt])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps(itinerary_payload(query)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubClient(ApiClient):
+    """
+    `ApiClient` that sends the Air Scrapper requests to the local stub server instead.
+    """
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return super().get(url.replace(f"https://{AIR_SCRAPPER_HOST}", self.base_url), params=params, headers=headers,
+                           timeout=timeout)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAirScrapperHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.request_times = list()
+    server.attempts = dict()
+    server.failures = list()
+    server.latency = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(stub_server):
+    with StubClient(f"http://127.0.0.1:{stub_server.server_address[1]}") as client:
+        yield client
+
+
+@pytest.fixture(scope="module")
+def countries_airports_df():
+    return pd.read_csv(AIRPORTS_PATH, index_col=0)
+
+
+def run_grid(countries_airports_df, client, destinations=DESTINATIONS, **kwargs):
+    queries = build_flight_query_grid("Madrid", destinations, CHECKINS, CHECKOUTS)
+    return request_flight_itineraries_grid(countries_airports_df, queries, client=client, **kwargs)
+
+
+def test_retries_429_and_5xx_with_backoff(stub_server, client):
+    stub_server.failures = [429, 503, 500]
+    url = f"https://{AIR_SCRAPPER_HOST}/api/v2/flights/searchFlightsComplete"
+    params = {"destinationSkyId": "CDG", "date": "2024-11-08"}
+
+    start = time.perf_counter()
+    response = request_with_retries(url, params=params, max_retries=3, backoff_factor=0.05, client=client)
+
+    assert response.status_code == 200
+    assert stub_server.attempts[("CDG", "2024-11-08")] == 4
+    # 0.05 + 0.1 + 0.2 seconds of backoff before the fourth attempt
+    assert time.perf_counter() - start >= 0.35
+
+
+def test_gives_up_after_max_retries(stub_server, client):
+    stub_server.failures = [503] * 10
+    url = f"https://{AIR_SCRAPPER_HOST}/api/v2/flights/searchFlightsComplete"
+
+    response = request_with_retries(url, params={"destinationSkyId": "CDG", "date": "2024-11-08"}, max_retries=2,
+                                    backoff_factor=0.01, client=client)
+
+    assert response.status_code == 503
+    assert stub_server.attempts[("CDG", "2024-11-08")] == 3
+
+
+def test_grid_retries_and_merges_into_one_dataframe(stub_server, client, countries_airports_df):
+    stub_server.failures = [429, 502]
+
+    itineraries_df = run_grid(countries_airports_df, client, max_workers=4, requests_per_second=100, burst=10,
+                              backoff_factor=0.01)
+
+    assert len(itineraries_df) == len(DESTINATIONS) * len(CHECKINS)
+    assert sorted(itineraries_df["week"].unique()) == [1, 2, 3]
+    assert itineraries_df["price"].eq(225).all()
+    assert set(stub_server.attempts.values()) == {3}
+
+
+def test_token_bucket_limits_request_rate(stub_server, client, countries_airports_df):
+    rate, burst = 20, 2
+
+    run_grid(countries_airports_df, client, max_workers=8, requests_per_second=rate, burst=burst)
+
+    # after the burst, the i-th request can't start before (i - burst) / rate seconds
+    request_times = sorted(stub_server.request_times)
+    for position, request_time in enumerate(request_times):
+        assert request_time - request_times[0] >= (position - burst) / rate - 0.02
+
+
+def test_token_bucket_allows_burst_at_once():
+    bucket = TokenBucket(rate=1, capacity=5)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        bucket.acquire()
+
+    assert time.perf_counter() - start < 0.1
+
+
+def test_concurrent_grid_throughput(stub_server, client, countries_airports_df):
+    stub_server.latency = 0.1
+    timings = dict()
+    for max_workers in [1, 8]:
+        stub_server.attempts.clear()
+        start = time.perf_counter()
+        itineraries_df = run_grid(countries_airports_df, client, max_workers=max_workers, requests_per_second=1000,
+                                  burst=1000)
+        timings[max_workers] = time.perf_counter() - start
+        assert len(itineraries_df) == len(DESTINATIONS) * len(CHECKINS)
+
+    print(f"\n{len(DESTINATIONS) * len(CHECKINS)} searches: "
+          + ", ".join(f"{max_workers} workers {seconds:.2f}s" for max_workers, seconds in timings.items()))
+    assert timings[8] * 3 < timings[1]
@@ -0,0 +1,20 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.instrumentation_support import check_import_budgets
+
+
+def test_support_modules_import_within_budget():
+    import_budgets_df = check_import_budgets()
+
+    failed = import_budgets_df[~import_budgets_df["within_budget"]]
+    assert failed.empty, f"import budgets exceeded:\n{failed.to_string()}"
+
+
+def test_eager_dependency_fails_the_budget():
+    # api_client_support imports requests at module level, which the lazy modules must not do
+    import_budgets_df = check_import_budgets({"src.api_client_support": 10000}, repeat=1)
+
+    assert "requests" in import_budgets_df.loc["src.api_client_support", "eager_dependencies"]
+    assert not import_budgets_df.loc["src.api_client_support", "within_budget"]
@@ -0,0 +1,98 @@
+import datetime
+import json
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+from src import data_extraction_support
+from src.data_extraction_support import extract_new_activities
+
+N_ACTIVITIES = 45  # 3 result pages of 20
+
+
+def activity_card(index, date_start, weekdays):
+    gtm = json.dumps({"ecommerce": {"currencyCode": "EUR", "click": {"products": [{"price": 10 + index}]}}}).replace('"', "&quot;")
+    monday = datetime.date.fromisoformat(date_start)
+    days = "".join(f'<div class="m-availability__item">Día<br/>{monday + datetime.timedelta(days=weekday):%d}'
+                   f'<span class="_time">{9 + weekday}:00</span></div>' for weekday in weekdays)
+    return f"""<div class="o-search-list__item"><article data-latitude="41.9{index:02d}" data-longitude="12.48{index:02d}">
+<a class="ga-trackEvent-element _activity-link" title="Actividad {index}" data-gtm-new-model-click="{gtm}"
+data-eventcategory="Actividades Listado" href="/es/roma/actividad-{index}/"><img src="/f/roma/a{index}.jpg"/></a>
+<div class="comfort-card__text l-list-card__text"> Descripción {index} </div>
+<div class="comfort-card__features"><span>{1 + index % 4} horas</span><span>Español</span></div>
+<div class="m-availability">{days}</div>
+</article></div>"""
+
+
+def listing_pages(date_start, weekdays_by_activity):
+    pages = list()
+    for first in range(0, N_ACTIVITIES, 20):
+        cards = "".join(activity_card(index, date_start, weekdays_by_activity.get(index, [0, 2, 4]))
+                        for index in range(first, min(first + 20, N_ACTIVITIES)))
+        pages.append(f'<html><body><div class="columns o-pagination__showing"><div class="left">{N_ACTIVITIES} actividades'
+                     f"</div></div>{cards}</body></html>")
+    return pages
+
+
+class FakeDriver:
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def civitatis(monkeypatch):
+    """
+    Serves the listing pages of `civitatis.weekdays_by_activity` for the requested window, counting page loads.
+    """
+    class Civitatis:
+        weekdays_by_activity = dict()
+        page_loads = 0
+
+    def open_activities_first_page(city_name, date_start, date_end, page_timings=None):
+        Civitatis.page_loads += 1
+        return FakeDriver(), listing_pages(date_start, Civitatis.weekdays_by_activity)[0]
+
+    def iter_pagination_htmls_by_city_date(city_name, date_start, date_end, page_start, n_pages, driver, page_timings=None):
+        for html_page in listing_pages(date_start, Civitatis.weekdays_by_activity)[page_start - 1:page_start - 1 + n_pages]:
+            Civitatis.page_loads += 1
+            yield html_page
+
+    monkeypatch.setattr(data_extraction_support, "open_activities_first_page", open_activities_first_page)
+    monkeypatch.setattr(data_extraction_support, "iter_pagination_htmls_by_city_date", iter_pagination_htmls_by_city_date)
+    return Civitatis
+
+
+def crawl_week(manifest_path, date_start):
+    date_end = (datetime.date.fromisoformat(date_start) + datetime.timedelta(days=6)).isoformat()
+    return extract_new_activities("roma", date_start, date_end, str(manifest_path), geocode=False)
+
+
+def test_weekly_refresh_reuses_the_city_manifest(tmp_path, civitatis):
+    manifest_path = tmp_path / "manifest.json"
+
+    activities_df, delta_log_df = crawl_week(manifest_path, "2024-11-04")
+    assert len(activities_df) == N_ACTIVITIES
+    assert set(delta_log_df["status"]) == {"new"}
+    assert civitatis.page_loads == 3
+
+    # the next week lists the same activities on the same weekdays: one page load, nothing emitted
+    civitatis.page_loads = 0
+    activities_df, delta_log_df = crawl_week(manifest_path, "2024-11-11")
+    assert activities_df.empty and delta_log_df.empty
+    assert civitatis.page_loads == 1
+
+
+def test_changed_weekly_availability_is_a_delta(tmp_path, civitatis):
+    manifest_path = tmp_path / "manifest.json"
+    crawl_week(manifest_path, "2024-11-25")
+
+    # a month later (day numbers wrap around the month end) activity 3 stops running on Wednesdays
+    civitatis.weekdays_by_activity = {3: [0, 4]}
+    activities_df, delta_log_df = crawl_week(manifest_path, "2024-12-30")
+
+    assert delta_log_df["status"].tolist() == ["changed"]
+    assert delta_log_df["url"].str.endswith("/es/roma/actividad-3/").all()
+    assert activities_df["url"].tolist() == delta_log_df["url"].tolist()
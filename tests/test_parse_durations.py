@@ -0,0 +1,106 @@
+import glob
+import os
+import re
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, strategies as st
+
+from src.data_cleaning_support import convert_to_hours, parse_durations
+
+ACTIVITIES_DIR = os.path.join(os.path.dirname(__file__), "..", "data", "activities")
+
+# spellings `convert_to_hours` reads correctly; it can't combine days with other units
+DAY_UNITS = ["d", "días", "dias", "día", "days"]
+HOUR_UNITS = ["h", "horas", "hora", "hours", "hrs"]
+MINUTE_UNITS = ["m", "minutos", "minuto", "minutes", "min"]
+CONNECTORS = [" ", " y ", " and "]
+
+
+def bundled_durations():
+    durations = list()
+    for path in sorted(glob.glob(os.path.join(ACTIVITIES_DIR, "*.csv"))):
+        if "duration" in pd.read_csv(path, nrows=0).columns:
+            durations.append(pd.read_csv(path, usecols=["duration"])["duration"])
+    return pd.concat(durations).dropna().astype(str).drop_duplicates().reset_index(drop=True)
+
+
+def expected_bound_hours(bound, upper_bound=None):
+    # a bare lower bound ("2 -3h") takes the unit of a single-unit upper bound, and is read as hours otherwise
+    upper_unit = re.fullmatch(r"\s*\d+\s*([^\d\s]+)\s*", upper_bound) if upper_bound is not None else None
+    if upper_unit is not None and re.fullmatch(r"\s*\d+\s*", bound):
+        bound = bound + upper_unit.group(1)
+    return float(convert_to_hours(bound))
+
+
+def assert_hours_equal(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), equal_nan=True)
+
+
+def test_matches_convert_to_hours_on_bundled_single_durations():
+    durations = bundled_durations()
+    single_durations = durations[~durations.str.contains("-")]
+
+    parsed = parse_durations(single_durations)
+
+    assert len(single_durations) > 0
+    assert_hours_equal(parsed["hours_min"], single_durations.map(convert_to_hours))
+    assert_hours_equal(parsed["hours_max"], parsed["hours_min"])
+
+
+def test_matches_convert_to_hours_on_bundled_ranges():
+    durations = bundled_durations()
+    ranges = durations[durations.str.contains("-")]
+    ranges = ranges[~ranges.str.contains(r"\d\s*d\s+\d")]  # "2d 6h" is mis-read by `convert_to_hours`
+    bounds = ranges.str.split(r"\s*-\s*", n=1, expand=True, regex=True)
+
+    parsed = parse_durations(ranges)
+
+    assert len(ranges) > 0
+    assert_hours_equal(parsed["hours_min"], [expected_bound_hours(lower, upper) for lower, upper in zip(bounds[0], bounds[1])])
+    assert_hours_equal(parsed["hours_max"], [expected_bound_hours(upper) for upper in bounds[1]])
+
+
+def test_compound_spanish_duration():
+    parsed = parse_durations(pd.Series(["1 hora y 30 minutos", "2 horas y 15 minutos - 3 horas", "2h and 15m", "2 horas y"]))
+
+    assert_hours_equal(parsed["hours_min"], [1.5, 2.25, 2.25, np.nan])
+    assert_hours_equal(parsed["hours_max"], [1.5, 3, 2.25, np.nan])
+    assert convert_to_hours("1 hora y 30 minutos") == 1.5
+
+
+spaces = st.sampled_from(["", " "])
+
+
+@st.composite
+def single_durations(draw):
+    kind = draw(st.sampled_from(["number", "days", "hours", "minutes", "hours_minutes"]))
+    if kind == "number":
+        return str(draw(st.integers(1, 99)))
+    if kind == "days":
+        return f"{draw(st.integers(1, 30))}{draw(spaces)}{draw(st.sampled_from(DAY_UNITS))}"
+
+    parts = list()
+    if kind in ("hours", "hours_minutes"):
+        parts.append(f"{draw(st.integers(1, 23))}{draw(spaces)}{draw(st.sampled_from(HOUR_UNITS))}")
+    if kind in ("minutes", "hours_minutes"):
+        parts.append(f"{draw(st.integers(1, 59))}{draw(spaces)}{draw(st.sampled_from(MINUTE_UNITS))}")
+    return draw(st.sampled_from(CONNECTORS)).join(parts)
+
+
+@given(single_durations())
+def test_matches_convert_to_hours_on_generated_single_durations(duration):
+    parsed = parse_durations(pd.Series([duration]))
+
+    assert_hours_equal(parsed["hours_min"], [convert_to_hours(duration)])
+    assert_hours_equal(parsed["hours_max"], parsed["hours_min"])
+
+
+@given(single_durations(), single_durations(), st.sampled_from(["-", " -", " - ", " -  "]))
+def test_matches_convert_to_hours_on_generated_ranges(lower, upper, separator):
+    parsed = parse_durations(pd.Series([f"{lower}{separator}{upper}"]))
+
+    assert_hours_equal(parsed["hours_min"], [expected_bound_hours(lower, upper)])
+    assert_hours_equal(parsed["hours_max"], [convert_to_hours(upper)])
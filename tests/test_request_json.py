@@ -0,0 +1,106 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cache_support import ResponseCache
+from src.data_extraction_support import (create_country_airport_code_df, request_flight_itineraries,
+                                         request_flight_itineraries_aller_retour, request_json)
+
+URL = "https://sky-scrapper.p.rapidapi.com/api/v2/flights/searchFlightsComplete"
+PARAMS = {"originSkyId": "MAD", "destinationSkyId": "CDG", "date": "2024-11-08"}
+
+COMPLETE_PAYLOAD = {"status": True, "data": {"context": {"status": "complete"}, "itineraries": [{"id": "1"}]}}
+ERROR_PAYLOAD = {"status": False, "message": "Something went wrong"}
+INCOMPLETE_PAYLOAD = {"status": True, "data": {"context": {"status": "incomplete"}, "itineraries": []}}
+
+
+class FakeResponse:
+
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+
+class FakeClient:
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None):
+        self.calls += 1
+        payload = self.payloads.pop(0)
+        return payload if isinstance(payload, FakeResponse) else FakeResponse(payload)
+
+
+def test_error_payload_is_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    client = FakeClient([ERROR_PAYLOAD, COMPLETE_PAYLOAD])
+
+    assert request_json(URL, params=PARAMS, cache=cache, client=client) == (200, ERROR_PAYLOAD)
+    assert cache.get("searchFlightsComplete", PARAMS) is None
+
+    # the next call goes back to the API and gets the real answer
+    assert request_json(URL, params=PARAMS, cache=cache, client=client) == (200, COMPLETE_PAYLOAD)
+    assert client.calls == 2
+
+
+def test_incomplete_payload_is_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    client = FakeClient([INCOMPLETE_PAYLOAD])
+
+    request_json(URL, params=PARAMS, cache=cache, client=client)
+
+    assert cache.get("searchFlightsComplete", PARAMS) is None
+
+
+def test_complete_payload_is_served_from_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    client = FakeClient([COMPLETE_PAYLOAD])
+
+    request_json(URL, params=PARAMS, cache=cache, client=client)
+
+    assert request_json(URL, params=PARAMS, cache=cache, client=client) == (200, COMPLETE_PAYLOAD)
+    assert client.calls == 1
+
+
+AIRPORT_PAYLOAD = {"status": True, "data": [
+    {"navigation": {"entityType": "AIRPORT",
+                    "relevantHotelParams": {"localizedName": "Paris", "entityId": "27539733"},
+                    "relevantFlightParams": {"skyId": "CDG", "entityId": "95565041",
+                                             "localizedName": "Paris Charles de Gaulle"}}},
+    {"navigation": {"entityType": "CITY"}},
+]}
+COUNTRIES_AIRPORTS_DF = pd.DataFrame({"country": ["spain", "france"], "city": ["Madrid", "Paris"],
+                                      "city_entityId": ["27544850", "27539733"], "skyId": ["MAD", "CDG"],
+                                      "entityId": ["95565077", "95565041"], "airport_name": ["Madrid", "Paris Charles de Gaulle"]})
+
+
+def test_airport_codes_skip_failed_countries():
+    client = FakeClient([FakeResponse(None, status_code=403), ERROR_PAYLOAD, AIRPORT_PAYLOAD])
+
+    countries_airports_df = create_country_airport_code_df(["spain", "italy", "france"], client=client)
+
+    assert countries_airports_df["country"].tolist() == ["france"]
+    assert countries_airports_df["skyId"].tolist() == ["CDG"]
+
+
+@pytest.mark.parametrize("request_function, dates", [
+    (request_flight_itineraries, ("2024-11-08",)),
+    (request_flight_itineraries_aller_retour, ("2024-11-08", "2024-11-10")),
+])
+def test_flight_search_failures(request_function, dates):
+    client = FakeClient([FakeResponse(None, status_code=403), ERROR_PAYLOAD, COMPLETE_PAYLOAD])
+
+    with pytest.raises(ValueError):
+        request_function(COUNTRIES_AIRPORTS_DF, "Madrid", "Paris", *dates, client=client)
+    assert np.isnan(request_function(COUNTRIES_AIRPORTS_DF, "Madrid", "Paris", *dates, client=client))
+    assert request_function(COUNTRIES_AIRPORTS_DF, "Madrid", "Paris", *dates, client=client) == [{"id": "1"}]
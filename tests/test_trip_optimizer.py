@@ -0,0 +1,37 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd
+import pytest
+
+from src.trip_optimizer_support import TRIP_COLUMNS, TripOptimizer
+
+
+@pytest.fixture
+def trip_optimizer():
+    flights_df = pd.DataFrame({
+        "price": [248, 180, 320], "score": [0.9, 0.7, 0.99], "stops_departure": [0, 1, 0], "stops_return": [0, 0, 0],
+        "arrival_departure": ["2024-11-04 16:40"] * 3, "departure_return": ["2024-11-11 11:35"] * 3,
+        "week": [1, 1, 2], "destination_city": ["Paris", "Paris", "Roma"],
+    })
+    accommodations_df = pd.DataFrame({
+        "total_price_amount": [900, 650, 700], "score": [8.5, 7.9, 9.1],
+        "destination": ["paris", "Paris", "Rome"], "week": [1, 1, 2],
+    })
+    return TripOptimizer(flights_df, accommodations_df)
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_top_trips_without_room_is_empty(trip_optimizer, k):
+    trips_df = trip_optimizer.top_trips(k=k)
+
+    assert trips_df.empty
+    assert list(trips_df.columns) == TRIP_COLUMNS
+
+
+def test_top_trips_cheapest_first(trip_optimizer):
+    trips_df = trip_optimizer.top_trips(k=2)
+
+    assert trips_df["total_price"].tolist() == [830, 898]
+    assert trips_df["destination"].tolist() == ["paris", "paris"]